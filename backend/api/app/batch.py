@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import Any, AsyncIterator, Dict, List, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from starlette.requests import Request
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+def batch_max_items() -> int:
+    return int(os.getenv("CONTENT_BATCH_MAX_ITEMS", "50000"))
+
+
+def _is_ndjson(request: Request) -> bool:
+    ctype = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    return ctype in NDJSON_CONTENT_TYPES
+
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    """
+    Yield complete lines from the streamed body without buffering it whole.
+    """
+    buf = b""
+    async for chunk in request.stream():
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line
+    if buf:
+        yield buf
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+
+async def parse_batch_body(
+    request: Request, model: Type[BaseModel]
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Parse a batch request body into validated items.
+
+    Accepted bodies:
+      - application/x-ndjson (streamed): one JSON object per line, blank lines ignored
+      - application/json: {"items": [...]} or a bare [...]
+
+    Returns (items, errors):
+      items:  [{"index": i, **model.model_dump()}, ...] for valid entries
+      errors: [{"index": i, "ok": False, "id": None, "error": "..."}, ...]
+    Raises ValueError for an unparseable body or when CONTENT_BATCH_MAX_ITEMS is exceeded.
+    """
+    max_items = batch_max_items()
+    items: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+
+    def _accept(index: int, raw: Any) -> None:
+        if index >= max_items:
+            raise ValueError(f"Batch too large: max {max_items} items")
+        try:
+            obj = model.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"index": index, "ok": False, "id": None, "error": _validation_message(e)})
+            return
+        items.append({"index": index, **obj.model_dump()})
+
+    if _is_ndjson(request):
+        index = 0
+        async for line in _iter_ndjson_lines(request):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                raw = json.loads(line)
+            except json.JSONDecodeError as e:
+                if index >= max_items:
+                    raise ValueError(f"Batch too large: max {max_items} items")
+                errors.append({"index": index, "ok": False, "id": None, "error": f"invalid JSON: {e.msg}"})
+            else:
+                _accept(index, raw)
+            index += 1
+        return items, errors
+
+    try:
+        body = json.loads(await request.body() or b"null")
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Invalid JSON body: {e.msg}")
+
+    if isinstance(body, dict):
+        body = body.get("items")
+    if not isinstance(body, list):
+        raise ValueError('Expected {"items": [...]}, a JSON array, or NDJSON')
+
+    for index, raw in enumerate(body):
+        _accept(index, raw)
+    return items, errors
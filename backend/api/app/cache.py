@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Sentinel returned by TTLCache.get() when a key is not cached (or expired).
+MISSING = object()
+
+
+class TTLCache:
+    """
+    Small, thread-safe, bounded in-process cache.
+
+    - LRU eviction once `max_size` entries are held
+    - per-entry TTL (positive entries use `ttl_seconds`, negative entries use
+      `negative_ttl_seconds`)
+    - negative caching: store "known missing" results so repeated lookups of
+      unknown keys do not hit the DB every time
+    - hit/miss/eviction counters for /debug + metrics
+
+    Values are returned as stored; callers must not mutate them.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl_seconds: float = 300.0,
+        negative_ttl_seconds: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max(1, int(max_size))
+        self.ttl_seconds = float(ttl_seconds)
+        self.negative_ttl_seconds = float(negative_ttl_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        # key -> (expires_at, is_negative, value)
+        self._data: "OrderedDict[Hashable, Tuple[float, bool, Any]]" = OrderedDict()
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+
+    def lookup(self, key: Hashable) -> Tuple[bool, bool, Any]:
+        """
+        Returns (found, is_negative, value).
+        Expired entries are dropped and reported as not found.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, False, None
+
+            expires_at, is_negative, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, False, None
+
+            self._data.move_to_end(key)
+            if is_negative:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return True, is_negative, value
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        found, is_negative, value = self.lookup(key)
+        if not found or is_negative:
+            return default
+        return value
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        self._store(key, value, ttl, is_negative=False)
+
+    def set_negative(self, key: Hashable, ttl_seconds: Optional[float] = None) -> None:
+        ttl = self.negative_ttl_seconds if ttl_seconds is None else float(ttl_seconds)
+        self._store(key, None, ttl, is_negative=True)
+
+    def _store(self, key: Hashable, value: Any, ttl: float, is_negative: bool) -> None:
+        if ttl <= 0:
+            return
+        expires_at = self._clock() + ttl
+        with self._lock:
+            self._data[key] = (expires_at, is_negative, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    # ----------------------------
+    # Invalidation
+    # ----------------------------
+
+    def invalidate(self, key: Hashable) -> bool:
+        with self._lock:
+            existed = self._data.pop(key, None) is not None
+            if existed:
+                self.invalidations += 1
+            return existed
+
+    def invalidate_where(self, predicate: Callable[[Hashable], bool]) -> int:
+        with self._lock:
+            keys = [k for k in self._data if predicate(k)]
+            for k in keys:
+                del self._data[k]
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.invalidations += len(self._data)
+            self._data.clear()
+
+    # ----------------------------
+    # Introspection
+    # ----------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.negative_hits + self.misses
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "negative_ttl_seconds": self.negative_ttl_seconds,
+                "hits": self.hits,
+                "negative_hits": self.negative_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_ratio": ((self.hits + self.negative_hits) / lookups) if lookups else 0.0,
+            }
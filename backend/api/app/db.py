@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import asyncio
 import os
+import time
 from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, exc, text
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+from app.metrics import TimedAsyncQueuePool, TimedQueuePool, instrument_engine
 
 
 def _load_env_once() -> None:
@@ -14,17 +20,231 @@ def _load_env_once() -> None:
     load_dotenv(override=False)
 
 
-@lru_cache(maxsize=1)
-def get_engine() -> Engine:
+def _database_url() -> str:
     _load_env_once()
 
     db_url = os.getenv("DATABASE_URL", "").strip()
     if not db_url:
         raise RuntimeError("DATABASE_URL is not set")
+    return db_url
+
+
+def _psycopg_url(db_url: str) -> str:
+    """
+    Force the psycopg (v3) driver: it serves both the sync and the async
+    engine (create_async_engine picks its async flavour automatically).
+    """
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if db_url.startswith(prefix):
+            return "postgresql+psycopg://" + db_url[len(prefix):]
+    return db_url
+
+
+def libpq_url() -> str:
+    """
+    DATABASE_URL as a plain libpq conninfo (no SQLAlchemy driver suffix), for
+    raw psycopg connections that live outside the engine pools (LISTEN).
+    """
+    db_url = _psycopg_url(_database_url())
+    return "postgresql://" + db_url[len("postgresql+psycopg://"):] if db_url.startswith("postgresql+psycopg://") else db_url
+
+
+def _env_flag(name: str, default: str = "false") -> bool:
+    return os.getenv(name, default).lower() in ("1", "true", "yes", "y")
+
+
+PING_STRATEGIES = ("always", "idle", "never")
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    """
+    Pool knobs shared by the sync and async engines:
+      DB_POOL_SIZE      (default 5)     persistent connections per engine
+      DB_MAX_OVERFLOW   (default 10)    extra connections under burst
+      DB_POOL_TIMEOUT   (default 30)    seconds to wait for a free connection
+      DB_POOL_RECYCLE   (default 1800)  replace connections older than this (seconds; -1 = never)
+      DB_POOL_PRE_PING  (default idle)  see _ping_strategy()
+    """
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        "pool_pre_ping": _ping_strategy() == "always",
+    }
+
+
+def _ping_strategy() -> str:
+    """
+    How checkouts guard against stale sockets (“Socket is not connected”):
+      always  SELECT 1 on every checkout (one extra round trip per checkout)
+      idle    only when the connection sat in the pool longer than
+              DB_POOL_PING_IDLE_SECONDS (default 30): a busy pool never pings
+      never   rely on pool_recycle + retrying
+    """
+    strategy = os.getenv("DB_POOL_PRE_PING", "idle").strip().lower()
+    if strategy not in PING_STRATEGIES:
+        raise RuntimeError(f"DB_POOL_PRE_PING must be one of {PING_STRATEGIES}, got {strategy!r}")
+    return strategy
+
+
+def _install_idle_ping(engine: Engine) -> None:
+    idle_seconds = float(os.getenv("DB_POOL_PING_IDLE_SECONDS", "30"))
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_connection, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_connection, record, proxy):
+        checked_in_at = record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        try:
+            engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            # The pool drops this connection and retries the checkout with a fresh one.
+            raise exc.DisconnectionError("idle connection failed its ping")
+
+
+def _prepare_threshold() -> Optional[int]:
+    """
+    DB_PREPARE_THRESHOLD: psycopg prepares a statement server-side after it
+    ran this many times on a connection (default 5, psycopg's own default);
+    `off` disables prepared statements entirely (PgBouncer in transaction mode).
+    """
+    raw = os.getenv("DB_PREPARE_THRESHOLD", "5").strip().lower()
+    return None if raw in ("off", "none", "") else int(raw)
+
+
+def _install_prepared_statements(engine: Engine) -> None:
+    """
+    Statements marked .execution_options(prepare=True) (the hot repo
+    queries) are prepared on their first execution on each connection
+    instead of waiting for the threshold.
+    """
+
+    @event.listens_for(engine, "do_execute")
+    def _do_execute(cursor, statement, parameters, context):
+        if not context.execution_options.get("prepare"):
+            return False
+        cursor.execute(statement, parameters, prepare=True)
+        return True
+
+
+def _configure(engine: Engine, label: str) -> None:
+    if _ping_strategy() == "idle":
+        _install_idle_ping(engine)
+    if _prepare_threshold() is not None:
+        _install_prepared_statements(engine)
+    # Query latency histograms + pool gauges for /metrics (app.metrics).
+    instrument_engine(engine, label)
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    db_url = _psycopg_url(_database_url())
+
+    echo = _env_flag("DB_ECHO")
+    engine = create_engine(
+        db_url,
+        echo=echo,
+        future=True,
+        poolclass=TimedQueuePool,
+        connect_args={"prepare_threshold": _prepare_threshold()},
+        **_pool_kwargs(),
+    )
+    _configure(engine, "sync")
+    return engine
+
+
+def _make_async_engine(db_url: str, label: str) -> AsyncEngine:
+    engine = create_async_engine(
+        _psycopg_url(db_url),
+        echo=_env_flag("DB_ECHO"),
+        poolclass=TimedAsyncQueuePool,
+        connect_args={"prepare_threshold": _prepare_threshold()},
+        **_pool_kwargs(),
+    )
+    _configure(engine.sync_engine, label)
+    return engine
+
+
+@lru_cache(maxsize=1)
+def get_async_engine() -> AsyncEngine:
+    """
+    Async (psycopg) engine used by the API routes. Same DATABASE_URL and pool
+    knobs as get_engine(); each engine owns its own pool.
+    """
+    return _make_async_engine(_database_url(), "async")
+
+
+def replica_urls() -> List[str]:
+    """
+    DATABASE_REPLICA_URLS: comma-separated read replicas (empty = all reads
+    go to DATABASE_URL). See app.replicas.
+    """
+    _load_env_once()
+    return [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+
+
+@lru_cache(maxsize=1)
+def get_replica_engines() -> Tuple[AsyncEngine, ...]:
+    """
+    One async engine per replica (pool knobs as for the primary), labelled
+    replica0, replica1, ... in /metrics.
+    """
+    return tuple(_make_async_engine(url, f"replica{i}") for i, url in enumerate(replica_urls()))
+
+
+# ----------------------------
+# Warmup (/readyz)
+# ----------------------------
+
+_warmup_lock: Optional[asyncio.Lock] = None
+_warmed: set = set()
+
+
+def pool_stats(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+async def warm_async_pool(engine: AsyncEngine, connections: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Open `connections` (default DB_WARMUP_CONNECTIONS, else the pool size)
+    pooled connections at once and run one round trip on each, so the first
+    real requests after a deploy find warm connections (TCP + TLS + auth +
+    psycopg type setup already paid). Only the first call per engine warms;
+    later calls just check one connection. Raises if the DB is unreachable.
+    """
+    global _warmup_lock
+    if _warmup_lock is None:
+        _warmup_lock = asyncio.Lock()
+
+    async with _warmup_lock:
+        if id(engine) in _warmed:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            return {"warmed": 0, "pool": pool_stats(engine)}
 
-    echo = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes", "y")
-    # pool_pre_ping prevents stale sockets causing intermittent “Socket is not connected”
-    return create_engine(db_url, echo=echo, pool_pre_ping=True, future=True)
+        n = connections or int(os.getenv("DB_WARMUP_CONNECTIONS", "0")) or engine.sync_engine.pool.size()
+        # Held at the same time, so the pool really opens n connections (not one, n times).
+        conns = await asyncio.gather(*(engine.connect() for _ in range(n)), return_exceptions=True)
+        try:
+            for c in conns:
+                if isinstance(c, BaseException):
+                    raise c
+            await asyncio.gather(*(c.execute(text("SELECT 1")) for c in conns))
+        finally:
+            await asyncio.gather(*(c.close() for c in conns if not isinstance(c, BaseException)))
+        _warmed.add(id(engine))
+        return {"warmed": n, "pool": pool_stats(engine)}
 
 
 def get_database_url_safe() -> dict:
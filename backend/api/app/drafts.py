@@ -0,0 +1,99 @@
+"""
+Delta storage for draft_versions.body_md.
+
+Every `snapshot_every`-th version (1, N+1, 2N+1, ...) is stored in full
+(storage = 'full', body_md set); the versions in between store only a
+forward delta against the previous version (storage = 'delta', body_md
+NULL, delta bytea). Reading version v = the nearest full snapshot <= v
+plus at most N-1 deltas applied in order. The latest body of each item is
+also kept materialized in public.draft_latest, so the common read is one
+primary-key lookup.
+
+Delta format: line-level edit script from difflib, as compact JSON,
+zlib-compressed:
+    [[0, 12], "inserted lines\n", [14, 40], ...]
+a [i1, i2] pair copies lines i1..i2-1 of the previous body, a string is
+inserted verbatim. Lines keep their line endings, so bodies round-trip
+byte for byte.
+
+DRAFT_STORAGE=full turns deltas off (every version is a snapshot);
+DRAFT_SNAPSHOT_EVERY sets N (default 10). Existing chains are re-stored
+with the current setting by:
+    python -m app.drafts --rewrite delta     # or: --rewrite full (before a downgrade)
+"""
+
+from __future__ import annotations
+
+import argparse
+import difflib
+import json
+import os
+import zlib
+from functools import lru_cache
+from typing import Any, List
+
+STORAGE_MODES = ("delta", "full")
+
+
+@lru_cache(maxsize=1)
+def draft_snapshot_every() -> int:
+    """
+    N for new draft versions; 1 (= every version in full) with DRAFT_STORAGE=full.
+    """
+    mode = os.getenv("DRAFT_STORAGE", "delta").strip().lower()
+    if mode not in STORAGE_MODES:
+        raise RuntimeError(f"DRAFT_STORAGE must be one of {STORAGE_MODES}, got {mode!r}")
+    if mode == "full":
+        return 1
+    return max(1, int(os.getenv("DRAFT_SNAPSHOT_EVERY", "10")))
+
+
+def is_snapshot_version(version: int, snapshot_every: int) -> bool:
+    return snapshot_every <= 1 or (version - 1) % snapshot_every == 0
+
+
+def make_delta(old: str, new: str) -> bytes:
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    ops: List[Any] = []
+    for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b, autojunk=False).get_opcodes():
+        if tag == "equal":
+            ops.append([i1, i2])
+        elif j2 > j1:  # replace / insert; deletes just copy nothing
+            ops.append("".join(b[j1:j2]))
+    return zlib.compress(json.dumps(ops, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 6)
+
+
+def apply_delta(old: str, delta: bytes) -> str:
+    a = old.splitlines(keepends=True)
+    out: List[str] = []
+    for op in json.loads(zlib.decompress(delta)):
+        if isinstance(op, str):
+            out.append(op)
+        else:
+            out.extend(a[op[0]:op[1]])
+    return "".join(out)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-store draft_versions chains as deltas or full copies")
+    ap.add_argument("--rewrite", choices=STORAGE_MODES, required=True)
+    args = ap.parse_args()
+
+    from app.db import get_engine
+    from app.repo import list_drafted_content, rewrite_draft_chain
+
+    engine = get_engine()
+    every = 1 if args.rewrite == "full" else max(1, int(os.getenv("DRAFT_SNAPSHOT_EVERY", "10")))
+    totals = {"items": 0, "versions": 0, "snapshots": 0, "deltas": 0}
+    # One transaction per item: short locks, and an interrupted run can simply be restarted.
+    for tenant_id, content_id in list_drafted_content(engine):
+        res = rewrite_draft_chain(engine, tenant_id, content_id, every)
+        totals["items"] += 1
+        for k, v in res.items():
+            totals[k] += v
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":
+    main()
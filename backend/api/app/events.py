@@ -0,0 +1,339 @@
+"""
+Buffered event sink for public.events.
+
+Request handlers `emit()` audit events into a bounded in-memory queue; a
+background flusher drains it and writes batches with one multi-row INSERT
+(repo.insert_events_tx), flushing when a batch is full or `flush_ms` has
+passed since the first queued event. One commit per batch instead of one
+per event.
+
+The default is EVENT_SINK_MODE=durable: the event commits in the same
+transaction as the change it describes (always the case for transitions,
+see repo.transition_content_tx) and this sink is not used. Buffered mode
+is opt-in: while the database is unreachable a batch is retried until it
+is written. A batch the database rejects (bad uuid, unserializable
+payload) is retried `max_retries` times, then bisected so the good events
+are written and only the rejected ones are logged and dead-lettered.
+Events still queued when the process crashes, or when stop() times out,
+are lost.
+
+created_at is stamped by the database when the batch is inserted, not on
+emit: an event waiting in the queue is not dated before rows committed
+meanwhile, which an events cursor has already paged past.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import repo_async
+
+log = logging.getLogger(__name__)
+
+MODES = ("buffered", "durable")
+
+# Queued by stop(): flush everything before it, then exit.
+_STOP: Any = object()
+
+# The database is unreachable (as opposed to rejecting the batch): retry without limit.
+_UNAVAILABLE = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+
+class EventSink:
+    """
+    Bounded queue + single flusher task.
+
+    Backpressure: when the queue is full, emit() waits up to `put_timeout`
+    seconds for room; if it is still full the event is written inline (its
+    own transaction), so a slow DB slows producers down instead of growing
+    memory or silently dropping events.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_ms: float = 50,
+        put_timeout: float = 1.0,
+        max_retry_delay: float = 5.0,
+        max_retries: int = 5,
+        stop_timeout: float = 10.0,
+    ) -> None:
+        self.engine = engine
+        self.max_queue = max(1, int(max_queue))
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = max(0.0, float(flush_ms)) / 1000.0
+        self.put_timeout = max(0.0, float(put_timeout))
+        self.max_retry_delay = max(0.1, float(max_retry_delay))
+        self.max_retries = max(1, int(max_retries))
+        self.stop_timeout = max(0.0, float(stop_timeout))
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._inflight = 0
+
+        # metrics
+        self.enqueued = 0
+        self.flushed = 0
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.dead_lettered = 0
+        self.dropped_on_stop = 0
+        self.retrying = False
+        self.inline_writes = 0
+        self.last_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    # ----------------------------
+    # Lifecycle
+    # ----------------------------
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # The queue binds to the running loop, so create it here (not in __init__).
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run(), name="event-sink-flusher")
+
+    async def stop(self) -> None:
+        """
+        Stop the flusher after draining everything already queued, waiting at
+        most `stop_timeout` seconds; after that the flusher is cancelled and
+        the unwritten events are counted and logged.
+        """
+        if self._task is None:
+            return
+        if self.running:
+            try:
+                await asyncio.wait_for(self._drain(), timeout=self.stop_timeout)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+                try:
+                    await self._task
+                except asyncio.CancelledError:
+                    pass
+                left = self._inflight
+                while not self._queue.empty():
+                    if self._queue.get_nowait() is not _STOP:
+                        left += 1
+                self.dropped_on_stop += left
+                log.error("event sink: not drained within %.1fs, %d events dropped", self.stop_timeout, left)
+        self._task = None
+
+    async def _drain(self) -> None:
+        # Sentinel goes behind every queued event, so they all get flushed first.
+        await self._queue.put(_STOP)
+        await asyncio.shield(self._task)
+
+    # ----------------------------
+    # Producer side
+    # ----------------------------
+
+    async def emit(
+        self,
+        tenant_id: UUID,
+        entity_type: str,
+        entity_id: UUID,
+        event_type: str,
+        payload: Dict[str, Any],
+        actor_type: str = "system",
+        actor_id: Optional[UUID] = None,
+    ) -> None:
+        event = {
+            "tenant_id": str(tenant_id),
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "event_type": event_type,
+            "payload": payload,
+            "actor_type": actor_type,
+            "actor_id": actor_id,
+        }
+
+        if not self.running:
+            # Sink not started (scripts, tests): behave like the old inline insert.
+            await self._write_inline(event)
+            return
+
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                await asyncio.wait_for(self._queue.put(event), timeout=self.put_timeout)
+            except asyncio.TimeoutError:
+                await self._write_inline(event)
+                return
+        self.enqueued += 1
+
+    async def _write_inline(self, event: Dict[str, Any]) -> None:
+        await repo_async.insert_events(self.engine, [event])
+        self.inline_writes += 1
+
+    # ----------------------------
+    # Flusher
+    # ----------------------------
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            # Block for the first event, then fill the batch until full or the window closes.
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            batch = [first]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                try:
+                    ev = self._queue.get_nowait() if remaining <= 0 else await asyncio.wait_for(
+                        self._queue.get(), timeout=remaining
+                    )
+                except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                    break
+                if ev is _STOP:
+                    stopping = True
+                    break
+                batch.append(ev)
+            self._inflight = len(batch)
+            await self._flush(batch)
+            self._inflight = 0
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        attempt = 0
+        while True:
+            try:
+                await self._insert(batch)
+                self.retrying = False
+                return
+            except Exception as e:
+                # Unreachable DB: keep retrying (meanwhile the queue fills up and producers
+                # fall back to inline writes, which fail the request). Rejected: bounded.
+                self.failed_flushes += 1
+                attempt += 1
+                if not isinstance(e, _UNAVAILABLE) and attempt >= self.max_retries:
+                    log.exception("event sink: flush of %d events rejected %d times, bisecting", len(batch), attempt)
+                    break
+                self.retrying = True
+                log.exception("event sink: flush of %d events failed (attempt %d), retrying", len(batch), attempt)
+                await asyncio.sleep(min(self.max_retry_delay, 0.1 * 2 ** (attempt - 1)))
+        self.retrying = False
+        await self._isolate(batch)
+
+    async def _isolate(self, batch: List[Dict[str, Any]]) -> None:
+        """
+        Write the halves of a batch the database keeps rejecting, once each;
+        a single rejected event is logged and dead-lettered.
+        """
+        if len(batch) == 1:
+            self.dead_lettered += 1
+            log.error("event sink: dead-lettered event the database rejects: %r", batch[0])
+            return
+        mid = len(batch) // 2
+        for half in (batch[:mid], batch[mid:]):
+            try:
+                await self._insert(half)
+            except Exception as e:
+                self.failed_flushes += 1
+                if isinstance(e, _UNAVAILABLE):
+                    # The database went away meanwhile: back to retrying this half.
+                    await self._flush(half)
+                else:
+                    await self._isolate(half)
+
+    async def _insert(self, batch: List[Dict[str, Any]]) -> None:
+        t0 = time.perf_counter()
+        await repo_async.insert_events(self.engine, batch)
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.flushes += 1
+        self.flushed += len(batch)
+        self.last_batch_size = len(batch)
+        self.last_flush_ms = ms
+        self.max_flush_ms = max(self.max_flush_ms, ms)
+        self._total_flush_ms += ms
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "batch_size": self.batch_size,
+            "flush_ms": self.flush_interval * 1000.0,
+            "enqueued": self.enqueued,
+            "flushed": self.flushed,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "dead_lettered": self.dead_lettered,
+            "dropped_on_stop": self.dropped_on_stop,
+            "retrying": self.retrying,
+            "inline_writes": self.inline_writes,
+            "last_batch_size": self.last_batch_size,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "avg_flush_ms": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+
+# ----------------------------
+# Process-wide sink
+# ----------------------------
+
+@lru_cache(maxsize=1)
+def event_sink_mode() -> str:
+    """
+    EVENT_SINK_MODE: "durable" (default; events written in the same
+    transaction as the change they describe, no queue) or "buffered".
+    """
+    from app.db import _load_env_once
+
+    _load_env_once()
+    mode = os.getenv("EVENT_SINK_MODE", "durable").strip().lower()
+    if mode not in MODES:
+        raise ValueError(f"EVENT_SINK_MODE must be one of {MODES}")
+    return mode
+
+
+@lru_cache(maxsize=1)
+def get_event_sink() -> EventSink:
+    """
+    Env knobs (read once):
+      EVENT_SINK_MAX_QUEUE       (default 10000)  queued events before backpressure
+      EVENT_SINK_BATCH_SIZE      (default 500)    events per INSERT
+      EVENT_SINK_FLUSH_MS        (default 50)     max wait before a partial batch is flushed
+      EVENT_SINK_PUT_TIMEOUT_MS  (default 1000)   wait for room before writing inline
+      EVENT_SINK_MAX_RETRIES     (default 5)      attempts before a rejected batch is bisected
+      EVENT_SINK_STOP_TIMEOUT_MS (default 10000)  max wait for the drain on shutdown
+    """
+    from app.db import _load_env_once, get_async_engine
+
+    _load_env_once()
+    return EventSink(
+        get_async_engine(),
+        max_queue=int(os.getenv("EVENT_SINK_MAX_QUEUE", "10000")),
+        batch_size=int(os.getenv("EVENT_SINK_BATCH_SIZE", "500")),
+        flush_ms=float(os.getenv("EVENT_SINK_FLUSH_MS", "50")),
+        put_timeout=float(os.getenv("EVENT_SINK_PUT_TIMEOUT_MS", "1000")) / 1000.0,
+        max_retries=int(os.getenv("EVENT_SINK_MAX_RETRIES", "5")),
+        stop_timeout=float(os.getenv("EVENT_SINK_STOP_TIMEOUT_MS", "10000")) / 1000.0,
+    )
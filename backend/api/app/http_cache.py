@@ -0,0 +1,217 @@
+"""
+Conditional GET + in-process response cache for content reads.
+
+Validators for a content item come from content_items.updated_at and the
+item's latest event (repo.get_content_validators_tx): every write to an
+item either bumps updated_at or appends an event. They become a weak ETag
+and a Last-Modified, and If-None-Match / If-Modified-Since answer 304.
+
+Rendered responses of GET /content/{id}, /allowed and /events are cached
+per (tenant_id, content_id, resource, params) in a TTLCache (LRU + TTL),
+together with their validators, so a warm hit or revalidation needs no DB
+round trip at all. Entries are dropped
+  - locally, by the write paths (create / transition, single and batch)
+  - for writes made by other processes, on the `content_events` NOTIFY
+    every content event sends (one LISTEN connection, app.listener,
+    subscribed at app startup); the whole cache is cleared each time the
+    channel becomes live (first connect and every reconnect), since
+    notifications sent before that are lost
+and expire after RESPONSE_CACHE_TTL_SECONDS in any case. While the channel
+is not live, nothing is stored (reads still work, uncached).
+
+A read that raced with a write is not stored: invalidations bump a
+generation counter (striped by key) that fills compare before storing.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Optional, Tuple
+from uuid import UUID
+
+from app.cache import TTLCache
+
+log = logging.getLogger(__name__)
+
+_STRIPES = 256
+
+
+class ResponseCache:
+    def __init__(self, cache: TTLCache) -> None:
+        self.cache = cache
+        self._generations = [0] * _STRIPES
+        self._lock = threading.Lock()
+        self._listener: Any = None
+        self.skipped_fills = 0
+
+    @staticmethod
+    def _stripe(tenant_id: str, content_id: str) -> int:
+        return hash((tenant_id, content_id)) % _STRIPES
+
+    def generation(self, tenant_id: str, content_id: str) -> int:
+        return self._generations[self._stripe(tenant_id, content_id)]
+
+    def get(self, key: Tuple[Hashable, ...]) -> Any:
+        return self.cache.get(key)
+
+    def put(self, key: Tuple[Hashable, ...], value: Any, generation: int) -> None:
+        """
+        Store unless the item was invalidated since `generation` was read.
+        """
+        if self.cache.ttl_seconds <= 0:
+            return
+        if not self.listening:
+            # Another process's write would not invalidate this entry.
+            self.skipped_fills += 1
+            return
+        with self._lock:
+            if self._generations[self._stripe(key[0], key[1])] != generation:
+                self.skipped_fills += 1
+                return
+            self.cache.set(key, value)
+
+    def invalidate(self, tenant_id: str, content_id: Optional[str] = None) -> int:
+        """
+        Drop every cached response of one item (or of a whole tenant).
+        """
+        tenant_id, content_id = str(tenant_id), (str(content_id) if content_id else None)
+        with self._lock:
+            if content_id is None:
+                self._generations = [g + 1 for g in self._generations]
+            else:
+                self._generations[self._stripe(tenant_id, content_id)] += 1
+        if content_id is None:
+            return self.cache.invalidate_where(lambda k: k[0] == tenant_id)
+        return self.cache.invalidate_where(lambda k: k[0] == tenant_id and k[1] == content_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generations = [g + 1 for g in self._generations]
+        self.cache.clear()
+
+    def _on_content_event(self, payload: str) -> None:
+        try:
+            msg = json.loads(payload)
+            self.invalidate(msg["tenant_id"], msg["entity_id"])
+        except Exception:
+            log.warning("response cache: unparseable content_events payload, clearing")
+            self.clear()
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and self._listener.is_listening("content_events")
+
+    def start_listening(self) -> None:
+        """
+        Subscribe to `content_events` (app startup, on the event loop).
+        """
+        if self._listener is not None or self.cache.ttl_seconds <= 0:
+            return
+        from app.listener import get_listener
+
+        self._listener = get_listener()
+        # clear() also bumps every generation, so fills read before the channel was live are discarded.
+        self._listener.listen("content_events", self._on_content_event, on_active=self.clear)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.cache.stats(), "skipped_fills": self.skipped_fills, "listening": self.listening}
+
+
+@lru_cache(maxsize=1)
+def get_response_cache() -> ResponseCache:
+    """
+    Process-wide response cache.
+
+    Env knobs (read once):
+      RESPONSE_CACHE_MAX_SIZE     (default 4096 responses)
+      RESPONSE_CACHE_TTL_SECONDS  (default 30; 0 disables the cache, conditional GET still works)
+    """
+    from app.db import _load_env_once
+
+    _load_env_once()
+    return ResponseCache(
+        TTLCache(
+            max_size=int(os.getenv("RESPONSE_CACHE_MAX_SIZE", "4096")),
+            ttl_seconds=float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30")),
+            negative_ttl_seconds=0,
+        )
+    )
+
+
+def invalidate_content(tenant_id: str, content_id: Optional[str] = None) -> None:
+    get_response_cache().invalidate(tenant_id, content_id)
+
+
+def canonical_id(content_id: str) -> Optional[str]:
+    """
+    Canonical text form of a UUID path parameter (cache keys must match the
+    ids writes invalidate), or None if it is not a UUID.
+    """
+    try:
+        return str(UUID(content_id))
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+# ----------------------------
+# Validators
+# ----------------------------
+
+def content_etag(validators: Dict[str, Any], resource: str) -> str:
+    updated_at = validators["updated_at"]
+    raw = f"{resource}|{updated_at.isoformat() if updated_at else ''}|{validators.get('last_event_id') or ''}"
+    return 'W/"' + hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20] + '"'
+
+
+def content_last_modified(validators: Dict[str, Any]) -> Optional[datetime]:
+    stamps = [v for v in (validators.get("updated_at"), validators.get("last_event_at")) if v is not None]
+    return max(stamps) if stamps else None
+
+
+def http_date(ts: datetime) -> str:
+    return format_datetime(ts.astimezone(timezone.utc), usegmt=True)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison (RFC 9110 13.1.2): W/ prefixes are ignored.
+    bare = etag.removeprefix("W/")
+    return any(t.strip().removeprefix("W/") == bare for t in if_none_match.split(","))
+
+
+def not_modified(
+    if_none_match: Optional[str], if_modified_since: Optional[str], etag: str, last_modified: Optional[datetime]
+) -> bool:
+    """
+    RFC 9110 13.2.2: If-None-Match wins; If-Modified-Since is only
+    evaluated without it (HTTP dates have one-second resolution).
+    """
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
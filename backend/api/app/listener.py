@@ -0,0 +1,169 @@
+"""
+One Postgres LISTEN connection per process.
+
+Features subscribe a callback per NOTIFY channel (`listener.listen(ch, fn)`);
+a single background task owns a dedicated autocommit psycopg connection
+(outside the engine pools), LISTENs on every registered channel and calls
+the callbacks inline on the event loop. Callbacks must be quick and must
+not block (hand work off to queues/tasks).
+
+The connection is re-established with backoff when it drops;
+`on_reconnect` hooks fire after every reconnect, because notifications
+sent while disconnected are lost and consumers must catch up from tables.
+
+Caches invalidated by NOTIFY must not store anything read while their
+channel is not LISTENed yet (or any more): they check
+`is_listening(channel)` before storing and pass `on_active`, which runs
+each time the channel becomes live on a connection (first connect
+included), to drop whatever was filled before.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import psycopg
+from psycopg import sql
+
+log = logging.getLogger(__name__)
+
+NotifyHandler = Callable[[str], None]
+
+
+class PgListener:
+    def __init__(self, conninfo: str, poll_seconds: float = 1.0) -> None:
+        self.conninfo = conninfo
+        # notifies() is polled with this timeout so newly registered channels get LISTENed promptly
+        self.poll_seconds = poll_seconds
+
+        self._handlers: Dict[str, List[NotifyHandler]] = {}
+        self._reconnect_hooks: List[Callable[[], None]] = []
+        self._active_hooks: Dict[str, List[Callable[[], None]]] = {}
+        self._listening: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+        # metrics
+        self.connected = False
+        self.connects = 0
+        self.notifications = 0
+        self.handler_errors = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def listen(
+        self, channel: str, handler: NotifyHandler, on_active: Optional[Callable[[], None]] = None
+    ) -> None:
+        """
+        Register `handler` for `channel` and make sure the listener task runs
+        (must be called from the event loop). `on_active` runs whenever the
+        channel starts being LISTENed on a connection.
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+        if on_active is not None:
+            self._active_hooks.setdefault(channel, []).append(on_active)
+        self.start()
+
+    def is_listening(self, channel: str) -> bool:
+        """
+        True while `channel` is LISTENed on a live connection, i.e. every
+        NOTIFY committed from now on will be delivered.
+        """
+        return self.connected and channel in self._listening
+
+    def unlisten(self, channel: str, handler: NotifyHandler) -> None:
+        handlers = self._handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def on_reconnect(self, hook: Callable[[], None]) -> None:
+        self._reconnect_hooks.append(hook)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stopping = False
+        self._task = asyncio.create_task(self._run(), name="pg-listener")
+
+    async def stop(self) -> None:
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self.connected = False
+
+    async def _sync_channels(self, conn: psycopg.AsyncConnection) -> None:
+        for channel in list(self._handlers):
+            if channel not in self._listening:
+                await conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                self._listening.add(channel)
+                for hook in list(self._active_hooks.get(channel, ())):
+                    try:
+                        hook()
+                    except Exception:
+                        self.handler_errors += 1
+                        log.exception("listener: on_active hook for %s failed", channel)
+
+    def _dispatch(self, channel: str, payload: str) -> None:
+        self.notifications += 1
+        for fn in list(self._handlers.get(channel, ())):
+            try:
+                fn(payload)
+            except Exception:
+                self.handler_errors += 1
+                log.exception("listener: handler for %s failed", channel)
+
+    async def _run(self) -> None:
+        backoff = 0.5
+        while not self._stopping:
+            try:
+                async with await psycopg.AsyncConnection.connect(self.conninfo, autocommit=True) as conn:
+                    self._listening = set()
+                    await self._sync_channels(conn)
+                    self.connected = True
+                    self.connects += 1
+                    backoff = 0.5
+                    if self.connects > 1:
+                        for hook in list(self._reconnect_hooks):
+                            hook()
+
+                    while not self._stopping:
+                        async for n in conn.notifies(timeout=self.poll_seconds):
+                            self._dispatch(n.channel, n.payload)
+                        await self._sync_channels(conn)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                log.exception("listener: connection lost, retrying in %.1fs", backoff)
+            finally:
+                self.connected = False
+                self._listening = set()
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "connected": self.connected,
+            "connects": self.connects,
+            "channels": sorted(self._handlers),
+            "listening": sorted(self._listening) if self.connected else [],
+            "notifications": self.notifications,
+            "handler_errors": self.handler_errors,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_listener() -> PgListener:
+    from app.db import libpq_url
+
+    return PgListener(libpq_url())
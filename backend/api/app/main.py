@@ -1,45 +1,145 @@
 from __future__ import annotations
 
-from fastapi import Depends, FastAPI, Header, HTTPException, Query
-from fastapi.responses import JSONResponse
-
-from app.db import get_database_url_safe, get_engine
-from app.repo import (
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+
+from app.batch import parse_batch_body
+from app.cache import MISSING
+from app.db import get_async_engine, get_database_url_safe, pool_stats, warm_async_pool
+from app.drafts import draft_snapshot_every
+from app.events import event_sink_mode, get_event_sink
+from app.http_cache import (
+    canonical_id,
+    content_etag,
+    content_last_modified,
+    etag_matches,
+    get_response_cache,
+    invalidate_content,
+    not_modified,
+    validator_headers,
+)
+from app.listener import get_listener
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, label_tenant, render_metrics
+from app.policy import get_policy_cache, invalidate_policy, tenant_workflow_async
+from app.published import public_cache_max_age
+from app.replicas import ConsistencyMiddleware, WriteConflict, get_replica_set, primary_reads
+from app.repo import check_event_cursor
+from app.repo_async import (
+    activate_policy_version,
     create_content_item,
+    create_content_items_batch,
+    create_draft_version,
+    create_policy_version,
     get_allowed_transitions,
     get_content_by_id,
-    insert_event,
+    get_content_validators,
+    get_draft_version,
+    get_latest_draft,
+    get_published_feed_version,
+    get_published_post,
+    get_state_histogram,
     list_content,
-    list_events,
+    list_content_events,
+    list_draft_versions,
+    list_policy_versions,
+    list_published_posts_versioned,
+    similar_content,
     transition_content,
+    transition_content_batch,
+    transition_state_batch,
+    typeahead_content,
 )
 from app.schemas import (
     AllowedTransitionsOut,
+    BatchTransitionIn,
+    BatchTransitionOut,
+    ContentBatchOut,
     ContentCreateIn,
     ContentListOut,
     ContentOut,
-    EventOut,
+    CountMode,
+    DraftIn,
+    DraftOut,
+    DraftVersionOut,
+    EventListOut,
+    PolicyVersionIn,
+    PolicyVersionOut,
+    PublicPostListOut,
+    PublicPostOut,
+    SearchMode,
+    SimilarContentOut,
+    SimilarSource,
     SortKey,
+    StateHistogramOut,
     TransitionIn,
     TransitionOut,
+    TypeaheadItemOut,
 )
-from app.tenant import resolve_tenant_id
+from app.stream import get_broadcaster, sse_events
+from app.tenant import invalidate_tenant, resolve_tenant_id_async, tenant_cache_stats
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Buffered event sink: started with the app, drained on shutdown.
+    sink = get_event_sink() if event_sink_mode() == "buffered" else None
+    if sink is not None:
+        sink.start()
+    # NOTIFY-invalidated caches subscribe now; they store nothing until their channel is live.
+    get_response_cache().start_listening()
+    get_policy_cache().start_listening()
+    try:
+        yield
+    finally:
+        if sink is not None:
+            await sink.stop()
+        if get_listener.cache_info().currsize:
+            await get_listener().stop()
+
+
+app = FastAPI(title="Blog Platform API", version="0.4.0", lifespan=lifespan)
+# Per-route latency histograms (tenant-labelled) for /metrics.
+app.add_middleware(MetricsMiddleware)
+# Read-your-writes token for replica reads (no-op without DATABASE_REPLICA_URLS).
+app.add_middleware(ConsistencyMiddleware)
 
-app = FastAPI(title="Blog Platform API", version="0.4.0")
+
+@app.exception_handler(WriteConflict)
+async def write_conflict_handler(request: Request, exc: WriteConflict):
+    # Deadlock / serialization failure that outlived replicas.run_write's retries.
+    return JSONResponse(status_code=409, content={"detail": str(exc)}, headers={"Retry-After": "1"})
 
 
 # -----------------------------
 # Dependencies
 # -----------------------------
 
-def tenant_id_dep(x_tenant_slug: str = Header(default=None, alias="X-Tenant-Slug")) -> str:
+async def _resolve_tenant(request: Request, slug: str | None) -> str:
     try:
-        engine = get_engine()
-        return resolve_tenant_id(engine, x_tenant_slug)
+        engine = get_async_engine()
+        tenant_id = await resolve_tenant_id_async(engine, slug)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Only a slug that resolved becomes the metrics `tenant` label.
+    label_tenant(request.scope, slug.strip())
+    return tenant_id
+
+
+async def tenant_id_dep(request: Request, x_tenant_slug: str = Header(default=None, alias="X-Tenant-Slug")) -> str:
+    return await _resolve_tenant(request, x_tenant_slug)
+
+
+async def stream_tenant_id_dep(
+    request: Request,
+    x_tenant_slug: str | None = Header(default=None, alias="X-Tenant-Slug"),
+    tenant: str | None = Query(default=None, max_length=200),
+) -> str:
+    # EventSource cannot set headers, so the stream also accepts ?tenant=<slug>.
+    return await _resolve_tenant(request, x_tenant_slug or tenant)
 
 
 # -----------------------------
@@ -47,41 +147,105 @@ def tenant_id_dep(x_tenant_slug: str = Header(default=None, alias="X-Tenant-Slug
 # -----------------------------
 
 @app.get("/healthz")
-def healthz():
+async def healthz():
     return {"ok": True}
 
 
 @app.get("/readyz")
-def readyz():
-    # Light readiness check: engine creation only (fast), DB connectivity is exercised on first request
-    _ = get_engine()
-    return {"ready": True}
+async def readyz():
+    # First call opens + warms the pool (db.warm_async_pool) so cold-start requests do not pay
+    # connection setup; later calls are one SELECT 1. 503 until the DB answers.
+    engine = get_async_engine()
+    try:
+        warmup = await warm_async_pool(engine)
+    except Exception as e:
+        return JSONResponse({"ready": False, "error": str(e), "pool": pool_stats(engine)}, status_code=503)
+    replicas = get_replica_set()
+    if replicas is None:
+        return {"ready": True, **warmup}
+    # A replica that is down does not make the instance unready: reads fall back to the primary.
+    for r in replicas.candidates():
+        try:
+            await warm_async_pool(r.engine)
+        except Exception:
+            replicas.mark_failed(r)
+    return {"ready": True, **warmup, "replicas": replicas.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Prometheus text exposition: query / route latency histograms, pool gauges (app.metrics).
+    return PlainTextResponse(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.get("/debug/dburl")
-def debug_dburl():
+async def debug_dburl():
     # No dependency on app.settings; always safe
     return JSONResponse(get_database_url_safe())
 
 
+@app.get("/debug/tenant-cache")
+async def debug_tenant_cache():
+    return tenant_cache_stats()
+
+
+@app.post("/debug/tenant-cache/invalidate")
+async def debug_tenant_cache_invalidate(slug: str | None = Query(default=None)):
+    # slug omitted => drop the whole cache
+    invalidate_tenant(slug)
+    return {"ok": True, "slug": slug}
+
+
+@app.get("/debug/event-sink")
+async def debug_event_sink():
+    return {"mode": event_sink_mode(), **get_event_sink().stats()}
+
+
+@app.get("/debug/response-cache")
+async def debug_response_cache():
+    return get_response_cache().stats()
+
+
+@app.get("/debug/policy-cache")
+async def debug_policy_cache():
+    return get_policy_cache().stats()
+
+
+@app.get("/debug/replicas")
+async def debug_replicas():
+    replicas = get_replica_set()
+    return replicas.stats() if replicas is not None else {"replicas": []}
+
+
+@app.get("/debug/event-stream")
+async def debug_event_stream():
+    return get_broadcaster().stats()
+
+
 # -----------------------------
 # Content
 # -----------------------------
 
 @app.post("/content", response_model=ContentOut)
-def create_content(payload: ContentCreateIn, tenant_id: str = Depends(tenant_id_dep)):
-    engine = get_engine()
+async def create_content(payload: ContentCreateIn, tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
 
-    item = create_content_item(engine, tenant_id, payload.title, payload.risk_tier)
+    if event_sink_mode() == "durable":
+        # content.created commits in the same statement as the row.
+        item = await create_content_item(engine, tenant_id, payload.title, payload.risk_tier, with_event=True)
+        invalidate_content(tenant_id, item["id"])
+        return item
 
-    insert_event(
-        engine,
+    item = await create_content_item(engine, tenant_id, payload.title, payload.risk_tier)
+    invalidate_content(tenant_id, item["id"])
+
+    # Buffered: the flusher batches it into a multi-row INSERT; no extra commit on this request.
+    await get_event_sink().emit(
         tenant_id=tenant_id,
         entity_type="content",
         entity_id=item["id"],
         event_type="content.created",
         payload={
-            "tenant_slug": "default",  # kept for now; later we can resolve actual slug
             "state": item["state"],
             "title": item["title"],
             "risk_tier": item["risk_tier"],
@@ -93,79 +257,440 @@ def create_content(payload: ContentCreateIn, tenant_id: str = Depends(tenant_id_
     return item
 
 
+@app.post("/content:batch", response_model=ContentBatchOut)
+async def create_content_batch(request: Request, tenant_id: str = Depends(tenant_id_dep)):
+    """
+    Bulk create. Body: {"items": [ContentCreateIn, ...]}, a bare JSON array, or
+    streamed NDJSON (Content-Type: application/x-ndjson), one item per line.
+    All valid items + their content.created events are written in one
+    transaction via COPY; invalid items are reported per index.
+    """
+    try:
+        items, errors = await parse_batch_body(request, ContentCreateIn)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    engine = get_async_engine()
+    results = await create_content_items_batch(engine, tenant_id, items)
+    for r in results:
+        if r["ok"]:
+            invalidate_content(tenant_id, r["id"])
+    results = sorted(results + errors, key=lambda r: r["index"])
+
+    created = sum(1 for r in results if r["ok"])
+    return {"created": created, "failed": len(results) - created, "results": results}
+
+
+@app.post("/content:transition", response_model=BatchTransitionOut)
+async def do_transition_batch(payload: BatchTransitionIn, tenant_id: str = Depends(tenant_id_dep)):
+    """
+    Bulk transitions: one lock query, in-memory workflow validation, one
+    set-based UPDATE + multi-row event INSERT. Per-item results.
+    """
+    engine = get_async_engine()
+    try:
+        if payload.items is not None:
+            results = await transition_content_batch(engine, tenant_id, [it.model_dump() for it in payload.items])
+        else:
+            results = await transition_state_batch(
+                engine, tenant_id, payload.where_state, payload.to_state, limit=payload.limit
+            )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    for r in results:
+        if r["ok"]:
+            invalidate_content(tenant_id, r["content_id"])
+    applied = sum(1 for r in results if r["ok"])
+    return {"applied": applied, "failed": len(results) - applied, "results": results}
+
+
 @app.get("/content", response_model=ContentListOut)
-def get_content_list(
+async def get_content_list(
     tenant_id: str = Depends(tenant_id_dep),
     limit: int = Query(default=20, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
     sort: SortKey = Query(default="created_at_desc"),
     q: str | None = Query(default=None, min_length=1, max_length=200),
+    cursor: str | None = Query(default=None, max_length=1000),
+    count: CountMode = Query(default="planned"),
+    search: SearchMode = Query(default="contains"),
+):
+    engine = get_async_engine()
+    try:
+        items, total, total_is_estimate, next_cursor = await list_content(
+            engine, tenant_id, limit=limit, offset=offset, sort=sort, q=q, cursor=cursor, count=count, search=search
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {
+        "items": items,
+        "limit": limit,
+        "offset": offset,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+    }
+
+
+# Live content.* events (SSE). Resumes from Last-Event-ID (or ?last_event_id= on first connect).
+@app.get("/content/events/stream")
+async def stream_content_events(
+    request: Request,
+    tenant_id: str = Depends(stream_tenant_id_dep),
+    entity_id: str | None = Query(default=None),
+    last_event_id_q: str | None = Query(default=None, alias="last_event_id", max_length=1000),
+    last_event_id: str | None = Header(default=None, alias="Last-Event-ID"),
+):
+    if entity_id is not None:
+        # Canonical form: the stream compares it with the event rows' ids as text.
+        entity_id = canonical_id(entity_id)
+        if entity_id is None:
+            raise HTTPException(status_code=400, detail="entity_id must be a UUID")
+
+    resume_from = last_event_id or last_event_id_q
+    if resume_from:
+        try:
+            check_event_cursor(resume_from)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    engine = get_async_engine()
+    return StreamingResponse(
+        sse_events(engine, tenant_id, entity_id, resume_from, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# Declared before /content/{content_id}: "typeahead" must not match as an id.
+@app.get("/content/typeahead", response_model=list[TypeaheadItemOut])
+async def get_content_typeahead(
+    tenant_id: str = Depends(tenant_id_dep),
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default=10, ge=1, le=50),
 ):
-    engine = get_engine()
-    items, total = list_content(engine, tenant_id, limit=limit, offset=offset, sort=sort, q=q)
-    return {"items": items, "limit": limit, "offset": offset, "total": total}
+    engine = get_async_engine()
+    return await typeahead_content(engine, tenant_id, q, limit=limit)
+
+
+# Served from content_state_counts.
+@app.get("/content/stats/states", response_model=StateHistogramOut)
+async def get_content_state_histogram(tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
+    return await get_state_histogram(engine, tenant_id)
+
+
+async def _conditional_content_read(
+    response: Response,
+    tenant_id: str,
+    content_id: str,
+    resource: tuple,
+    load,
+    if_none_match: str | None,
+    if_modified_since: str | None,
+):
+    """
+    Serve one content resource through the response cache (app.http_cache):
+      cached          -> validators + body from memory, no DB
+      not cached      -> one validator query; 304 right there, else load() and cache
+    404 when the item does not exist.
+    """
+    cid = canonical_id(content_id)
+    if cid is None:
+        return await load()
+
+    cache = get_response_cache()
+    key = (str(tenant_id), cid, *resource)
+    hit = cache.get(key)
+    if hit is MISSING:
+        generation = cache.generation(str(tenant_id), cid)
+        # Fills read the primary: a lagging replica could cache a pre-invalidation body for the
+        # whole TTL, and validators and body must come from the same server for the ETag to match.
+        with primary_reads():
+            validators = await get_content_validators(get_async_engine(), tenant_id, cid)
+            if validators is None:
+                raise HTTPException(status_code=404, detail="Not Found")
+            etag, last_modified = content_etag(validators, resource[0]), content_last_modified(validators)
+            if not_modified(if_none_match, if_modified_since, etag, last_modified):
+                return Response(status_code=304, headers=validator_headers(etag, last_modified))
+            body = await load()
+        cache.put(key, (etag, last_modified, body), generation)
+    else:
+        etag, last_modified, body = hit
+        if not_modified(if_none_match, if_modified_since, etag, last_modified):
+            return Response(status_code=304, headers=validator_headers(etag, last_modified))
+
+    response.headers.update(validator_headers(etag, last_modified))
+    return body
 
 
 @app.get("/content/{content_id}", response_model=ContentOut)
-def get_content_one(content_id: str, tenant_id: str = Depends(tenant_id_dep)):
-    engine = get_engine()
-    item = get_content_by_id(engine, tenant_id, content_id)
-    if not item:
-        raise HTTPException(status_code=404, detail="Not Found")
-    return item
+async def get_content_one(
+    content_id: str,
+    response: Response,
+    tenant_id: str = Depends(tenant_id_dep),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    if_modified_since: str | None = Header(default=None, alias="If-Modified-Since"),
+):
+    engine = get_async_engine()
+
+    async def load():
+        item = await get_content_by_id(engine, tenant_id, content_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return item
+
+    return await _conditional_content_read(
+        response, tenant_id, content_id, ("item",), load, if_none_match, if_modified_since
+    )
 
 
 @app.get("/content/{content_id}/allowed", response_model=AllowedTransitionsOut)
-def allowed_transitions(content_id: str, tenant_id: str = Depends(tenant_id_dep)):
-    engine = get_engine()
+async def allowed_transitions(
+    content_id: str,
+    response: Response,
+    tenant_id: str = Depends(tenant_id_dep),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    if_modified_since: str | None = Header(default=None, alias="If-Modified-Since"),
+):
+    engine = get_async_engine()
     try:
-        return get_allowed_transitions(engine, tenant_id, content_id)
+        # The answer depends on the tenant's active policy: part of the cache key and the ETag.
+        policy_version, _ = await tenant_workflow_async(engine, tenant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def load():
+        try:
+            return await get_allowed_transitions(engine, tenant_id, content_id)
+        except ValueError as e:
+            # content not found or invalid rule request
+            msg = str(e)
+            if "not found" in msg.lower():
+                raise HTTPException(status_code=404, detail="Not Found")
+            raise HTTPException(status_code=400, detail=msg)
+
+    return await _conditional_content_read(
+        response,
+        tenant_id,
+        content_id,
+        (f"allowed:{policy_version or ''}",),
+        load,
+        if_none_match,
+        if_modified_since,
+    )
+
+
+@app.post("/content/{content_id}/drafts", response_model=DraftOut)
+async def post_draft(content_id: str, payload: DraftIn, tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
+    # Snapshot every DRAFT_SNAPSHOT_EVERY versions, deltas in between (app.drafts).
+    try:
+        return await create_draft_version(
+            engine,
+            tenant_id,
+            content_id,
+            payload.body_md,
+            title=payload.title,
+            citations=payload.citations,
+            expected_version=payload.expected_version,
+            snapshot_every=draft_snapshot_every(),
+        )
     except ValueError as e:
-        # content not found or invalid rule request
         msg = str(e)
+        if "conflict" in msg.lower():
+            raise HTTPException(status_code=409, detail=msg)
         if "not found" in msg.lower():
             raise HTTPException(status_code=404, detail="Not Found")
         raise HTTPException(status_code=400, detail=msg)
 
 
+@app.get("/content/{content_id}/drafts", response_model=list[DraftVersionOut])
+async def get_drafts(content_id: str, tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
+    return await list_draft_versions(engine, tenant_id, content_id)
+
+
+@app.get("/content/{content_id}/drafts/latest", response_model=DraftOut)
+async def get_draft_latest(content_id: str, tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
+    draft = await get_latest_draft(engine, tenant_id, content_id)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return draft
+
+
+@app.get("/content/{content_id}/drafts/{version}", response_model=DraftOut)
+async def get_draft(content_id: str, version: int, tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
+    draft = await get_draft_version(engine, tenant_id, content_id, version)
+    if not draft:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return draft
+
+
+@app.get("/content/{content_id}/similar", response_model=SimilarContentOut)
+async def get_similar_content(
+    content_id: str,
+    tenant_id: str = Depends(tenant_id_dep),
+    source: SimilarSource = Query(default="intake"),
+    limit: int = Query(default=10, ge=1, le=100),
+):
+    engine = get_async_engine()
+    # HNSW nearest neighbours of the item's stored embedding (filled by the worker's backfill job).
+    try:
+        return await similar_content(engine, tenant_id, content_id, source=source, limit=limit)
+    except ValueError as e:
+        if "not found" in str(e).lower():
+            raise HTTPException(status_code=404, detail="Not Found")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @app.post("/content/{content_id}/transition", response_model=TransitionOut)
-def do_transition(content_id: str, payload: TransitionIn, tenant_id: str = Depends(tenant_id_dep)):
-    engine = get_engine()
+async def do_transition(content_id: str, payload: TransitionIn, tenant_id: str = Depends(tenant_id_dep)):
+    engine = get_async_engine()
+    # One statement: lock, validate, update, append content.transitioned, bump counters.
     try:
-        result = transition_content(engine, tenant_id, content_id, payload.to_state)
+        result = await transition_content(
+            engine, tenant_id, content_id, payload.to_state, expected_from_state=payload.expected_from_state
+        )
+        invalidate_content(tenant_id, result["content_id"])
+        return result
     except ValueError as e:
         msg = str(e)
-        if "not allowed" in msg.lower():
+        if "not allowed" in msg.lower() or "conflict" in msg.lower():
             raise HTTPException(status_code=409, detail=msg)
         if "not found" in msg.lower():
             raise HTTPException(status_code=404, detail="Not Found")
         raise HTTPException(status_code=400, detail=msg)
 
-    insert_event(
-        engine,
-        tenant_id=tenant_id,
-        entity_type="content",
-        entity_id=content_id,
-        event_type="content.transitioned",
-        payload={
-            "tenant_slug": "default",
-            "from_state": result["from_state"],
-            "to_state": result["to_state"],
-            "risk_tier": result["risk_tier"],
-        },
-        actor_type="system",
-        actor_id=None,
+
+@app.get("/content/{content_id}/events", response_model=EventListOut)
+async def get_content_events(
+    content_id: str,
+    response: Response,
+    tenant_id: str = Depends(tenant_id_dep),
+    limit: int = Query(default=100, ge=1, le=500),
+    cursor: str | None = Query(default=None, max_length=1000),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+    if_modified_since: str | None = Header(default=None, alias="If-Modified-Since"),
+):
+    engine = get_async_engine()
+
+    async def load():
+        # If content does not exist, return 404 (optional strictness)
+        item = await get_content_by_id(engine, tenant_id, content_id)
+        if not item:
+            raise HTTPException(status_code=404, detail="Not Found")
+        try:
+            items, next_cursor = await list_content_events(engine, tenant_id, content_id, limit=limit, cursor=cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"items": items, "limit": limit, "next_cursor": next_cursor}
+
+    return await _conditional_content_read(
+        response, tenant_id, content_id, ("events", limit, cursor), load, if_none_match, if_modified_since
     )
 
-    return result
 
+# -----------------------------
+# Policies (tier-aware transition gating, see app.policy)
+# -----------------------------
+
+@app.get("/policies", response_model=list[PolicyVersionOut])
+async def get_policies(tenant_id: str = Depends(tenant_id_dep)):
+    return await list_policy_versions(get_async_engine(), tenant_id)
+
+
+@app.post("/policies", response_model=PolicyVersionOut)
+async def post_policy(payload: PolicyVersionIn, tenant_id: str = Depends(tenant_id_dep)):
+    try:
+        out = await create_policy_version(
+            get_async_engine(), tenant_id, payload.version, payload.policy, activate=payload.activate
+        )
+    except ValueError as e:
+        msg = str(e)
+        if "conflict" in msg.lower():
+            raise HTTPException(status_code=409, detail=msg)
+        raise HTTPException(status_code=400, detail=msg)
+    if payload.activate:
+        invalidate_policy(tenant_id)
+        invalidate_content(tenant_id)
+    return out
+
+
+@app.post("/policies/{version}/activate", response_model=PolicyVersionOut)
+async def post_policy_activate(version: str, tenant_id: str = Depends(tenant_id_dep)):
+    try:
+        out = await activate_policy_version(get_async_engine(), tenant_id, version)
+    except ValueError as e:
+        msg = str(e)
+        if "not found" in msg.lower():
+            raise HTTPException(status_code=404, detail="Not Found")
+        raise HTTPException(status_code=400, detail=msg)
+    # Other processes follow via the policy_events NOTIFY.
+    invalidate_policy(tenant_id)
+    invalidate_content(tenant_id)
+    return out
 
-@app.get("/content/{content_id}/events", response_model=list[EventOut])
-def get_content_events(content_id: str, tenant_id: str = Depends(tenant_id_dep)):
-    engine = get_engine()
-    # If content does not exist, return 404 (optional strictness)
-    item = get_content_by_id(engine, tenant_id, content_id)
-    if not item:
+
+# -----------------------------
+# Public feed (published_posts only; never touches the workflow tables)
+# -----------------------------
+
+async def public_tenant_id(request: Request, tenant: str) -> str:
+    try:
+        tenant_id = await resolve_tenant_id_async(get_async_engine(), tenant)
+    except ValueError:
         raise HTTPException(status_code=404, detail="Not Found")
+    label_tenant(request.scope, tenant.strip())
+    return tenant_id
+
+
+def _cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={public_cache_max_age()}"}
+
 
-    return list_events(engine, tenant_id, entity_type="content", entity_id=content_id)
+@app.get("/public/{tenant}/posts", response_model=PublicPostListOut)
+async def get_public_posts(
+    response: Response,
+    tenant_id: str = Depends(public_tenant_id),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None, max_length=1000),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+):
+    engine = get_async_engine()
+    # The feed version changes on every publish/retire of the tenant: one PK lookup answers a revalidation.
+    etag = f'W/"{await get_published_feed_version(engine, tenant_id)}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+    try:
+        # Version and page from one transaction on one server (a replica is fine): the page is never
+        # older than the version it is tagged with.
+        version, items, next_cursor = await list_published_posts_versioned(
+            engine, tenant_id, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    etag = f'W/"{version}"'
+    response.headers.update(_cache_headers(etag))
+    return {"items": items, "limit": limit, "next_cursor": next_cursor}
+
+
+@app.get("/public/{tenant}/posts/{slug}", response_model=PublicPostOut)
+async def get_public_post(
+    slug: str,
+    response: Response,
+    tenant_id: str = Depends(public_tenant_id),
+    if_none_match: str | None = Header(default=None, alias="If-None-Match"),
+):
+    engine = get_async_engine()
+    post = await get_published_post(engine, tenant_id, slug)
+    if not post:
+        raise HTTPException(status_code=404, detail="Not Found")
+    etag = f'"{post["etag"]}"'
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_cache_headers(etag))
+    response.headers.update(_cache_headers(etag))
+    return post
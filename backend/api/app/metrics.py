@@ -0,0 +1,339 @@
+"""
+In-process metrics in Prometheus text format (GET /metrics).
+
+Three sources, all cheap enough to stay on in production (a perf_counter
+pair, a dict lookup and a bisect under a lock per observation):
+
+  db_query_duration_seconds{engine, query}      SQLAlchemy before/after_cursor_execute
+  db_query_errors_total{engine, query}          handle_error
+  db_pool_checkout_seconds{engine}              time to get a connection from the pool
+  db_pool_{size,checked_out,overflow}{engine}   pool gauges, read at scrape time
+  http_request_duration_seconds{method, route, status, tenant}
+                                                ASGI middleware (MetricsMiddleware)
+
+Query names: a statement can name itself with
+    text("...").execution_options(query_name="list_content.total")
+otherwise it is named after the app.* function that ran it (`_tx` suffix
+dropped), e.g. `get_content_by_id`. Route labels are the route templates
+(`/content/{content_id}`), never raw paths. The tenant label is the slug the
+request's tenant dependency resolved (label_tenant), never a raw header, so
+unknown slugs stay unlabelled; tenants beyond METRICS_MAX_TENANTS distinct
+slugs are reported as "other".
+
+METRICS_ENABLED=false turns the hooks off (the endpoint then serves
+whatever was registered, i.e. nothing but the gauges).
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds. DB queries are mostly sub-millisecond to tens of ms; requests up to a few seconds.
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+REQUEST_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names: Tuple[str, ...], values: Labels, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt(v: float) -> str:
+    return repr(float(v)) if v != int(v) else str(int(v))
+
+
+# ----------------------------
+# Metric types
+# ----------------------------
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...], buckets: Tuple[float, ...]) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        self._le = [f'le="{b}"' for b in self.buckets] + ['le="+Inf"']
+        self._lock = threading.Lock()
+        # labels -> [per-bucket counts (last = +Inf), sum]
+        self._series: Dict[Labels, List[Any]] = {}
+
+    def observe(self, value: float, labels: Labels) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            s[0][i] += 1
+            s[1] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = [(k, list(v[0]), v[1]) for k, v in self._series.items()]
+        for labels, counts, total in sorted(series):
+            cum = 0
+            for le, n in zip(self._le, counts):
+                cum += n
+                out.append(f"{self.name}_bucket{_label_str(self.labelnames, labels, le)} {cum}")
+            out.append(f"{self.name}_sum{_label_str(self.labelnames, labels)} {_fmt(total)}")
+            out.append(f"{self.name}_count{_label_str(self.labelnames, labels)} {cum}")
+        return out
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...]) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, labels: Labels, n: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + n
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            values = sorted(self._values.items())
+        out.extend(f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in values)
+        return out
+
+
+class GaugeFunc:
+    """
+    Gauge whose samples are produced by `fn` at scrape time.
+    """
+
+    def __init__(
+        self, name: str, help_text: str, labelnames: Tuple[str, ...], fn: Callable[[], Iterable[Tuple[Labels, float]]]
+    ) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self.fn = fn
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        out.extend(f"{self.name}{_label_str(self.labelnames, k)} {_fmt(v)}" for k, v in self.fn())
+        return out
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: List[Any] = []
+
+    def register(self, metric: Any) -> Any:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for m in self.metrics:
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+QUERY_DURATION = REGISTRY.register(
+    Histogram("db_query_duration_seconds", "SQL statement latency per named repo query.", ("engine", "query"), QUERY_BUCKETS)
+)
+QUERY_ERRORS = REGISTRY.register(Counter("db_query_errors_total", "SQL statements that raised.", ("engine", "query")))
+POOL_CHECKOUT = REGISTRY.register(
+    Histogram(
+        "db_pool_checkout_seconds",
+        "Time to obtain a pooled connection (waiting for a free one or opening an overflow one).",
+        ("engine",),
+        QUERY_BUCKETS,
+    )
+)
+REQUEST_DURATION = REGISTRY.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency per route template.",
+        ("method", "route", "status", "tenant"),
+        REQUEST_BUCKETS,
+    )
+)
+
+# engine label -> pool, for the scrape-time gauges
+_POOLS: Dict[str, Any] = {}
+
+
+def _pool_samples(attr: str) -> Callable[[], Iterable[Tuple[Labels, float]]]:
+    def samples() -> Iterable[Tuple[Labels, float]]:
+        for name, pool in sorted(_POOLS.items()):
+            yield (name,), float(getattr(pool, attr)())
+
+    return samples
+
+
+REGISTRY.register(GaugeFunc("db_pool_size", "Configured persistent connections.", ("engine",), _pool_samples("size")))
+REGISTRY.register(
+    GaugeFunc("db_pool_checked_out", "Connections currently checked out.", ("engine",), _pool_samples("checkedout"))
+)
+REGISTRY.register(
+    GaugeFunc(
+        "db_pool_overflow",
+        "Overflow connections currently open (negative: persistent slots not opened yet).",
+        ("engine",),
+        _pool_samples("overflow"),
+    )
+)
+
+
+@lru_cache(maxsize=1)
+def metrics_enabled() -> bool:
+    return os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "y")
+
+
+@lru_cache(maxsize=1)
+def _max_tenants() -> int:
+    return int(os.getenv("METRICS_MAX_TENANTS", "200"))
+
+
+# ----------------------------
+# SQLAlchemy hooks
+# ----------------------------
+
+def _caller_query_name() -> str:
+    # The innermost app.* frame that is not db/metrics plumbing names the query.
+    f = sys._getframe(2)
+    while f is not None:
+        mod = f.f_globals.get("__name__", "")
+        if mod.startswith("app.") and mod not in ("app.metrics", "app.db", "app.repo_async"):
+            name = f.f_code.co_name
+            return name[:-3] if name.endswith("_tx") else name
+        f = f.f_back
+    return "other"
+
+
+def instrument_engine(engine: Any, label: str) -> None:
+    """
+    Attach the query hooks to a sync Engine (for an AsyncEngine pass
+    `.sync_engine`) and register its pool for the gauges.
+    """
+    _POOLS[label] = engine.pool
+    engine.pool.metrics_label = label
+    if not metrics_enabled():
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metrics_t0 = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        t0 = getattr(context, "_metrics_t0", None)
+        if t0 is None:
+            return
+        name = context.execution_options.get("query_name") or _caller_query_name()
+        QUERY_DURATION.observe(time.perf_counter() - t0, (label, name))
+
+    @event.listens_for(engine, "handle_error")
+    def _error(ctx):
+        context = ctx.execution_context
+        name = (context.execution_options.get("query_name") if context is not None else None) or _caller_query_name()
+        QUERY_ERRORS.inc((label, name))
+
+
+class _TimedPoolMixin:
+    # Overridden per instance by instrument_engine() (several async engines: primary + replicas).
+    metrics_label = "db"
+
+    def _do_get(self):
+        if not metrics_enabled():
+            return super()._do_get()
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_CHECKOUT.observe(time.perf_counter() - t0, (self.metrics_label,))
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    metrics_label = "sync"
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    metrics_label = "async"
+
+
+# ----------------------------
+# HTTP middleware
+# ----------------------------
+
+def label_tenant(scope: Dict[str, Any], slug: str) -> None:
+    """
+    Mark the request as belonging to a resolved (known) tenant; read back by MetricsMiddleware.
+    """
+    scope.setdefault("state", {})["metrics_tenant"] = slug
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware (no BaseHTTPMiddleware task/stream overhead).
+    Duration covers the full response body, so for SSE it is the stream's lifetime.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+        self._tenants: set = set()
+
+    def _tenant(self, scope: Dict[str, Any]) -> str:
+        slug: Optional[str] = (scope.get("state") or {}).get("metrics_tenant")
+        if not slug:
+            return ""
+        if slug in self._tenants:
+            return slug
+        if len(self._tenants) < _max_tenants():
+            self._tenants.add(slug)
+            return slug
+        return "other"
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not metrics_enabled():
+            await self.app(scope, receive, send)
+            return
+
+        t0 = time.perf_counter()
+        status = ["500"]
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.observe(
+                time.perf_counter() - t0, (scope.get("method", ""), path, status[0], self._tenant(scope))
+            )
+
+
+def render_metrics() -> str:
+    return REGISTRY.render()
@@ -0,0 +1,42 @@
+"""
+public.events partition maintenance. The worker creates upcoming partitions
+on a schedule (events.ensure_partitions job); this CLI does it by hand and
+handles retention.
+
+Run from backend/api:
+    python -m app.partitions --months-ahead 3
+    python -m app.partitions --keep-months 12            # detach older partitions
+    python -m app.partitions --keep-months 12 --drop     # ...and drop them
+
+Detached partitions stay around as plain tables (events_yYYYYmMM) until
+dropped, so they can be dumped/archived first.
+"""
+
+from __future__ import annotations
+
+import argparse
+
+from app.db import get_engine
+from app.repo import detach_event_partitions, ensure_event_partitions
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Maintain monthly partitions of public.events")
+    ap.add_argument("--months-ahead", type=int, default=3, help="create partitions up to N months ahead")
+    ap.add_argument("--keep-months", type=int, default=None, help="detach partitions older than N full months")
+    ap.add_argument("--drop", action="store_true", help="drop detached partitions instead of keeping them")
+    args = ap.parse_args()
+
+    engine = get_engine()
+
+    names = ensure_event_partitions(engine, months_ahead=args.months_ahead)
+    print(f"partitions present: {', '.join(names)}")
+
+    if args.keep_months is not None:
+        detached = detach_event_partitions(engine, args.keep_months, drop=args.drop)
+        verb = "dropped" if args.drop else "detached"
+        print(f"{verb}: {', '.join(detached) if detached else '(none)'}")
+
+
+if __name__ == "__main__":
+    main()
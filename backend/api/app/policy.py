@@ -0,0 +1,254 @@
+"""
+Tenant workflow policies (public.policy_versions), compiled and cached.
+
+A policy is a JSON document that tightens the shared workflow graph per
+risk tier:
+
+    {
+      "transitions": {"DRAFTED": ["VALIDATED", "RETIRED"], ...},   optional, a subset of the default graph
+      "deny": {"3": [["READY_TO_PUBLISH", "PUBLISHED"], ["*", "DEFERRED"]]}
+    }
+
+`transitions` keeps only the listed edges (a state it omits has none);
+an edge the default graph does not have is rejected, so a policy can
+never open a path around review. `deny` removes edges for one tier only
+("*" = from any state). It is
+compiled once per (tenant, version) into a workflow.CompiledWorkflow, so
+evaluating a transition is the same bitmask lookup as without a policy.
+A tenant without an active version uses workflow.WORKFLOW.
+
+Cached per process:
+  - tenant_id -> (active version, compiled workflow), a TTLCache entry
+    filled from the active row on first use (negative entries: no active
+    policy)
+  - (tenant_id, version) -> compiled workflow: versions are immutable, so
+    re-activating an older version does not compile it again
+The tenant entry (never the per-version compiles) is dropped on activation
+in this process and, for other processes, on the `policy_events` NOTIFY
+every policy_versions write sends
+(app.listener, subscribed at app startup; cleared whenever the channel
+becomes live). Tenant entries are only stored while that channel is
+LISTENed on a live connection, so without a listener (scripts, the sync
+engine, the window before the first connect) every call reads the active
+row; only the per-version compile is reused. Fills that raced with an
+invalidation, or that read a replica, are not stored either.
+POLICY_CACHE_TTL_SECONDS is a backstop.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from app.cache import MISSING, TTLCache
+from app.workflow import RISK_TIERS, STATES, WORKFLOW, CompiledWorkflow, WorkflowError, compile_workflow
+
+log = logging.getLogger(__name__)
+
+_POLICY_KEYS = {"transitions", "deny"}
+
+# (active version or None, compiled workflow)
+TenantWorkflow = Tuple[Optional[str], CompiledWorkflow]
+
+
+def compile_policy(policy: Mapping[str, Any]) -> CompiledWorkflow:
+    """
+    Policy JSON -> CompiledWorkflow. Raises WorkflowError on anything it
+    does not understand (unknown keys, states or tiers), so a typo cannot
+    silently allow a transition.
+    """
+    if not isinstance(policy, Mapping):
+        raise WorkflowError("Policy must be a JSON object")
+    unknown = set(policy) - _POLICY_KEYS
+    if unknown:
+        raise WorkflowError(f"Unknown policy keys: {sorted(unknown)}")
+
+    raw = policy.get("transitions")
+    if raw is None:
+        transitions = {s: WORKFLOW.allowed_from(s, RISK_TIERS[0]) for s in STATES}
+    elif not isinstance(raw, Mapping):
+        raise WorkflowError("Policy 'transitions' must map a state to a list of states")
+    else:
+        transitions = {}
+        for s_from, targets in raw.items():
+            if isinstance(targets, (str, bytes)) or not isinstance(targets, (list, tuple)):
+                raise WorkflowError(f"Policy 'transitions' must map a state to a list of states: {s_from!r}")
+            s_from = str(s_from).strip().upper()
+            for s_to in targets:
+                s_to = str(s_to).strip().upper()
+                # Policies only tighten: the default graph is the same for every tier.
+                if s_from not in STATES or s_to not in STATES:
+                    raise WorkflowError(f"Unknown state in policy transition: {s_from} -> {s_to}")
+                if not WORKFLOW.is_allowed(s_from, s_to, RISK_TIERS[0]):
+                    raise WorkflowError(f"Policy transition not in the workflow graph: {s_from} -> {s_to}")
+                transitions.setdefault(s_from, []).append(s_to)
+
+    denied: Dict[int, List[Tuple[str, str]]] = {}
+    deny = policy.get("deny") or {}
+    if not isinstance(deny, Mapping):
+        raise WorkflowError("Policy 'deny' must map a risk tier to [from_state, to_state] pairs")
+    for tier_key, edges in deny.items():
+        try:
+            tier = int(tier_key)
+        except (TypeError, ValueError):
+            raise WorkflowError(f"Unknown risk tier in policy: {tier_key}")
+        if tier not in RISK_TIERS:
+            raise WorkflowError(f"Unknown risk tier in policy: {tier_key}")
+        for edge in edges or ():
+            if not isinstance(edge, (list, tuple)) or len(edge) != 2:
+                raise WorkflowError(f"Policy deny entries must be [from_state, to_state] pairs: {edge!r}")
+            s_from, s_to = (str(s).strip().upper() for s in edge)
+            sources = STATES if s_from == "*" else [s_from]
+            denied.setdefault(tier, []).extend((s, s_to) for s in sources)
+
+    return compile_workflow(transitions, denied)
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+
+class PolicyCache:
+    def __init__(self, active: TTLCache, compiled_max_size: int = 256) -> None:
+        self.active = active
+        self._compiled: Dict[Tuple[str, str], CompiledWorkflow] = {}
+        self._compiled_max_size = max(1, compiled_max_size)
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._listener: Any = None
+        self.compiles = 0
+        self.skipped_fills = 0
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, tenant_id: str) -> Any:
+        """
+        (version, workflow) for the tenant, or MISSING.
+        """
+        found, is_negative, value = self.active.lookup(str(tenant_id))
+        if not found:
+            return MISSING
+        return (None, WORKFLOW) if is_negative else value
+
+    def compiled(self, tenant_id: str, version: str, policy: Mapping[str, Any]) -> CompiledWorkflow:
+        key = (str(tenant_id), version)
+        wf = self._compiled.get(key)
+        if wf is None:
+            wf = compile_policy(policy)
+            with self._lock:
+                if len(self._compiled) >= self._compiled_max_size:
+                    self._compiled.clear()
+                self._compiled[key] = wf
+                self.compiles += 1
+        return wf
+
+    def put(self, tenant_id: str, entry: TenantWorkflow, generation: int) -> None:
+        """
+        Store unless an invalidation happened since `generation` was read, or
+        policy_events is not live (another process's activation would be missed).
+        """
+        if not self.listening:
+            self.skipped_fills += 1
+            return
+        with self._lock:
+            if self._generation != generation:
+                self.skipped_fills += 1
+                return
+            if entry[0] is None:
+                self.active.set_negative(str(tenant_id))
+            else:
+                self.active.set(str(tenant_id), entry)
+
+    def invalidate(self, tenant_id: str) -> None:
+        # Only the active entry: versions are immutable, so their compiles stay valid.
+        with self._lock:
+            self._generation += 1
+        self.active.invalidate(str(tenant_id))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+        self.active.clear()
+
+    def _on_policy_event(self, payload: str) -> None:
+        try:
+            msg = json.loads(payload)
+            self.invalidate(msg["tenant_id"])
+        except Exception:
+            log.warning("policy cache: unparseable policy_events payload, clearing")
+            self.clear()
+            return
+        # /content/{id}/allowed responses embed the tenant's policy.
+        from app.http_cache import invalidate_content
+
+        invalidate_content(msg["tenant_id"])
+
+    @property
+    def listening(self) -> bool:
+        return self._listener is not None and self._listener.is_listening("policy_events")
+
+    def start_listening(self) -> None:
+        """
+        Subscribe to `policy_events` (app startup, on the event loop).
+        """
+        if self._listener is not None:
+            return
+        from app.listener import get_listener
+
+        self._listener = get_listener()
+        # clear() bumps the generation: fills read before the channel was live are discarded.
+        self._listener.listen("policy_events", self._on_policy_event, on_active=self.clear)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.active.stats(),
+            "compiled": len(self._compiled),
+            "compiles": self.compiles,
+            "skipped_fills": self.skipped_fills,
+            "listening": self.listening,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_policy_cache() -> PolicyCache:
+    """
+    Process-wide policy cache.
+
+    Env knobs (read once):
+      POLICY_CACHE_MAX_SIZE     (default 1024 tenants)
+      POLICY_CACHE_TTL_SECONDS  (default 300; also used for "no active policy"; backstop to the NOTIFY)
+    """
+    from app.db import _load_env_once
+
+    _load_env_once()
+    ttl = float(os.getenv("POLICY_CACHE_TTL_SECONDS", "300"))
+    return PolicyCache(
+        TTLCache(
+            max_size=int(os.getenv("POLICY_CACHE_MAX_SIZE", "1024")),
+            ttl_seconds=ttl,
+            negative_ttl_seconds=ttl,
+        )
+    )
+
+
+def invalidate_policy(tenant_id: str) -> None:
+    get_policy_cache().invalidate(tenant_id)
+
+
+async def tenant_workflow_async(engine: Any, tenant_id: str) -> TenantWorkflow:
+    """
+    (active version, compiled workflow) without a DB round trip when cached.
+    """
+    entry = get_policy_cache().get(str(tenant_id))
+    if entry is not MISSING:
+        return entry
+    from app import repo
+    from app.replicas import run_read
+
+    return await run_read(engine, repo.tenant_workflow_tx, tenant_id)
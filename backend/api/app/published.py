@@ -0,0 +1,242 @@
+"""
+Rendering for the published feed (public.published_posts).
+
+When a transition reaches PUBLISHED, repo.refresh_published_feed_tx
+renders the latest draft once, here, and stores the result; public reads
+serve the stored HTML as is.
+
+The markdown subset is deliberately small and safe: every piece of input
+text is HTML-escaped, and only these constructs become markup:
+    # headings, paragraphs, - / 1. lists, > quotes, ``` fences, ---,
+    `code`, **bold**, *italic*, [text](url)
+Links keep only http(s)/mailto/relative targets; anything else renders as
+its text.
+
+Posts already PUBLISHED before the published_posts migration (or after a
+renderer change) are re-rendered by:
+    python -m app.published --rebuild [--tenant <slug>]
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+SUMMARY_MAX_CHARS = 280
+SLUG_MAX_CHARS = 80
+_WORDS_PER_MINUTE = 230
+
+
+@lru_cache(maxsize=1)
+def public_cache_max_age() -> int:
+    """
+    Cache-Control max-age (seconds) for the public feed; clients and CDNs
+    revalidate with If-None-Match afterwards.
+    """
+    return max(0, int(os.getenv("PUBLIC_CACHE_MAX_AGE", "60")))
+
+
+_FENCE_RE = re.compile(r"^```\s*([\w+-]*)\s*$")
+_HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_UL_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+_OL_RE = re.compile(r"^\s*\d{1,9}[.)]\s+(.*)$")
+_HR_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+_QUOTE_RE = re.compile(r"^\s*>\s?(.*)$")
+
+_CODE_SPAN_RE = re.compile(r"`([^`\n]+)`")
+_LINK_RE = re.compile(r"\[([^\]\n]+)\]\(([^)\s]+)\)")
+_BOLD_RE = re.compile(r"\*\*(?=\S)(.+?)(?<=\S)\*\*")
+_ITALIC_RE = re.compile(r"(?<![*\w])\*(?=\S)([^*]+?)(?<=\S)\*(?![*\w])")
+_TOKEN_RE = re.compile("\x00(\\d+)\x00")
+_SAFE_URL_RE = re.compile(r"^(https?://|mailto:|/(?!/)|#)", re.IGNORECASE)
+
+
+def _inline(text: str) -> str:
+    # Code spans and links become placeholders first, so emphasis never
+    # rewrites their contents (or an href).
+    held: List[str] = []
+
+    def hold(markup: str) -> str:
+        held.append(markup)
+        return f"\x00{len(held) - 1}\x00"
+
+    text = text.replace("\x00", "")
+    text = _CODE_SPAN_RE.sub(lambda m: hold(f"<code>{html.escape(m.group(1))}</code>"), text)
+
+    def link(m: re.Match) -> str:
+        label, url = m.group(1), m.group(2)
+        if not _SAFE_URL_RE.match(url):
+            return hold(_emphasis(html.escape(label)))
+        return hold(f'<a href="{html.escape(url, quote=True)}">{_emphasis(html.escape(label))}</a>')
+
+    text = _LINK_RE.sub(link, text)
+    out = _emphasis(html.escape(text))
+    return _TOKEN_RE.sub(lambda m: held[int(m.group(1))], out)
+
+
+def _emphasis(escaped: str) -> str:
+    escaped = _BOLD_RE.sub(r"<strong>\1</strong>", escaped)
+    return _ITALIC_RE.sub(r"<em>\1</em>", escaped)
+
+
+def render_markdown(body_md: str) -> str:
+    """
+    Markdown (the subset above) -> HTML fragment.
+    """
+    lines = (body_md or "").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    out: List[str] = []
+    para: List[str] = []
+    items: List[str] = []
+    list_tag = ""
+    quote: List[str] = []
+
+    def flush() -> None:
+        nonlocal list_tag
+        if para:
+            out.append(f"<p>{_inline(' '.join(para))}</p>")
+            para.clear()
+        if items:
+            out.append(f"<{list_tag}>" + "".join(f"<li>{_inline(i)}</li>" for i in items) + f"</{list_tag}>")
+            items.clear()
+            list_tag = ""
+        if quote:
+            out.append(f"<blockquote>{render_markdown(chr(10).join(quote))}</blockquote>")
+            quote.clear()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        fence = _FENCE_RE.match(line.strip())
+        if fence:
+            flush()
+            code: List[str] = []
+            i += 1
+            while i < len(lines) and not _FENCE_RE.match(lines[i].strip()):
+                code.append(lines[i])
+                i += 1
+            lang = f' class="language-{fence.group(1)}"' if fence.group(1) else ""
+            out.append(f"<pre><code{lang}>{html.escape(chr(10).join(code))}</code></pre>")
+            i += 1
+            continue
+
+        q = _QUOTE_RE.match(line)
+        if quote and not q:
+            flush()
+
+        if not line.strip():
+            flush()
+        elif q:
+            if not quote:
+                flush()
+            quote.append(q.group(1))
+        elif _HR_RE.match(line):
+            flush()
+            out.append("<hr>")
+        elif h := _HEADING_RE.match(line):
+            flush()
+            level = len(h.group(1))
+            out.append(f"<h{level}>{_inline(h.group(2))}</h{level}>")
+        elif (m := _UL_RE.match(line)) or (m := _OL_RE.match(line)):
+            tag = "ul" if _UL_RE.match(line) else "ol"
+            if para or (list_tag and list_tag != tag):
+                flush()
+            list_tag = tag
+            items.append(m.group(1))
+        elif items:
+            items[-1] += " " + line.strip()
+        else:
+            para.append(line.strip())
+        i += 1
+
+    flush()
+    return "\n".join(out)
+
+
+def _plain(text: str) -> str:
+    text = _LINK_RE.sub(r"\1", text)
+    return re.sub(r"[*`]+", "", text)
+
+
+def summarize(body_md: str, max_chars: int = SUMMARY_MAX_CHARS) -> str:
+    """
+    Plain text of the first paragraph, cut at a word boundary.
+    """
+    para: List[str] = []
+    in_fence = False
+    for line in (body_md or "").splitlines():
+        s = line.strip()
+        if s.startswith("```"):
+            in_fence = not in_fence
+            continue
+        if in_fence or _HEADING_RE.match(s) or _HR_RE.match(s):
+            if para:
+                break
+            continue
+        if not s:
+            if para:
+                break
+            continue
+        para.append(_plain(s.lstrip(">-*+ ")))
+    text = " ".join(para)
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0].rstrip(",;:") + "…"
+
+
+def slugify(title: str) -> str:
+    ascii_title = unicodedata.normalize("NFKD", title or "").encode("ascii", "ignore").decode("ascii")
+    slug = re.sub(r"[^a-z0-9]+", "-", ascii_title.lower()).strip("-")
+    return slug[:SLUG_MAX_CHARS].rstrip("-") or "post"
+
+
+def unique_slug(base: str, taken: set) -> str:
+    if base not in taken:
+        return base
+    n = 2
+    while f"{base}-{n}" in taken:
+        n += 1
+    return f"{base}-{n}"
+
+
+def render_post(title: str, body_md: str, metadata: Dict[str, Any]) -> Tuple[str, str, Dict[str, Any], str]:
+    """
+    Returns (html, summary, metadata + word count/reading time, etag).
+    The etag is a content hash: it only changes when the rendered post does.
+    """
+    words = len((body_md or "").split())
+    meta = {**metadata, "word_count": words, "reading_minutes": max(1, round(words / _WORDS_PER_MINUTE))}
+    body_html = render_markdown(body_md)
+    summary = summarize(body_md)
+    raw = json.dumps([title, summary, body_html, meta], sort_keys=True, default=str, ensure_ascii=False)
+    return body_html, summary, meta, hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Re-render published_posts from the latest drafts of PUBLISHED items")
+    ap.add_argument("--rebuild", action="store_true", required=True)
+    ap.add_argument("--tenant", default=None, help="tenant slug (default: every tenant)")
+    args = ap.parse_args()
+
+    from app.db import get_engine
+    from app.repo import list_tenant_ids, rebuild_published_feed
+    from app.tenant import resolve_tenant_id
+
+    engine = get_engine()
+    tenant_ids = [resolve_tenant_id(engine, args.tenant)] if args.tenant else list_tenant_ids(engine)
+    # One transaction per tenant.
+    totals = {"tenants": 0, "posts": 0}
+    for tenant_id in tenant_ids:
+        totals["tenants"] += 1
+        totals["posts"] += rebuild_published_feed(engine, tenant_id)
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+"""
+Read replicas: round-robin routing, passive health ejection, read-your-writes.
+
+DATABASE_REPLICA_URLS (comma-separated) configures the replica engines
+(db.get_replica_engines); without it every read goes to the primary and
+nothing here costs anything.
+
+Routing (repo_async): read-only repo functions run through run_read(),
+writes through run_write().
+  - run_read tries the replicas in round-robin order and falls back to the
+    primary when none is usable. A replica whose connection fails is
+    ejected for REPLICA_EJECT_SECONDS (doubling per consecutive failure,
+    capped at REPLICA_EJECT_MAX_SECONDS) and then tried again.
+  - run_write commits on the primary and, when replicas exist, reads the
+    primary's WAL position after the commit (pg_current_wal_lsn()) into
+    the request's write token. A transaction aborted by a deadlock or a
+    serialization failure is run again (WRITE_RETRIES times, jittered
+    backoff) and then surfaces as WriteConflict (409).
+
+Read-your-writes: ConsistencyMiddleware returns that token as the
+`X-Read-After` response header and a short-lived `read_after` cookie
+(REPLICA_STICKY_SECONDS). Requests carrying it (header or cookie) only read
+from a replica that has replayed at least that LSN
+(pg_last_wal_replay_lsn()); each replica's last seen replay position is
+remembered, so a caught-up replica is not re-checked on every read. A
+replica that is behind is skipped and the primary answers.
+
+Stand-in for local testing: any second URL works as a "replica". A server
+that is not in recovery reports pg_current_wal_lsn() as its replay
+position, so pointing DATABASE_REPLICA_URLS at the primary itself (or a
+PgBouncer in front of it) exercises routing, ejection and the token path.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+T = TypeVar("T")
+
+# Errors that say "this server is unusable right now" (as opposed to a bad query).
+_UNHEALTHY = (OperationalError, InterfaceError, OSError, asyncio.TimeoutError)
+
+# deadlock_detected, serialization_failure: the transaction was rolled back and can simply be run again.
+_RETRYABLE_SQLSTATES = frozenset({"40P01", "40001"})
+
+_REPLAY_LSN_SQL = text(
+    "SELECT (CASE WHEN pg_is_in_recovery() THEN pg_last_wal_replay_lsn() ELSE pg_current_wal_lsn() END)::text"
+)
+_WRITE_LSN_SQL = text("SELECT pg_current_wal_lsn()::text")
+
+
+def parse_lsn(lsn: str) -> int:
+    """
+    '16/B374D848' -> 64-bit position; ValueError for anything else.
+    """
+    hi, lo = lsn.strip().split("/")
+    return (int(hi, 16) << 32) | int(lo, 16)
+
+
+def format_lsn(pos: int) -> str:
+    return f"{pos >> 32:X}/{pos & 0xFFFFFFFF:X}"
+
+
+# ----------------------------
+# Request state
+# ----------------------------
+
+class ReadState:
+    __slots__ = ("read_after", "write_lsn", "force_primary")
+
+    def __init__(self, read_after: int = 0) -> None:
+        self.read_after = read_after  # replicas must have replayed at least this (0 = any)
+        self.write_lsn = 0  # set by run_write, echoed to the client
+        self.force_primary = False
+
+
+_state: ContextVar[Optional[ReadState]] = ContextVar("read_state", default=None)
+
+
+def _current() -> ReadState:
+    st = _state.get()
+    if st is None:
+        st = ReadState()
+        _state.set(st)
+    return st
+
+
+@contextmanager
+def primary_reads(enabled: bool = True) -> Iterator[None]:
+    """
+    Route the reads inside the block to the primary (e.g. to fill a cache
+    that must never be older than its last invalidation).
+    """
+    if get_replica_set() is None:
+        yield
+        return
+    st = _current()
+    prev = st.force_primary
+    st.force_primary = prev or enabled
+    try:
+        yield
+    finally:
+        st.force_primary = prev
+
+
+# ----------------------------
+# Replica set
+# ----------------------------
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine) -> None:
+        self.name = name
+        self.engine = engine
+        self.replay_lsn = 0
+        self.ejected_until = 0.0
+        self.failures = 0
+        self.reads = 0
+        self.ejections = 0
+        self.lagging = 0
+
+
+class ReplicaSet:
+    def __init__(
+        self,
+        replicas: List[Replica],
+        eject_seconds: float = 5.0,
+        max_eject_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.replicas = replicas
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._next = 0
+        self.primary_fallbacks = 0
+
+    def candidates(self) -> List[Replica]:
+        """
+        Healthy replicas, starting with the next one in round-robin order.
+        """
+        now = self._clock()
+        with self._lock:
+            start = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [r for r in ordered if r.ejected_until <= now]
+
+    def mark_ok(self, r: Replica) -> None:
+        r.failures = 0
+        r.reads += 1
+
+    def mark_failed(self, r: Replica) -> None:
+        with self._lock:
+            r.failures += 1
+            r.ejections += 1
+            backoff = min(self.eject_seconds * (2 ** (r.failures - 1)), self.max_eject_seconds)
+            r.ejected_until = self._clock() + backoff
+
+    def stats(self) -> Dict[str, Any]:
+        now = self._clock()
+        return {
+            "primary_fallbacks": self.primary_fallbacks,
+            "replicas": [
+                {
+                    "name": r.name,
+                    "healthy": r.ejected_until <= now,
+                    "ejected_for_seconds": max(0.0, round(r.ejected_until - now, 1)),
+                    "consecutive_failures": r.failures,
+                    "replay_lsn": format_lsn(r.replay_lsn) if r.replay_lsn else None,
+                    "reads": r.reads,
+                    "ejections": r.ejections,
+                    "skipped_lagging": r.lagging,
+                }
+                for r in self.replicas
+            ],
+        }
+
+
+@lru_cache(maxsize=1)
+def get_replica_set() -> Optional[ReplicaSet]:
+    """
+    None when no replicas are configured.
+
+    Env knobs (read once):
+      REPLICA_EJECT_SECONDS      (default 5)   first ejection after a connection failure
+      REPLICA_EJECT_MAX_SECONDS  (default 60)  cap for the doubling backoff
+    """
+    from app.db import get_replica_engines
+
+    engines = get_replica_engines()
+    if not engines:
+        return None
+    return ReplicaSet(
+        [Replica(f"replica{i}", e) for i, e in enumerate(engines)],
+        eject_seconds=float(os.getenv("REPLICA_EJECT_SECONDS", "5")),
+        max_eject_seconds=float(os.getenv("REPLICA_EJECT_MAX_SECONDS", "60")),
+    )
+
+
+def sticky_seconds() -> int:
+    return int(os.getenv("REPLICA_STICKY_SECONDS", "30"))
+
+
+@lru_cache(maxsize=1)
+def write_retries() -> int:
+    return max(0, int(os.getenv("WRITE_RETRIES", "3")))
+
+
+class WriteConflict(Exception):
+    """
+    A write still deadlocked / failed serialization after write_retries()
+    attempts; the API answers 409 so the client can retry.
+    """
+
+
+def _retryable(exc: DBAPIError) -> bool:
+    return getattr(exc.orig, "sqlstate", None) in _RETRYABLE_SQLSTATES
+
+
+# ----------------------------
+# Routing
+# ----------------------------
+
+async def run_read(primary: AsyncEngine, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    rs = get_replica_set()
+    st = _current() if rs is not None else None
+    if st is not None and not st.force_primary:
+        need = max(st.read_after, st.write_lsn)
+        for r in rs.candidates():
+            try:
+                async with r.engine.begin() as conn:
+                    # Lets repo code tell replica reads apart (e.g. not to fill invalidation-driven caches).
+                    await conn.execution_options(replica=r.name)
+                    if need and r.replay_lsn < need:
+                        r.replay_lsn = max(r.replay_lsn, parse_lsn(await conn.scalar(_REPLAY_LSN_SQL)))
+                        if r.replay_lsn < need:
+                            r.lagging += 1
+                            continue
+                    result = await conn.run_sync(fn, *args, **kwargs)
+            except _UNHEALTHY:
+                # Reads are side-effect free: eject the replica and retry elsewhere.
+                rs.mark_failed(r)
+                continue
+            rs.mark_ok(r)
+            return result
+        rs.primary_fallbacks += 1
+
+    async with primary.begin() as conn:
+        return await conn.run_sync(fn, *args, **kwargs)
+
+
+async def run_write(primary: AsyncEngine, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    attempt = 0
+    while True:
+        try:
+            return await _write_once(primary, fn, *args, **kwargs)
+        except DBAPIError as e:
+            if not _retryable(e):
+                raise
+            if attempt >= write_retries():
+                raise WriteConflict("Write conflict (deadlock or serialization failure), retry the request") from e
+            await asyncio.sleep(random.uniform(0.005, 0.02 * 2**attempt))
+            attempt += 1
+
+
+async def _write_once(primary: AsyncEngine, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    if get_replica_set() is None:
+        async with primary.begin() as conn:
+            return await conn.run_sync(fn, *args, **kwargs)
+
+    async with primary.connect() as conn:
+        async with conn.begin():
+            result = await conn.run_sync(fn, *args, **kwargs)
+        # After COMMIT: the position a replica must have replayed to show this write.
+        lsn = parse_lsn(await conn.scalar(_WRITE_LSN_SQL))
+        await conn.rollback()
+    st = _current()
+    st.write_lsn = max(st.write_lsn, lsn)
+    return result
+
+
+# ----------------------------
+# Middleware
+# ----------------------------
+
+class ConsistencyMiddleware:
+    """
+    Pure ASGI: reads the client's token (X-Read-After header or read_after
+    cookie) into the request's ReadState and returns the token of any write
+    the request made. Malformed tokens are ignored.
+    """
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    @staticmethod
+    def _token(scope: Dict[str, Any]) -> int:
+        raw = None
+        for k, v in scope.get("headers") or ():
+            if k == b"x-read-after":
+                raw = v.decode("latin-1")
+                break
+            if k == b"cookie" and raw is None:
+                for part in v.decode("latin-1").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "read_after":
+                        raw = value
+        try:
+            return parse_lsn(raw) if raw else 0
+        except ValueError:
+            return 0
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or get_replica_set() is None:
+            await self.app(scope, receive, send)
+            return
+
+        st = ReadState(self._token(scope))
+        token = _state.set(st)
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            if message["type"] == "http.response.start" and st.write_lsn:
+                lsn = format_lsn(st.write_lsn).encode("latin-1")
+                headers = list(message.get("headers") or [])
+                headers.append((b"x-read-after", lsn))
+                headers.append(
+                    (b"set-cookie", b"read_after=%s; Max-Age=%d; Path=/; SameSite=Lax" % (lsn, sticky_seconds()))
+                )
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _state.reset(token)
@@ -1,17 +1,44 @@
 from __future__ import annotations
 
+import base64
 import json
-from typing import Any, Dict, List, Optional, Tuple
-from uuid import UUID
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID, uuid4
 
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.util import await_only
+
+from app.cache import MISSING
+from app.drafts import apply_delta, is_snapshot_version, make_delta
+from app.policy import TenantWorkflow, compile_policy, get_policy_cache, invalidate_policy
+from app.published import render_post, slugify, unique_slug
+from app.workflow import STATES, WORKFLOW, WorkflowError, validate_transition
 
 
 # ----------------------------
 # Helpers (safe + deterministic)
 # ----------------------------
 
+# sort key -> (column, direction, SQL type used to cast the cursor value)
+# Every sort is made total by appending `id` in the same direction, so a
+# (sort column, id) pair uniquely positions a row for keyset pagination.
+_SORTS: Dict[str, Tuple[str, str, str]] = {
+    "created_at_desc": ("created_at", "DESC", "timestamptz"),
+    "created_at_asc": ("created_at", "ASC", "timestamptz"),
+    "updated_at_desc": ("updated_at", "DESC", "timestamptz"),
+    "updated_at_asc": ("updated_at", "ASC", "timestamptz"),
+    "title_asc": ("title", "ASC", "text"),
+    "title_desc": ("title", "DESC", "text"),
+}
+
+
+def _normalize_sort(sort: str) -> str:
+    s = (sort or "").strip().lower()
+    return s if s in _SORTS else "created_at_desc"
+
+
 def _sort_to_order_by(sort: str) -> str:
     """
     Allowed sort values (explicit allow-list to avoid SQL injection):
@@ -21,19 +48,78 @@ def _sort_to_order_by(sort: str) -> str:
       - updated_at_asc
       - title_asc
       - title_desc
+
+    `id` is always the tie-breaker so ordering is deterministic (required by
+    keyset pagination; backed by the (tenant_id, <column>, id) indexes).
     """
-    s = (sort or "").strip().lower()
-    if s == "created_at_asc":
-        return "created_at ASC"
-    if s == "updated_at_desc":
-        return "updated_at DESC"
-    if s == "updated_at_asc":
-        return "updated_at ASC"
-    if s == "title_asc":
-        return "title ASC"
-    if s == "title_desc":
-        return "title DESC"
-    return "created_at DESC"
+    column, direction, _ = _SORTS[_normalize_sort(sort)]
+    return f"{column} {direction}, id {direction}"
+
+
+def _sort_to_keyset_predicate(sort: str) -> str:
+    """
+    Row-value comparison that selects rows strictly after the cursor row.
+    Binds: :cursor_key, :cursor_id
+    """
+    column, direction, cast = _SORTS[_normalize_sort(sort)]
+    op = "<" if direction == "DESC" else ">"
+    return f"({column}, id) {op} (CAST(:cursor_key AS {cast}), CAST(:cursor_id AS uuid))"
+
+
+def _like_escape(q: str) -> str:
+    """
+    Escape LIKE/ILIKE metacharacters so user input is matched literally
+    (backslash is Postgres' default LIKE escape character).
+    """
+    return q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _search_predicate(q: str, search: str, params: Dict[str, Any]) -> str:
+    """
+    Title filter for list_content / typeahead. Both forms are index-backed
+    (see migrations 20261016_0004, 20261017_0017):
+      - contains: title ILIKE '%q%'                  -> GIN (tenant_id, title gin_trgm_ops)
+      - prefix:   lower(title) COLLATE "C" LIKE 'q%' -> btree (tenant_id, (lower(title) COLLATE "C"), id)
+    """
+    if search == "prefix":
+        params["q_like"] = _like_escape(q.lower()) + "%"
+        return 'lower(title) COLLATE "C" LIKE :q_like'
+    params["q_like"] = "%" + _like_escape(q) + "%"
+    return "title ILIKE :q_like"
+
+
+def _encode_cursor(sort: str, row: Dict[str, Any]) -> str:
+    """
+    Opaque cursor: urlsafe base64 of {"s": sort, "k": <sort column value>, "id": <id>}.
+    """
+    column, _, _ = _SORTS[_normalize_sort(sort)]
+    key = row[column]
+    if isinstance(key, datetime):
+        key = key.isoformat()
+    raw = json.dumps({"s": _normalize_sort(sort), "k": key, "id": row["id"]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(sort: str, cursor: str) -> Tuple[str, str]:
+    """
+    Returns (cursor_key, cursor_id). Raises ValueError for malformed cursors or
+    cursors minted for a different sort.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        s, key, cid = data["s"], data["k"], data["id"]
+        UUID(str(cid))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+    if s != _normalize_sort(sort):
+        raise ValueError("Invalid cursor: cursor was issued for a different sort")
+    return str(key), str(cid)
+
+
+# Event history cursors reuse the content cursor format keyed on created_at.
+_EVENTS_CURSOR_SORT = "created_at_asc"
 
 
 def _risk_enum_to_int_sql(expr: str = "risk") -> str:
@@ -71,39 +157,203 @@ def _risk_int_to_label(risk_tier: int) -> str:
     raise ValueError("risk_tier must be 1 or 2 for MVP")
 
 
+def _apply_state_count_deltas(conn: Connection, tenant_id: UUID, deltas: Dict[str, int]) -> None:
+    """
+    Apply {state: +/-n} to public.content_state_counts in one statement.
+    Must run inside the same transaction as the content write it mirrors.
+
+    Counter rows are locked in (tenant_id, state) order, like every other
+    counter upsert, so concurrent writers cannot deadlock on them.
+    """
+    deltas = {s: int(d) for s, d in deltas.items() if int(d) != 0}
+    if not deltas:
+        return
+
+    sql = text("""
+        INSERT INTO public.content_state_counts AS c (tenant_id, state, n)
+        SELECT CAST(:tenant_id AS uuid), CAST(d.state AS content_state), d.delta
+        FROM unnest(CAST(:states AS text[]), CAST(:deltas AS bigint[])) AS d(state, delta)
+        ORDER BY 2
+        ON CONFLICT (tenant_id, state) DO UPDATE SET n = c.n + EXCLUDED.n;
+    """)
+    conn.execute(
+        sql,
+        {"tenant_id": str(tenant_id), "states": list(deltas.keys()), "deltas": list(deltas.values())},
+    )
+
+
+def _estimate_rows(conn: Connection, from_where_sql: str, params: Dict[str, Any]) -> int:
+    """
+    Planner row estimate for `SELECT 1 FROM <from_where_sql>` (no execution).
+    """
+    row = conn.execute(
+        text(f"EXPLAIN (FORMAT JSON) SELECT 1 FROM {from_where_sql}").execution_options(query_name="list_content.total_estimate"),
+        params,
+    ).one()
+    plan = row[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
 # ----------------------------
 # CRUD / Queries
+#
+# Every query is written once against a Connection (`*_tx`), so it can be
+# composed inside a caller's transaction. Engine-level wrappers (one
+# transaction per call) are at the bottom of this module; app.repo_async
+# runs the same `*_tx` functions on the async engine.
 # ----------------------------
 
-def create_content_item(engine: Engine, tenant_id: UUID, title: str, risk_tier: int) -> Dict[str, Any]:
+def create_content_item_tx(
+    conn: Connection, tenant_id: UUID, title: str, risk_tier: int, with_event: bool = False
+) -> Dict[str, Any]:
+    """
+    Insert one content item (+ bump the per-state counter) in one statement.
+
+    with_event=True also appends its content.created event in the same
+    statement, i.e. the event commits atomically with the row (durable mode).
+    Otherwise the caller is expected to hand the event to the event sink.
+    """
     risk_label = _risk_int_to_label(int(risk_tier))
 
+    ev_sql = ""
+    if with_event:
+        ev_sql = """, ev AS (
+            INSERT INTO public.events
+                (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+            SELECT
+                tenant_id, 'content', id, 'content.created', 'system', NULL,
+                jsonb_build_object('state', state::text, 'title', title, 'risk_tier', CAST(:risk_tier AS int)),
+                created_at
+            FROM ins
+        )"""
+
     sql = text(f"""
-        INSERT INTO public.content_items
-            (tenant_id, title, risk, state, created_at, updated_at)
-        VALUES
-            (CAST(:tenant_id AS uuid), :title, CAST(:risk AS risk_tier), 'INGESTED', NOW(), NOW())
-        RETURNING
+        WITH ins AS (
+            INSERT INTO public.content_items
+                (tenant_id, title, risk, state, created_at, updated_at)
+            VALUES
+                (CAST(:tenant_id AS uuid), :title, CAST(:risk AS risk_tier), 'INGESTED', NOW(), NOW())
+            RETURNING *
+        ), cnt AS (
+            INSERT INTO public.content_state_counts AS c (tenant_id, state, n)
+            SELECT tenant_id, state, 1 FROM ins
+            ON CONFLICT (tenant_id, state) DO UPDATE SET n = c.n + 1
+        ){ev_sql}
+        SELECT
             id::text AS id,
             title,
             state::text AS state,
             {_risk_enum_to_int_sql("risk")} AS risk_tier,
             created_at,
-            updated_at;
+            updated_at
+        FROM ins;
     """)
 
-    with engine.begin() as conn:
-        row = conn.execute(
-            sql,
-            {"tenant_id": str(tenant_id), "title": title, "risk": risk_label},
-        ).mappings().one()
+    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "title": title, "risk": risk_label}
+    if with_event:
+        params["risk_tier"] = int(risk_tier)
+    row = conn.execute(sql, params).mappings().one()
 
     return dict(row)
 
 
-def get_content_by_id(engine: Engine, tenant_id: UUID, content_id: UUID) -> Dict[str, Any]:
+_COPY_CONTENT_SQL = "COPY public.content_items (id, tenant_id, title, risk, state) FROM STDIN"
+_COPY_EVENTS_SQL = (
+    "COPY public.events"
+    " (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)"
+    " FROM STDIN"
+)
+
+
+def _batch_content_rows(tid: str, rows: List[Tuple[str, str, str, int]]) -> Iterator[Tuple[Any, ...]]:
+    for cid, title, risk_label, _ in rows:
+        yield (cid, tid, title, risk_label, "INGESTED")
+
+
+def _batch_event_rows(tid: str, rows: List[Tuple[str, str, str, int]], now: datetime) -> Iterator[Tuple[Any, ...]]:
+    for cid, title, _, risk_tier in rows:
+        payload = {"state": "INGESTED", "title": title, "risk_tier": risk_tier}
+        yield (tid, "content", cid, "content.created", "system", None, json.dumps(payload), now)
+
+
+def _copy_batch_rows(conn: Connection, tid: str, rows: List[Tuple[str, str, str, int]], now: datetime) -> None:
+    """
+    Stream the batch into content_items + events with COPY on the connection's
+    current transaction. On the async engine (inside run_sync) the psycopg
+    connection is async, so the COPY coroutine is awaited via await_only.
+    """
+    raw = conn.connection.driver_connection
+    if conn.dialect.is_async:
+        await_only(_copy_batch_rows_async(raw, tid, rows, now))
+        return
+
+    with raw.cursor() as cur:
+        with cur.copy(_COPY_CONTENT_SQL) as cp:
+            for r in _batch_content_rows(tid, rows):
+                cp.write_row(r)
+        with cur.copy(_COPY_EVENTS_SQL) as cp:
+            for r in _batch_event_rows(tid, rows, now):
+                cp.write_row(r)
+
+
+async def _copy_batch_rows_async(raw: Any, tid: str, rows: List[Tuple[str, str, str, int]], now: datetime) -> None:
+    async with raw.cursor() as cur:
+        async with cur.copy(_COPY_CONTENT_SQL) as cp:
+            for r in _batch_content_rows(tid, rows):
+                await cp.write_row(r)
+        async with cur.copy(_COPY_EVENTS_SQL) as cp:
+            for r in _batch_event_rows(tid, rows, now):
+                await cp.write_row(r)
+
+
+def create_content_items_batch_tx(
+    conn: Connection, tenant_id: UUID, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Bulk insert content items + their content.created events in ONE transaction.
+
+    items: [{"title": str, "risk_tier": int, "index"?: int}, ...]
+    Returns one result per input item (same order; "index" defaults to position):
+      {"index": i, "ok": True, "id": "<uuid>"} or {"index": i, "ok": False, "error": "..."}
+
+    Rows are streamed with COPY (ids generated client-side so events can be
+    written without RETURNING), and content_state_counts is bumped once.
+    """
+    results: List[Dict[str, Any]] = []
+    rows: List[Tuple[str, str, str, int]] = []  # (id, title, risk_label, risk_tier)
+
+    for i, it in enumerate(items):
+        index = it.get("index", i)
+        try:
+            risk_tier = int(it.get("risk_tier", 1))
+            risk_label = _risk_int_to_label(risk_tier)
+        except (TypeError, ValueError) as e:
+            results.append({"index": index, "ok": False, "id": None, "error": str(e)})
+            continue
+        cid = str(uuid4())
+        rows.append((cid, it["title"], risk_label, risk_tier))
+        results.append({"index": index, "ok": True, "id": cid, "error": None})
+
+    if not rows:
+        return results
+
+    tid = str(tenant_id)
+
+    # Transaction timestamp: identical to the content_items created_at defaults.
+    now = conn.execute(text("SELECT NOW() AS now;")).mappings().one()["now"]
+
+    _copy_batch_rows(conn, tid, rows, now)
+
+    _apply_state_count_deltas(conn, tenant_id, {"INGESTED": len(rows)})
+
+    return results
+
+
+def get_content_by_id_tx(conn: Connection, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
     """
-    main.py expects this symbol.
+    main.py expects this symbol. Returns None when the item does not exist.
     """
     sql = text(f"""
         SELECT
@@ -116,33 +366,97 @@ def get_content_by_id(engine: Engine, tenant_id: UUID, content_id: UUID) -> Dict
         FROM public.content_items
         WHERE tenant_id = CAST(:tenant_id AS uuid)
           AND id = CAST(:content_id AS uuid);
-    """)
+    """).execution_options(prepare=True)
 
-    with engine.begin() as conn:
-        row = conn.execute(
-            sql,
-            {"tenant_id": str(tenant_id), "content_id": str(content_id)},
-        ).mappings().one()
+    row = conn.execute(
+        sql,
+        {"tenant_id": str(tenant_id), "content_id": str(content_id)},
+    ).mappings().one_or_none()
 
-    return dict(row)
+    return dict(row) if row else None
 
 
-def list_content(
-    engine: Engine,
+def get_content_validators_tx(conn: Connection, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    """
+    Conditional-GET validators of one item (app.http_cache): updated_at and
+    its newest event (backward scan of idx_events_entity_time). None when
+    the item does not exist.
+    """
+    row = conn.execute(
+        text("""
+            SELECT c.updated_at, e.id::text AS last_event_id, e.created_at AS last_event_at
+            FROM public.content_items c
+            LEFT JOIN LATERAL (
+                SELECT id, created_at
+                FROM public.events
+                WHERE tenant_id = c.tenant_id
+                  AND entity_type = 'content'
+                  AND entity_id = c.id
+                ORDER BY created_at DESC, id DESC
+                LIMIT 1
+            ) e ON true
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = CAST(:content_id AS uuid);
+        """).execution_options(prepare=True),
+        {"tenant_id": str(tenant_id), "content_id": str(content_id)},
+    ).mappings().one_or_none()
+    return dict(row) if row else None
+
+
+def list_content_tx(
+    conn: Connection,
     tenant_id: UUID,
     limit: int = 20,
     offset: int = 0,
     sort: str = "created_at_desc",
     q: Optional[str] = None,
-) -> Tuple[List[Dict[str, Any]], int]:
-    order_by = _sort_to_order_by(sort)
+    cursor: Optional[str] = None,
+    count: str = "planned",
+    search: str = "contains",
+) -> Tuple[List[Dict[str, Any]], Optional[int], bool, Optional[str]]:
+    """
+    Returns (items, total, total_is_estimate, next_cursor).
+
+    Paging modes:
+      - offset: LIMIT/OFFSET (cost grows with depth)
+      - cursor: keyset on (sort column, id); `offset` is ignored and every page
+        costs the same regardless of depth. `next_cursor` is returned in both
+        modes so a client can switch to keyset after the first page.
+
+    count:
+      - "exact":   exact total (O(1) from content_state_counts when unfiltered,
+                   COUNT(*) over the filter otherwise; the counters are exact
+                   once app.state_counts has run after their migration)
+      - "planned": like "exact" when unfiltered; filtered queries use the
+                   planner's row estimate instead of COUNT(*)
+      - "none":    skip counting, total is None
+
+    total_is_estimate is True only when a planner estimate was returned.
+
+    search ("contains" | "prefix") selects how `q` matches the title.
+    sort="relevance" ranks matches by trigram similarity to `q` (offset
+    paging only; without `q` it falls back to created_at_desc).
+    """
+    relevance = (sort or "").strip().lower() == "relevance" and bool(q)
+    if relevance and cursor:
+        raise ValueError("cursor paging is not supported for sort=relevance")
+
+    order_by = "similarity(title, :q) DESC, id DESC" if relevance else _sort_to_order_by(sort)
 
     where_parts = ["tenant_id = CAST(:tenant_id AS uuid)"]
-    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "limit": int(limit), "offset": int(offset)}
+    # Fetch one extra row to learn whether there is a next page.
+    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "limit": int(limit) + 1, "offset": int(offset)}
 
     if q:
-        where_parts.append("title ILIKE :q")
-        params["q"] = f"%{q}%"
+        where_parts.append(_search_predicate(q, search, params))
+        params["q"] = q
+
+    count_where_sql = " AND ".join(where_parts)
+
+    if cursor:
+        params["cursor_key"], params["cursor_id"] = _decode_cursor(sort, cursor)
+        params["offset"] = 0
+        where_parts.append(_sort_to_keyset_predicate(sort))
 
     where_sql = " AND ".join(where_parts)
 
@@ -158,23 +472,301 @@ def list_content(
         WHERE {where_sql}
         ORDER BY {order_by}
         LIMIT :limit OFFSET :offset;
-    """)
+    """).execution_options(query_name="list_content.items", prepare=True)
 
     sql_total = text(f"""
         SELECT COUNT(*)::int AS total
         FROM public.content_items
-        WHERE {where_sql};
+        WHERE {count_where_sql};
+    """).execution_options(query_name="list_content.total")
+
+    sql_counter_total = text("""
+        SELECT COALESCE(SUM(n), 0)::bigint AS total
+        FROM public.content_state_counts
+        WHERE tenant_id = CAST(:tenant_id AS uuid);
+    """).execution_options(query_name="list_content.total_counter", prepare=True)
+
+    total: Optional[int] = None
+    total_is_estimate = False
+    rows = [dict(r) for r in conn.execute(sql_items, params).mappings().all()]
+    if count != "none":
+        if not q:
+            total = int(conn.execute(sql_counter_total, params).mappings().one()["total"])
+        elif count == "exact":
+            total = int(conn.execute(sql_total, params).mappings().one()["total"])
+        else:
+            total = _estimate_rows(conn, f"public.content_items WHERE {count_where_sql}", params)
+            total_is_estimate = True
+
+    next_cursor = None
+    if len(rows) > int(limit):
+        rows = rows[: int(limit)]
+        if not relevance:
+            next_cursor = _encode_cursor(sort, rows[-1])
+
+    return rows, total, total_is_estimate, next_cursor
+
+
+def typeahead_content_tx(conn: Connection, tenant_id: UUID, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """
+    Title prefix suggestions (case-insensitive), in byte order of the
+    lowercased title. Served by the (tenant_id, (lower(title) COLLATE "C"),
+    id) index, which also yields that order, so the scan stops after `limit`
+    rows; cost is bounded by `limit`.
+    """
+    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "limit": int(limit)}
+    predicate = _search_predicate(prefix, "prefix", params)
+
+    sql = text(f"""
+        SELECT
+            id::text AS id,
+            title,
+            state::text AS state
+        FROM public.content_items
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+          AND {predicate}
+        ORDER BY lower(title) COLLATE "C" ASC, id ASC
+        LIMIT :limit;
     """)
 
-    with engine.begin() as conn:
-        rows = conn.execute(sql_items, params).mappings().all()
-        total = conn.execute(sql_total, params).mappings().one()["total"]
+    rows = conn.execute(sql, params).mappings().all()
 
-    return [dict(r) for r in rows], int(total)
+    return [dict(r) for r in rows]
 
 
-def list_content_events(engine: Engine, tenant_id: UUID, content_id: UUID) -> List[Dict[str, Any]]:
+def get_state_histogram_tx(conn: Connection, tenant_id: UUID) -> Dict[str, Any]:
+    """
+    Per-state item counts for a tenant, read from content_state_counts (O(#states)).
+    States with no items are reported as 0.
+    """
     sql = text("""
+        SELECT state::text AS state, n
+        FROM public.content_state_counts
+        WHERE tenant_id = CAST(:tenant_id AS uuid);
+    """)
+
+    rows = conn.execute(sql, {"tenant_id": str(tenant_id)}).mappings().all()
+
+    counts = {s: 0 for s in STATES}
+    for r in rows:
+        counts[r["state"]] = int(r["n"])
+
+    return {"tenant_id": str(tenant_id), "total": sum(counts.values()), "states": counts}
+
+
+def recount_state_counts_tx(conn: Connection, tenant_id: UUID) -> Dict[str, Any]:
+    """
+    Repair helper: rebuild a tenant's counters from content_items.
+    Needed once after the counters migration is deployed (the previous release
+    kept writing without them) and whenever content_items was modified outside
+    the API write paths; CLI: python -m app.state_counts.
+    """
+    sql_rebuild = text("""
+        WITH actual AS (
+            SELECT state, COUNT(*) AS n
+            FROM public.content_items
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+            GROUP BY state
+        )
+        INSERT INTO public.content_state_counts AS c (tenant_id, state, n)
+        SELECT CAST(:tenant_id AS uuid), s.state, COALESCE(actual.n, 0)
+        FROM unnest(enum_range(NULL::content_state)) AS s(state)
+        LEFT JOIN actual ON actual.state = s.state
+        ON CONFLICT (tenant_id, state) DO UPDATE SET n = EXCLUDED.n;
+    """)
+
+    # Block concurrent content writes so the rebuilt counts are exact.
+    conn.execute(text("LOCK TABLE public.content_items IN SHARE MODE;"))
+    conn.execute(sql_rebuild, {"tenant_id": str(tenant_id)})
+
+    return get_state_histogram_tx(conn, tenant_id)
+
+
+# source -> (relation, candidate columns, neighbour SELECT list, "row -> content item" join)
+_SIMILAR_SOURCES: Dict[str, Tuple[str, str, str, str]] = {
+    "intake": (
+        "public.intake_items",
+        "id, tenant_id, title",
+        "n.id::text AS ref_id, c.id::text AS content_id, COALESCE(c.title, n.title) AS title, c.state::text AS state",
+        "LEFT JOIN public.content_items c ON c.intake_id = n.id AND c.tenant_id = n.tenant_id",
+    ),
+    "drafts": (
+        "public.draft_versions",
+        "id, tenant_id, title, content_id",
+        "n.id::text AS ref_id, c.id::text AS content_id, COALESCE(n.title, c.title) AS title, c.state::text AS state",
+        "JOIN public.content_items c ON c.id = n.content_id",
+    ),
+}
+
+
+def similar_content_tx(
+    conn: Connection,
+    tenant_id: UUID,
+    content_id: UUID,
+    source: str = "intake",
+    limit: int = 10,
+    ef_search: int = 100,
+) -> Dict[str, Any]:
+    """
+    Nearest neighbours (cosine) of a content item's embedding: its intake
+    item ("intake") or its latest embedded draft version ("drafts").
+
+    The query vector is read first and bound as a parameter, so the
+    ORDER BY embedding <=> :vec LIMIT k is served by the HNSW index
+    (approximate; hnsw.ef_search trades recall for speed). Only vectors
+    from the same embedding_model are compared. Draft neighbours are
+    collapsed to one row per content item.
+
+    The index is shared by all tenants, so the tenant filter applies to its
+    candidates: with pgvector >= 0.8 the scan is iterative
+    (hnsw.iterative_scan = relaxed_order) and keeps going until k rows pass
+    the filter. A short answer is normal for a tenant with few vectors, so
+    the query is only re-run exactly (no index scan: the tenant's rows
+    through the tenant index, sorted by distance) when the index returned
+    fewer candidates than the tenant has (one count capped at k): pgvector
+    < 0.8, or the iterative scan hit hnsw.max_scan_tuples. A small tenant
+    never gets an empty or short answer because of other tenants' vectors.
+    """
+    if source not in _SIMILAR_SOURCES:
+        raise ValueError(f"Unknown similarity source: {source}")
+    rel, cols_sql, select_sql, join_sql = _SIMILAR_SOURCES[source]
+    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "content_id": str(content_id)}
+
+    if source == "intake":
+        src_sql = """
+            SELECT c.id, i.id AS ref_id, i.embedding::text AS vec, i.embedding_model AS model
+            FROM public.content_items c
+            LEFT JOIN public.intake_items i ON i.id = c.intake_id
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = CAST(:content_id AS uuid);
+        """
+    else:
+        src_sql = """
+            SELECT c.id, d.id AS ref_id, d.embedding::text AS vec, d.embedding_model AS model
+            FROM public.content_items c
+            LEFT JOIN LATERAL (
+                SELECT id, embedding, embedding_model
+                FROM public.draft_versions
+                WHERE tenant_id = c.tenant_id
+                  AND content_id = c.id
+                  AND embedding IS NOT NULL
+                ORDER BY version DESC
+                LIMIT 1
+            ) d ON true
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = CAST(:content_id AS uuid);
+        """
+    src = conn.execute(text(src_sql), params).mappings().one_or_none()
+    if src is None:
+        raise ValueError("Content not found")
+    if src["vec"] is None:
+        # Not embedded yet (backfill pending) or no draft.
+        return {"source": source, "embedded": False, "items": []}
+
+    params.update(vec=src["vec"], model=src["model"], ref_id=str(src["ref_id"]), limit=int(limit))
+    # Drafts: several versions of one item can match; over-fetch, then keep the best per item.
+    params["k"] = int(limit) * (3 if source == "drafts" else 1)
+
+    conn.execute(text("SELECT set_config('hnsw.ef_search', :ef, true);"), {"ef": str(max(int(ef_search), params["k"]))})
+    if _pgvector_iterative_scan(conn):
+        conn.execute(text("SELECT set_config('hnsw.iterative_scan', 'relaxed_order', true);"))
+    sql = text(f"""
+        WITH n AS (
+            SELECT {cols_sql}, embedding <=> CAST(:vec AS vector) AS distance
+            FROM {rel}
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+              AND embedding_model = :model
+              AND embedding IS NOT NULL
+              AND id <> CAST(:ref_id AS uuid)
+            ORDER BY embedding <=> CAST(:vec AS vector)
+            LIMIT :k
+        ), m AS (
+            SELECT {select_sql}, n.distance
+            FROM n
+            {join_sql}
+            WHERE c.id IS DISTINCT FROM CAST(:content_id AS uuid)
+        )
+        SELECT ref_id, content_id, title, state, 1 - distance AS similarity,
+               (SELECT count(*) FROM n) AS candidates
+        FROM (
+            SELECT DISTINCT ON (COALESCE(content_id, ref_id)) *
+            FROM m
+            ORDER BY COALESCE(content_id, ref_id), distance
+        ) best
+        ORDER BY distance
+        LIMIT :limit;
+    """)
+    rows = [dict(r) for r in conn.execute(sql.execution_options(query_name=f"similar_content.{source}"), params).mappings()]
+    found = int(rows[0]["candidates"]) if rows else 0
+    if len(rows) < int(limit) and found < params["k"]:
+        sql_candidates = text(f"""
+            SELECT count(*) FROM (
+                SELECT 1
+                FROM {rel}
+                WHERE tenant_id = CAST(:tenant_id AS uuid)
+                  AND embedding_model = :model
+                  AND embedding IS NOT NULL
+                  AND id <> CAST(:ref_id AS uuid)
+                LIMIT :k
+            ) s;
+        """).execution_options(query_name=f"similar_content.{source}_candidates")
+        if int(conn.execute(sql_candidates, params).scalar_one()) > found:
+            # The index scan missed some of the tenant's rows (filtered out after it). Exact scan (transaction-local).
+            conn.execute(text("SELECT set_config('enable_indexscan', 'off', true);"))
+            rows = [
+                dict(r)
+                for r in conn.execute(sql.execution_options(query_name=f"similar_content.{source}_exact"), params).mappings()
+            ]
+    for r in rows:
+        del r["candidates"]
+    return {"source": source, "embedded": True, "items": rows}
+
+
+_pgvector_iterative: Optional[bool] = None
+
+
+def _pgvector_iterative_scan(conn: Connection) -> bool:
+    """
+    pgvector >= 0.8 (hnsw.iterative_scan). Checked once per process.
+    """
+    global _pgvector_iterative
+    if _pgvector_iterative is None:
+        version = conn.execute(
+            text("SELECT extversion FROM pg_extension WHERE extname = 'vector';")
+        ).scalar_one_or_none()
+        try:
+            major, minor = (int(x) for x in (version or "0.0").split(".")[:2])
+        except ValueError:
+            major, minor = 0, 0
+        _pgvector_iterative = (major, minor) >= (0, 8)
+    return _pgvector_iterative
+
+
+def list_content_events_tx(
+    conn: Connection,
+    tenant_id: UUID,
+    content_id: UUID,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of a content item's history, oldest first.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    Keyset on (created_at, id), served by idx_events_entity_time on every
+    monthly partition of public.events.
+    """
+    params: Dict[str, Any] = {
+        "tenant_id": str(tenant_id),
+        "content_id": str(content_id),
+        "limit": int(limit) + 1,
+    }
+    after_sql = ""
+    if cursor:
+        params["cursor_key"], params["cursor_id"] = _decode_cursor(_EVENTS_CURSOR_SORT, cursor)
+        after_sql = "AND (created_at, id) > (CAST(:cursor_key AS timestamptz), CAST(:cursor_id AS uuid))"
+
+    sql = text(f"""
         SELECT
             id::text AS id,
             entity_type,
@@ -188,123 +780,1431 @@ def list_content_events(engine: Engine, tenant_id: UUID, content_id: UUID) -> Li
         WHERE tenant_id = CAST(:tenant_id AS uuid)
           AND entity_type = 'content'
           AND entity_id = CAST(:content_id AS uuid)
-        ORDER BY created_at ASC;
+          {after_sql}
+        ORDER BY created_at ASC, id ASC
+        LIMIT :limit;
     """)
 
-    with engine.begin() as conn:
-        rows = conn.execute(
-            sql,
-            {"tenant_id": str(tenant_id), "content_id": str(content_id)},
-        ).mappings().all()
-
-    return [dict(r) for r in rows]
+    rows = [dict(r) for r in conn.execute(sql, params).mappings().all()]
 
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(_EVENTS_CURSOR_SORT, rows[-1])
+    return rows, next_cursor
 
-# ----------------------------
-# Governance: allowed + transition
-# ----------------------------
 
-def get_allowed_transitions(engine: Engine, tenant_id: UUID, content_id: UUID) -> Dict[str, Any]:
+def list_tenant_events_since_tx(
+    conn: Connection,
+    tenant_id: UUID,
+    cursor: str,
+    limit: int = 500,
+    entity_id: Optional[UUID] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
     """
-    MVP transitions:
-      INGESTED   -> CLASSIFIED, DEFERRED, RETIRED
-      CLASSIFIED -> RETIRED
-      DEFERRED   -> INGESTED, RETIRED
-      RETIRED    -> (none)
+    content.* events of a tenant strictly after `cursor` (same cursor format
+    as list_content_events_tx), oldest first. Used to replay/catch up the
+    live stream; returns (rows, cursor of the last row or the input cursor).
     """
+    cursor_key, cursor_id = _decode_cursor(_EVENTS_CURSOR_SORT, cursor)
+    params: Dict[str, Any] = {
+        "tenant_id": str(tenant_id),
+        "cursor_key": cursor_key,
+        "cursor_id": cursor_id,
+        "limit": int(limit),
+    }
+    entity_sql = ""
+    if entity_id:
+        params["entity_id"] = str(entity_id)
+        entity_sql = "AND entity_id = CAST(:entity_id AS uuid)"
+
     sql = text(f"""
-        WITH c AS (
-            SELECT
-                id::text AS content_id,
-                state::text AS state,
-                {_risk_enum_to_int_sql("risk")} AS risk_tier
-            FROM public.content_items
-            WHERE tenant_id = CAST(:tenant_id AS uuid)
-              AND id = CAST(:content_id AS uuid)
-        )
         SELECT
-            c.content_id,
-            c.state AS from_state,
-            c.risk_tier,
-            CASE
-                WHEN c.state = 'INGESTED'   THEN ARRAY['CLASSIFIED','DEFERRED','RETIRED']::text[]
-                WHEN c.state = 'CLASSIFIED' THEN ARRAY['RETIRED']::text[]
-                WHEN c.state = 'DEFERRED'   THEN ARRAY['INGESTED','RETIRED']::text[]
-                ELSE ARRAY[]::text[]
-            END AS allowed
-        FROM c;
+            id::text AS id,
+            entity_type,
+            entity_id::text AS entity_id,
+            event_type,
+            actor_type,
+            COALESCE(actor_id::text, '') AS actor_id,
+            payload,
+            created_at
+        FROM public.events
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+          AND entity_type = 'content'
+          {entity_sql}
+          AND (created_at, id) > (CAST(:cursor_key AS timestamptz), CAST(:cursor_id AS uuid))
+        ORDER BY created_at ASC, id ASC
+        LIMIT :limit;
     """)
 
-    with engine.begin() as conn:
-        row = conn.execute(
-            sql,
-            {"tenant_id": str(tenant_id), "content_id": str(content_id)},
-        ).mappings().one()
+    rows = [dict(r) for r in conn.execute(sql, params).mappings().all()]
+    return rows, (_encode_cursor(_EVENTS_CURSOR_SORT, rows[-1]) if rows else cursor)
 
-    return dict(row)
+
+def event_cursor(created_at: Any, event_id: str) -> str:
+    """
+    Cursor/SSE id for one event (created_at: datetime or ISO string).
+    """
+    return _encode_cursor(_EVENTS_CURSOR_SORT, {"created_at": created_at, "id": event_id})
 
 
-def transition_content(engine: Engine, tenant_id: UUID, content_id: UUID, to_state: str) -> Dict[str, Any]:
+def check_event_cursor(cursor: str) -> None:
     """
-    Update state + write event. (Assumes main.py enforces allowed transitions.)
+    Raises ValueError("Invalid cursor") for anything event_cursor() did not mint.
     """
-    to_state = (to_state or "").strip().upper()
+    _decode_cursor(_EVENTS_CURSOR_SORT, cursor)
 
-    sql_get = text(f"""
-        SELECT
-            id::text AS content_id,
-            state::text AS from_state,
-            {_risk_enum_to_int_sql("risk")} AS risk_tier
-        FROM public.content_items
-        WHERE tenant_id = CAST(:tenant_id AS uuid)
-          AND id = CAST(:content_id AS uuid);
-    """)
 
-    sql_update = text("""
-        UPDATE public.content_items
-        SET state = CAST(:to_state AS content_state),
-            updated_at = NOW()
-        WHERE tenant_id = CAST(:tenant_id AS uuid)
-          AND id = CAST(:content_id AS uuid)
-        RETURNING id::text AS content_id;
-    """)
+# ----------------------------
+# Events partition maintenance (see migration 20261016_0005)
+# ----------------------------
 
-    sql_event = text("""
-        INSERT INTO public.events
-            (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
-        VALUES
-            (CAST(:tenant_id AS uuid), 'content', CAST(:content_id AS uuid), 'content.transitioned',
-             'system', NULL, :payload::jsonb, NOW());
-    """)
+def ensure_event_partitions_tx(conn: Connection, months_ahead: int = 3) -> List[str]:
+    """
+    Create any missing monthly partitions from this month to `months_ahead`.
+    Returns the partition names (existing + created).
+    """
+    rows = conn.execute(
+        text("SELECT public.ensure_events_partitions(CAST(:n AS int)) AS name;"),
+        {"n": int(months_ahead)},
+    ).scalars().all()
+    return list(rows)
 
-    with engine.begin() as conn:
-        cur = conn.execute(
-            sql_get, {"tenant_id": str(tenant_id), "content_id": str(content_id)}
-        ).mappings().one()
 
-        conn.execute(
-            sql_update,
-            {"tenant_id": str(tenant_id), "content_id": str(content_id), "to_state": to_state},
-        )
+def detach_event_partitions_tx(conn: Connection, keep_months: int, drop: bool = False) -> List[str]:
+    """
+    Retention: detach monthly partitions entirely older than `keep_months`
+    full months before the current one. Detaching is metadata-only (no row
+    deletes, no vacuum debt); detached tables can be archived, or dropped
+    right away with drop=True.
+    """
+    if keep_months < 1:
+        raise ValueError("keep_months must be >= 1")
 
-        payload = {
-            "from_state": cur["from_state"],
-            "to_state": to_state,
-            "risk_tier": int(cur["risk_tier"]),
-        }
+    names = conn.execute(
+        text("""
+            SELECT public.detach_events_partitions(
+                date_trunc('month', now()) - make_interval(months => CAST(:keep AS int))
+            ) AS name;
+        """),
+        {"keep": int(keep_months)},
+    ).scalars().all()
 
-        conn.execute(
-            sql_event,
-            {
-                "tenant_id": str(tenant_id),
-                "content_id": str(content_id),
-                "payload": json.dumps(payload),
-            },
-        )
+    if drop:
+        for name in names:
+            # Names come from the catalog and match ^events_y[0-9]{4}m[0-9]{2}$.
+            conn.execute(text(f'DROP TABLE IF EXISTS public."{name}";'))
+    return list(names)
+
+
+# ----------------------------
+# Drafts (delta storage, see app.drafts + migration 20261016_0011)
+# ----------------------------
+
+def _enqueue_job_tx(conn: Connection, kind: str, payload: Dict[str, Any], dedupe_key: str) -> None:
+    """
+    Queue a worker job (public.jobs, consumed by backend/worker); skipped
+    while one with the same dedupe_key is queued or running.
+    """
+    conn.execute(
+        text("""
+            INSERT INTO public.jobs (queue, kind, payload, dedupe_key)
+            VALUES ('default', :kind, CAST(:payload AS jsonb), :dedupe_key)
+            ON CONFLICT (queue, dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running')
+            DO NOTHING;
+        """),
+        {"kind": kind, "payload": json.dumps(payload), "dedupe_key": dedupe_key},
+    )
+
+
+def create_draft_version_tx(
+    conn: Connection,
+    tenant_id: UUID,
+    content_id: UUID,
+    body_md: str,
+    title: Optional[str] = None,
+    citations: Optional[List[Any]] = None,
+    expected_version: Optional[int] = None,
+    snapshot_every: int = 10,
+) -> Dict[str, Any]:
+    """
+    Append the next draft version. Snapshot versions store body_md, the
+    others a delta against the previous body (read from draft_latest, so
+    no chain replay on write). draft_latest is advanced in the same
+    transaction.
+
+    Optimistic: a concurrent writer that got the same version number first
+    (or expected_version != current version) -> ValueError("Draft version conflict").
+    """
+    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "content_id": str(content_id)}
+    cur = conn.execute(
+        text("""
+            SELECT c.id, l.version, l.body_md
+            FROM public.content_items c
+            LEFT JOIN public.draft_latest l ON l.content_id = c.id
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = CAST(:content_id AS uuid);
+        """),
+        params,
+    ).mappings().one_or_none()
+    if cur is None:
+        raise ValueError("Content not found")
+
+    prev_version = int(cur["version"] or 0)
+    if expected_version is not None and expected_version != prev_version:
+        raise ValueError("Draft version conflict")
+    version = prev_version + 1
+
+    storage, full_body, delta = "full", body_md, None
+    if prev_version and not is_snapshot_version(version, snapshot_every):
+        delta = make_delta(cur["body_md"], body_md)
+        # Rewrites barely shorter than the body itself are cheaper to read as a snapshot.
+        if len(delta) < len(body_md.encode("utf-8")) // 2:
+            storage, full_body = "delta", None
+        else:
+            delta = None
+
+    params.update(
+        version=version,
+        title=title,
+        body_md=full_body,
+        latest_body=body_md,
+        delta=delta,
+        storage=storage,
+        body_len=len(body_md),
+        citations=json.dumps(citations or []),
+    )
+    row = conn.execute(
+        text("""
+            WITH ins AS (
+                INSERT INTO public.draft_versions
+                    (tenant_id, content_id, version, title, body_md, citations, storage, delta, body_len)
+                VALUES (
+                    CAST(:tenant_id AS uuid), CAST(:content_id AS uuid), :version, :title, :body_md,
+                    CAST(:citations AS jsonb), :storage, :delta, :body_len
+                )
+                ON CONFLICT (tenant_id, content_id, version) DO NOTHING
+                RETURNING id, created_at
+            ), latest AS (
+                INSERT INTO public.draft_latest (content_id, tenant_id, version, title, body_md, citations, updated_at)
+                SELECT CAST(:content_id AS uuid), CAST(:tenant_id AS uuid), :version, :title, :latest_body,
+                       CAST(:citations AS jsonb), created_at
+                FROM ins
+                ON CONFLICT (content_id) DO UPDATE
+                SET version = EXCLUDED.version, title = EXCLUDED.title, body_md = EXCLUDED.body_md,
+                    citations = EXCLUDED.citations, updated_at = EXCLUDED.updated_at
+                WHERE draft_latest.version < EXCLUDED.version
+            )
+            SELECT id::text AS id, created_at FROM ins;
+        """),
+        params,
+    ).mappings().one_or_none()
+    if row is None:
+        raise ValueError("Draft version conflict")
+
+    # The new version has no embedding yet (worker: embeddings.backfill).
+    _enqueue_job_tx(conn, "embeddings.backfill", {"table": "drafts"}, "embeddings.backfill:drafts")
 
     return {
+        "id": row["id"],
         "content_id": str(content_id),
-        "from_state": cur["from_state"],
-        "to_state": to_state,
-        "risk_tier": int(cur["risk_tier"]),
+        "version": version,
+        "title": title,
+        "body_md": body_md,
+        "citations": citations or [],
+        "storage": storage,
+        "created_at": row["created_at"],
+    }
+
+
+def get_latest_draft_tx(conn: Connection, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    """
+    Newest draft from draft_latest: one primary-key lookup, no delta replay.
+    """
+    row = conn.execute(
+        text("""
+            SELECT l.content_id::text AS content_id, l.version, l.title, l.body_md, l.citations,
+                   d.id::text AS id, d.storage, l.updated_at AS created_at
+            FROM public.draft_latest l
+            JOIN public.draft_versions d
+              ON d.tenant_id = l.tenant_id AND d.content_id = l.content_id AND d.version = l.version
+            WHERE l.tenant_id = CAST(:tenant_id AS uuid)
+              AND l.content_id = CAST(:content_id AS uuid);
+        """).execution_options(prepare=True),
+        {"tenant_id": str(tenant_id), "content_id": str(content_id)},
+    ).mappings().one_or_none()
+    return dict(row) if row else None
+
+
+def _draft_chain_tx(conn: Connection, tenant_id: UUID, content_id: UUID, version: int) -> List[Dict[str, Any]]:
+    """
+    Rows from the nearest snapshot <= version up to version, oldest first.
+    """
+    return [
+        dict(r)
+        for r in conn.execute(
+            text("""
+                SELECT id::text AS id, version, title, body_md, delta, storage, citations, created_at
+                FROM public.draft_versions
+                WHERE tenant_id = CAST(:tenant_id AS uuid)
+                  AND content_id = CAST(:content_id AS uuid)
+                  AND version <= :version
+                  AND version >= (
+                      SELECT max(version)
+                      FROM public.draft_versions
+                      WHERE tenant_id = CAST(:tenant_id AS uuid)
+                        AND content_id = CAST(:content_id AS uuid)
+                        AND version <= :version
+                        AND storage = 'full'
+                  )
+                ORDER BY version;
+            """),
+            {"tenant_id": str(tenant_id), "content_id": str(content_id), "version": int(version)},
+        ).mappings().all()
+    ]
+
+
+def get_draft_version_tx(
+    conn: Connection, tenant_id: UUID, content_id: UUID, version: int
+) -> Optional[Dict[str, Any]]:
+    """
+    Any version: its snapshot plus the deltas after it (at most
+    snapshot_every - 1 of them), replayed in order.
+    """
+    chain = _draft_chain_tx(conn, tenant_id, content_id, version)
+    if not chain or chain[-1]["version"] != version:
+        return None
+    body = chain[0]["body_md"]
+    for r in chain[1:]:
+        body = apply_delta(body, bytes(r["delta"]))
+    last = chain[-1]
+    return {
+        "id": last["id"],
+        "content_id": str(content_id),
+        "version": last["version"],
+        "title": last["title"],
+        "body_md": body,
+        "citations": last["citations"],
+        "storage": last["storage"],
+        "created_at": last["created_at"],
     }
+
+
+def list_draft_versions_tx(conn: Connection, tenant_id: UUID, content_id: UUID) -> List[Dict[str, Any]]:
+    """
+    Version metadata (no bodies), newest first.
+    """
+    rows = conn.execute(
+        text("""
+            SELECT
+                id::text AS id,
+                version,
+                title,
+                storage,
+                body_len,
+                COALESCE(octet_length(delta), octet_length(body_md)) AS stored_bytes,
+                created_at
+            FROM public.draft_versions
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+              AND content_id = CAST(:content_id AS uuid)
+            ORDER BY version DESC;
+        """),
+        {"tenant_id": str(tenant_id), "content_id": str(content_id)},
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def list_drafted_content_tx(conn: Connection) -> List[Tuple[str, str]]:
+    """
+    (tenant_id, content_id) of every item with drafts (maintenance).
+    """
+    rows = conn.execute(
+        text("SELECT tenant_id::text, content_id::text FROM public.draft_latest ORDER BY tenant_id, content_id;")
+    ).all()
+    return [(r[0], r[1]) for r in rows]
+
+
+def rewrite_draft_chain_tx(conn: Connection, tenant_id: UUID, content_id: UUID, snapshot_every: int) -> Dict[str, int]:
+    """
+    Re-store every version of one item with `snapshot_every` (1 = all full):
+    compacts drafts written before delta storage, or expands deltas before
+    a downgrade. Bodies are unchanged.
+    """
+    rows = conn.execute(
+        text("""
+            SELECT id, version, body_md, delta
+            FROM public.draft_versions
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+              AND content_id = CAST(:content_id AS uuid)
+            ORDER BY version
+            FOR UPDATE;
+        """),
+        {"tenant_id": str(tenant_id), "content_id": str(content_id)},
+    ).mappings().all()
+
+    ids: List[str] = []
+    storages: List[str] = []
+    bodies: List[Optional[str]] = []
+    deltas: List[Optional[bytes]] = []
+    prev: Optional[str] = None
+    for r in rows:
+        body = r["body_md"] if r["body_md"] is not None else apply_delta(prev or "", bytes(r["delta"]))
+        full = prev is None or is_snapshot_version(int(r["version"]), snapshot_every)
+        ids.append(str(r["id"]))
+        storages.append("full" if full else "delta")
+        bodies.append(body if full else None)
+        deltas.append(None if full else make_delta(prev, body))
+        prev = body
+
+    if ids:
+        conn.execute(
+            text("""
+                UPDATE public.draft_versions d
+                SET storage = v.storage, body_md = v.body_md, delta = v.delta
+                FROM unnest(
+                    CAST(:ids AS uuid[]), CAST(:storages AS text[]), CAST(:bodies AS text[]), CAST(:deltas AS bytea[])
+                ) AS v(id, storage, body_md, delta)
+                WHERE d.id = v.id;
+            """),
+            {"ids": ids, "storages": storages, "bodies": bodies, "deltas": deltas},
+        )
+    return {"versions": len(ids), "snapshots": storages.count("full"), "deltas": storages.count("delta")}
+
+
+# ----------------------------
+# Published feed (pre-rendered, see app.published + migration 20261016_0012)
+# ----------------------------
+
+# Transitions into these states change what the public feed shows.
+_FEED_STATES = ("PUBLISHED", "RETIRED")
+
+# Feed cursors reuse the content cursor format: published_at under "k", publication id under "id".
+_FEED_CURSOR_SORT = "created_at_desc"
+
+
+def _bump_feed_version_tx(conn: Connection, tenant_id: UUID) -> None:
+    conn.execute(
+        text("""
+            INSERT INTO public.published_feed_state AS s (tenant_id, version, updated_at)
+            VALUES (CAST(:tenant_id AS uuid), 1, NOW())
+            ON CONFLICT (tenant_id) DO UPDATE SET version = s.version + 1, updated_at = NOW();
+        """),
+        {"tenant_id": str(tenant_id)},
+    )
+
+
+def _publish_posts_tx(conn: Connection, tid: str, ids: List[str]) -> int:
+    # Serializes slug allocation per tenant (publications is UNIQUE (tenant_id, slug)).
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('publications:' || :tenant_id));"), {"tenant_id": tid})
+
+    rows = conn.execute(
+        text("""
+            SELECT c.id::text AS content_id, COALESCE(NULLIF(l.title, ''), c.title) AS title,
+                   l.body_md, l.citations, l.version, d.id::text AS draft_id,
+                   p.id::text AS publication_id, p.slug
+            FROM public.content_items c
+            JOIN public.draft_latest l ON l.content_id = c.id
+            JOIN public.draft_versions d
+              ON d.tenant_id = l.tenant_id AND d.content_id = l.content_id AND d.version = l.version
+            LEFT JOIN LATERAL (
+                SELECT id, slug
+                FROM public.publications
+                WHERE tenant_id = c.tenant_id AND content_id = c.id
+                ORDER BY is_live DESC, created_at DESC
+                LIMIT 1
+            ) p ON true
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = ANY(CAST(:ids AS uuid[]))
+            ORDER BY c.id;
+        """),
+        {"tenant_id": tid, "ids": ids},
+    ).mappings().all()
+    if not rows:
+        return 0
+
+    bases = sorted({slugify(r["title"]) for r in rows if r["publication_id"] is None})
+    taken = set()
+    if bases:
+        taken = {
+            r[0]
+            for r in conn.execute(
+                text("""
+                    SELECT slug FROM public.publications
+                    WHERE tenant_id = CAST(:tenant_id AS uuid)
+                      AND (slug = ANY(CAST(:bases AS text[]))
+                           OR substring(slug FROM '^(.*)-[0-9]+$') = ANY(CAST(:bases AS text[])));
+                """),
+                {"tenant_id": tid, "bases": bases},
+            ).all()
+        }
+
+    cols: Dict[str, List[Any]] = {
+        k: [] for k in ("pub_ids", "content_ids", "draft_ids", "slugs", "titles", "summaries", "htmls", "metas", "etags")
+    }
+    for r in rows:
+        slug = r["slug"]
+        if r["publication_id"] is None:
+            slug = unique_slug(slugify(r["title"]), taken)
+            taken.add(slug)
+        meta = {"content_id": r["content_id"], "draft_version": r["version"], "citations": r["citations"] or []}
+        body_html, summary, meta, etag = render_post(r["title"], r["body_md"], meta)
+        cols["pub_ids"].append(r["publication_id"] or str(uuid4()))
+        cols["content_ids"].append(r["content_id"])
+        cols["draft_ids"].append(r["draft_id"])
+        cols["slugs"].append(slug)
+        cols["titles"].append(r["title"])
+        cols["summaries"].append(summary)
+        cols["htmls"].append(body_html)
+        cols["metas"].append(json.dumps(meta, default=str))
+        cols["etags"].append(etag)
+
+    conn.execute(
+        text("""
+            WITH v AS (
+                SELECT *
+                FROM unnest(
+                    CAST(:pub_ids AS uuid[]), CAST(:content_ids AS uuid[]), CAST(:draft_ids AS uuid[]),
+                    CAST(:slugs AS text[]), CAST(:titles AS text[]), CAST(:summaries AS text[]),
+                    CAST(:htmls AS text[]), CAST(:metas AS jsonb[]), CAST(:etags AS text[])
+                ) AS v(publication_id, content_id, draft_id, slug, title, summary, html, metadata, etag)
+            ), pub AS (
+                INSERT INTO public.publications AS p (id, tenant_id, content_id, draft_id, slug, is_live, published_at)
+                SELECT publication_id, CAST(:tenant_id AS uuid), content_id, draft_id, slug, true, NOW()
+                FROM v
+                ON CONFLICT (id) DO UPDATE
+                SET draft_id = EXCLUDED.draft_id, is_live = true,
+                    published_at = COALESCE(p.published_at, EXCLUDED.published_at)
+                RETURNING p.id, p.published_at
+            )
+            INSERT INTO public.published_posts AS pp
+                (publication_id, tenant_id, content_id, slug, title, summary, html, metadata, etag, published_at, updated_at)
+            SELECT v.publication_id, CAST(:tenant_id AS uuid), v.content_id, v.slug, v.title, v.summary,
+                   v.html, v.metadata, v.etag, pub.published_at, NOW()
+            FROM v
+            JOIN pub ON pub.id = v.publication_id
+            ON CONFLICT (publication_id) DO UPDATE
+            SET title = EXCLUDED.title, summary = EXCLUDED.summary, html = EXCLUDED.html,
+                metadata = EXCLUDED.metadata, etag = EXCLUDED.etag, published_at = EXCLUDED.published_at,
+                updated_at = NOW();
+        """),
+        {"tenant_id": tid, **cols},
+    )
+    return len(rows)
+
+
+def refresh_published_feed_tx(conn: Connection, tenant_id: UUID, content_ids: List[str], to_state: str) -> int:
+    """
+    Incrementally update published_posts for items that just moved to
+    `to_state`, in the transition's transaction:
+      PUBLISHED -> (re)render the latest draft, upsert the live publication + its post
+      RETIRED   -> publication no longer live, post removed
+    Other states are a no-op. Items without a draft get no post. Returns
+    the number of posts written or removed; the feed version (list ETag) is
+    bumped when it is non-zero.
+    """
+    to_state = (to_state or "").strip().upper()
+    ids = [str(c) for c in content_ids]
+    if not ids or to_state not in _FEED_STATES:
+        return 0
+    tid = str(tenant_id)
+
+    if to_state == "PUBLISHED":
+        n = _publish_posts_tx(conn, tid, ids)
+    else:
+        n = conn.execute(
+            text("""
+                WITH unlive AS (
+                    UPDATE public.publications
+                    SET is_live = false
+                    WHERE tenant_id = CAST(:tenant_id AS uuid)
+                      AND content_id = ANY(CAST(:ids AS uuid[]))
+                      AND is_live
+                ), del AS (
+                    DELETE FROM public.published_posts
+                    WHERE tenant_id = CAST(:tenant_id AS uuid)
+                      AND content_id = ANY(CAST(:ids AS uuid[]))
+                    RETURNING 1
+                )
+                SELECT count(*) FROM del;
+            """),
+            {"tenant_id": tid, "ids": ids},
+        ).scalar_one()
+
+    if n:
+        _bump_feed_version_tx(conn, tenant_id)
+    return int(n)
+
+
+def rebuild_published_feed_tx(conn: Connection, tenant_id: UUID) -> int:
+    """
+    Re-render the posts of every PUBLISHED item of a tenant (backfill after
+    the migration, or after a renderer change).
+    """
+    ids = [
+        r[0]
+        for r in conn.execute(
+            text("""
+                SELECT id::text FROM public.content_items
+                WHERE tenant_id = CAST(:tenant_id AS uuid) AND state = 'PUBLISHED'
+                ORDER BY id;
+            """),
+            {"tenant_id": str(tenant_id)},
+        ).all()
+    ]
+    return refresh_published_feed_tx(conn, tenant_id, ids, "PUBLISHED")
+
+
+def list_tenant_ids_tx(conn: Connection) -> List[str]:
+    return [r[0] for r in conn.execute(text("SELECT id::text FROM public.tenants ORDER BY id;")).all()]
+
+
+def get_published_feed_version_tx(conn: Connection, tenant_id: UUID) -> int:
+    """
+    Feed version of a tenant (0 before the first publish): the list ETag.
+    """
+    v = conn.execute(
+        text("SELECT version FROM public.published_feed_state WHERE tenant_id = CAST(:tenant_id AS uuid);").execution_options(
+            prepare=True
+        ),
+        {"tenant_id": str(tenant_id)},
+    ).scalar_one_or_none()
+    return int(v or 0)
+
+
+def list_published_posts_versioned_tx(
+    conn: Connection, tenant_id: UUID, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+    """
+    (feed version, page, next_cursor) from one transaction on one server.
+    The version is read first, so the page is never older than the version it is tagged with.
+    """
+    version = get_published_feed_version_tx(conn, tenant_id)
+    items, next_cursor = list_published_posts_tx(conn, tenant_id, limit=limit, cursor=cursor)
+    return version, items, next_cursor
+
+
+def list_published_posts_tx(
+    conn: Connection, tenant_id: UUID, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of the public feed, newest first, from published_posts only.
+    Keyset on (published_at, publication_id) -> idx_published_posts_feed.
+    Returns (rows without html, next_cursor).
+    """
+    params: Dict[str, Any] = {"tenant_id": str(tenant_id), "limit": int(limit) + 1}
+    after_sql = ""
+    if cursor:
+        params["cursor_key"], params["cursor_id"] = _decode_cursor(_FEED_CURSOR_SORT, cursor)
+        after_sql = "AND (published_at, publication_id) < (CAST(:cursor_key AS timestamptz), CAST(:cursor_id AS uuid))"
+
+    rows = [
+        dict(r)
+        for r in conn.execute(
+            text(f"""
+                SELECT publication_id::text AS id, slug, title, summary, metadata, etag, published_at, updated_at
+                FROM public.published_posts
+                WHERE tenant_id = CAST(:tenant_id AS uuid)
+                  {after_sql}
+                ORDER BY published_at DESC, publication_id DESC
+                LIMIT :limit;
+            """).execution_options(prepare=True),
+            params,
+        ).mappings().all()
+    ]
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(_FEED_CURSOR_SORT, {"created_at": rows[-1]["published_at"], "id": rows[-1]["id"]})
+    return rows, next_cursor
+
+
+def get_published_post_tx(conn: Connection, tenant_id: UUID, slug: str) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        text("""
+            SELECT publication_id::text AS id, slug, title, summary, html, metadata, etag, published_at, updated_at
+            FROM public.published_posts
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+              AND slug = :slug;
+        """).execution_options(prepare=True),
+        {"tenant_id": str(tenant_id), "slug": slug},
+    ).mappings().one_or_none()
+    return dict(row) if row else None
+
+
+# ----------------------------
+# Policies (see app.policy + migration 20261016_0013)
+# ----------------------------
+
+def _get_active_policy_tx(conn: Connection, tenant_id: UUID) -> Optional[Dict[str, Any]]:
+    row = conn.execute(
+        text("""
+            SELECT version, policy
+            FROM public.policy_versions
+            WHERE tenant_id = CAST(:tenant_id AS uuid) AND is_active;
+        """).execution_options(prepare=True),
+        {"tenant_id": str(tenant_id)},
+    ).mappings().one_or_none()
+    return dict(row) if row else None
+
+
+def tenant_workflow_tx(conn: Connection, tenant_id: UUID) -> TenantWorkflow:
+    """
+    (active policy version, compiled workflow) for the tenant. A cache hit
+    is a dict lookup; a miss reads the active policy_versions row once
+    (compiled at most once per version). No active version -> the default
+    workflow (version None).
+    """
+    cache = get_policy_cache()
+    entry = cache.get(str(tenant_id))
+    if entry is not MISSING:
+        return entry
+
+    generation = cache.generation
+    row = _get_active_policy_tx(conn, tenant_id)
+    entry = (None, WORKFLOW)
+    if row is not None:
+        try:
+            entry = (row["version"], cache.compiled(str(tenant_id), row["version"], row["policy"]))
+        except WorkflowError as e:
+            raise ValueError(f"Active policy {row['version']} is invalid: {e}")
+    # A replica may not have replayed the latest activation yet: use, but do not cache.
+    if not conn.get_execution_options().get("replica"):
+        cache.put(str(tenant_id), entry, generation)
+    return entry
+
+
+def list_policy_versions_tx(conn: Connection, tenant_id: UUID) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        text("""
+            SELECT id::text AS id, version, is_active, policy, created_at
+            FROM public.policy_versions
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+            ORDER BY created_at DESC, version DESC;
+        """),
+        {"tenant_id": str(tenant_id)},
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def create_policy_version_tx(
+    conn: Connection, tenant_id: UUID, version: str, policy: Dict[str, Any], activate: bool = False
+) -> Dict[str, Any]:
+    """
+    Store a new (immutable) policy version; the policy is compiled first, so
+    an invalid one is rejected here rather than on the next transition.
+    Existing version -> ValueError("Policy version conflict").
+    """
+    version = (version or "").strip()
+    if not version:
+        raise ValueError("Policy version is required")
+    try:
+        compile_policy(policy)
+    except WorkflowError as e:
+        raise ValueError(f"Invalid policy: {e}")
+
+    row = conn.execute(
+        text("""
+            INSERT INTO public.policy_versions (tenant_id, version, policy, is_active, created_at)
+            VALUES (CAST(:tenant_id AS uuid), :version, CAST(:policy AS jsonb), false, NOW())
+            ON CONFLICT (tenant_id, version) DO NOTHING
+            RETURNING id::text AS id, version, is_active, policy, created_at;
+        """),
+        {"tenant_id": str(tenant_id), "version": version, "policy": json.dumps(policy)},
+    ).mappings().one_or_none()
+    if row is None:
+        raise ValueError("Policy version conflict")
+
+    if activate:
+        return activate_policy_version_tx(conn, tenant_id, version)
+    return dict(row)
+
+
+def activate_policy_version_tx(conn: Connection, tenant_id: UUID, version: str) -> Dict[str, Any]:
+    """
+    Make `version` the tenant's only active policy. The trigger from
+    migration 0013 sends `policy_events` on commit, which drops the cached
+    workflow in every API process; callers in this process invalidate
+    right after their commit (invalidate_policy).
+    """
+    tid = str(tenant_id)
+    # Serializes activations per tenant (uq_policy_versions_active allows one active row).
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('policy_versions:' || :tenant_id));"), {"tenant_id": tid})
+
+    row = conn.execute(
+        text("""
+            SELECT id::text AS id, version, is_active, policy, created_at
+            FROM public.policy_versions
+            WHERE tenant_id = CAST(:tenant_id AS uuid) AND version = :version
+            FOR UPDATE;
+        """),
+        {"tenant_id": tid, "version": version},
+    ).mappings().one_or_none()
+    if row is None:
+        raise ValueError("Policy version not found")
+    try:
+        compile_policy(row["policy"])
+    except WorkflowError as e:
+        raise ValueError(f"Invalid policy: {e}")
+
+    if not row["is_active"]:
+        # Two statements: the unique index is checked row by row, not at the end of one UPDATE.
+        conn.execute(
+            text("""
+                UPDATE public.policy_versions SET is_active = false
+                WHERE tenant_id = CAST(:tenant_id AS uuid) AND is_active;
+            """),
+            {"tenant_id": tid},
+        )
+        conn.execute(
+            text("""
+                UPDATE public.policy_versions SET is_active = true
+                WHERE tenant_id = CAST(:tenant_id AS uuid) AND version = :version;
+            """),
+            {"tenant_id": tid, "version": version},
+        )
+    return {**dict(row), "is_active": True}
+
+
+# ----------------------------
+# Governance: allowed + transition
+# ----------------------------
+
+def get_allowed_transitions_tx(conn: Connection, tenant_id: UUID, content_id: UUID) -> Dict[str, Any]:
+    """
+    Current state + risk tier come from the DB; the allowed next states come
+    from the tenant's compiled workflow (tenant_workflow_tx), the same table
+    transition_content_tx validates against.
+    """
+    sql = text(f"""
+        SELECT
+            id::text AS content_id,
+            state::text AS from_state,
+            {_risk_enum_to_int_sql("risk")} AS risk_tier
+        FROM public.content_items
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+          AND id = CAST(:content_id AS uuid);
+    """)
+
+    row = conn.execute(
+        sql,
+        {"tenant_id": str(tenant_id), "content_id": str(content_id)},
+    ).mappings().one_or_none()
+
+    if row is None:
+        raise ValueError("Content not found")
+
+    policy_version, workflow = tenant_workflow_tx(conn, tenant_id)
+    out = dict(row)
+    out["allowed"] = list(workflow.allowed_from(out["from_state"], int(out["risk_tier"])))
+    out["policy_version"] = policy_version
+    return out
+
+
+def transition_content_tx(
+    conn: Connection,
+    tenant_id: UUID,
+    content_id: UUID,
+    to_state: str,
+    expected_from_state: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Validate + update state + write the content.transitioned event + adjust
+    content_state_counts, all in ONE statement (one round trip, one event).
+
+    Race safety: the current row is locked (SELECT ... FOR UPDATE) and the
+    UPDATE only applies if (current state, risk tier) is an allowed source for
+    `to_state` per the tenant's compiled workflow (active policy). Under READ COMMITTED a
+    concurrent transition that committed first is seen here, so two callers
+    can never both move from the same from_state.
+
+    expected_from_state (optional) adds optimistic concurrency: the update is
+    only applied if the item is still in that state.
+
+    Raises ValueError:
+      - "... not found"            -> 404
+      - "Transition not allowed"   -> 409
+      - "Transition conflict"      -> 409 (expected_from_state no longer current)
+      - anything else              -> 400
+    """
+    to_state = (to_state or "").strip().upper()
+    if to_state not in STATES:
+        raise ValueError(f"Unknown to_state: {to_state}")
+
+    expected = (expected_from_state or "").strip().upper() or None
+
+    # Every (from_state, risk_tier) pair from which to_state may be entered (precompiled).
+    _, workflow = tenant_workflow_tx(conn, tenant_id)
+    from_states, from_tiers = workflow.sources[to_state]
+
+    risk_int = _risk_enum_to_int_sql("cur.risk")
+
+    sql = text(f"""
+        WITH cur AS (
+            SELECT id, tenant_id, state, risk
+            FROM public.content_items
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+              AND id = CAST(:content_id AS uuid)
+            FOR UPDATE
+        ), upd AS (
+            UPDATE public.content_items c
+            SET state = CAST(:to_state AS content_state),
+                updated_at = NOW()
+            FROM cur
+            WHERE c.id = cur.id
+              AND (CAST(:expected AS text) IS NULL OR cur.state::text = CAST(:expected AS text))
+              AND (cur.state::text, {risk_int}) IN (
+                  SELECT * FROM unnest(CAST(:from_states AS text[]), CAST(:from_tiers AS int[]))
+              )
+            RETURNING c.id, c.tenant_id, cur.state AS from_state, c.state AS to_state, {risk_int} AS risk_tier
+        ), ev AS (
+            INSERT INTO public.events
+                (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+            SELECT
+                tenant_id, 'content', id, 'content.transitioned', 'system', NULL,
+                jsonb_build_object(
+                    'from_state', from_state::text,
+                    'to_state', to_state::text,
+                    'risk_tier', risk_tier
+                ),
+                NOW()
+            FROM upd
+            RETURNING id
+        ), cnt AS (
+            -- (tenant_id, state) order: opposite transitions lock the counter rows in the same order.
+            INSERT INTO public.content_state_counts AS sc (tenant_id, state, n)
+            SELECT d.tenant_id, d.state, SUM(d.delta)
+            FROM (
+                SELECT tenant_id, from_state AS state, -1 AS delta FROM upd
+                UNION ALL
+                SELECT tenant_id, to_state, 1 FROM upd
+            ) d
+            GROUP BY d.tenant_id, d.state
+            ORDER BY d.tenant_id, d.state
+            ON CONFLICT (tenant_id, state) DO UPDATE SET n = sc.n + EXCLUDED.n
+        )
+        SELECT
+            cur.id::text AS content_id,
+            cur.state::text AS current_state,
+            {risk_int} AS risk_tier,
+            EXISTS (SELECT 1 FROM upd) AS applied
+        FROM cur;
+    """).execution_options(query_name="transition_content.update", prepare=True)
+
+    params = {
+        "tenant_id": str(tenant_id),
+        "content_id": str(content_id),
+        "to_state": to_state,
+        "expected": expected,
+        "from_states": list(from_states),
+        "from_tiers": list(from_tiers),
+    }
+
+    row = conn.execute(sql, params).mappings().one_or_none()
+
+    if row is None:
+        raise ValueError("Content not found")
+
+    from_state = row["current_state"]
+    risk_tier = int(row["risk_tier"])
+
+    if not row["applied"]:
+        if expected is not None and from_state != expected:
+            raise ValueError(
+                f"Transition conflict: expected state {expected}, current state is {from_state}"
+            )
+        try:
+            validate_transition(from_state, to_state, risk_tier, workflow)
+        except WorkflowError as e:
+            raise ValueError(str(e))
+        # Allowed on paper but the guarded UPDATE did not apply.
+        raise ValueError(f"Transition not allowed: {from_state} -> {to_state}")
+
+    if to_state == "PUBLISHED" or (to_state == "RETIRED" and from_state == "PUBLISHED"):
+        refresh_published_feed_tx(conn, tenant_id, [row["content_id"]], to_state)
+
+    return {
+        "content_id": row["content_id"],
+        "from_state": from_state,
+        "to_state": to_state,
+        "risk_tier": risk_tier,
+    }
+
+
+def transition_content_batch_tx(
+    conn: Connection, tenant_id: UUID, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Apply many transitions in one transaction / two round trips:
+      1. load + lock every target row (one SELECT ... FOR UPDATE, id order)
+      2. one statement: set-based UPDATE + multi-row event INSERT + counter deltas
+
+    Validation happens in memory against the workflow graph between the two.
+
+    items: [{"content_id": str, "to_state": str, "expected_from_state"?: str}, ...]
+    Returns one result per item (same order):
+      {"content_id", "ok", "status", "from_state", "to_state", "error"}
+    status: ok | invalid | not_found | not_allowed | conflict
+    """
+    results: List[Dict[str, Any]] = []
+    wanted: Dict[str, int] = {}  # content_id -> index of the request that owns it
+
+    for i, it in enumerate(items):
+        cid = str(it.get("content_id") or "").strip()
+        to_state = (it.get("to_state") or "").strip().upper()
+        res = {"content_id": cid, "ok": False, "status": "invalid", "from_state": None, "to_state": to_state, "error": None}
+        results.append(res)
+        try:
+            cid = str(UUID(cid))
+        except ValueError:
+            res["error"] = "Invalid content_id"
+            continue
+        res["content_id"] = cid
+        if to_state not in STATES:
+            res["error"] = f"Unknown to_state: {to_state}"
+            continue
+        if cid in wanted:
+            res["status"] = "conflict"
+            res["error"] = "Duplicate content_id in batch"
+            continue
+        wanted[cid] = i
+
+    if not wanted:
+        return results
+
+    risk_int = _risk_enum_to_int_sql("risk")
+    sql_lock = text(f"""
+        SELECT id::text AS id, state::text AS state, {risk_int} AS risk_tier
+        FROM public.content_items
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+          AND id = ANY(CAST(:ids AS uuid[]))
+        ORDER BY id
+        FOR UPDATE;
+    """).execution_options(query_name="transition_content_batch.lock")
+
+    sql_apply = text("""
+        WITH v AS (
+            SELECT *
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:from_states AS text[]),
+                        CAST(:to_states AS text[]), CAST(:risk_tiers AS int[]))
+                 AS v(id, from_state, to_state, risk_tier)
+        ), upd AS (
+            UPDATE public.content_items c
+            SET state = CAST(v.to_state AS content_state),
+                updated_at = NOW()
+            FROM v
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = v.id
+              AND c.state::text = v.from_state
+            RETURNING c.id, v.from_state, v.to_state, v.risk_tier
+        ), ev AS (
+            INSERT INTO public.events
+                (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+            SELECT
+                CAST(:tenant_id AS uuid), 'content', id, 'content.transitioned', 'system', NULL,
+                jsonb_build_object('from_state', from_state, 'to_state', to_state, 'risk_tier', risk_tier),
+                NOW()
+            FROM upd
+        ), cnt AS (
+            INSERT INTO public.content_state_counts AS sc (tenant_id, state, n)
+            SELECT CAST(:tenant_id AS uuid), CAST(d.state AS content_state), SUM(d.delta)
+            FROM (
+                SELECT from_state AS state, -1 AS delta FROM upd
+                UNION ALL
+                SELECT to_state, 1 FROM upd
+            ) d
+            GROUP BY 2
+            ORDER BY 2
+            ON CONFLICT (tenant_id, state) DO UPDATE SET n = sc.n + EXCLUDED.n
+        )
+        SELECT id::text AS id FROM upd;
+    """).execution_options(query_name="transition_content_batch.update")
+
+    tid = str(tenant_id)
+    current = {
+        r["id"]: r
+        for r in conn.execute(sql_lock, {"tenant_id": tid, "ids": list(wanted.keys())}).mappings().all()
+    }
+
+    candidates: List[str] = []
+
+    for cid, i in wanted.items():
+        res = results[i]
+        row = current.get(cid)
+        if row is None:
+            res["status"] = "not_found"
+            res["error"] = "Content not found"
+            continue
+
+        from_state = row["state"]
+        res["from_state"] = from_state
+        expected = (items[i].get("expected_from_state") or "").strip().upper()
+        if expected and expected != from_state:
+            res["status"] = "conflict"
+            res["error"] = f"Transition conflict: expected state {expected}, current state is {from_state}"
+            continue
+
+        candidates.append(cid)
+
+    # One vectorized pass over the compiled workflow table.
+    c_from = [current[cid]["state"] for cid in candidates]
+    c_to = [results[wanted[cid]]["to_state"] for cid in candidates]
+    c_tiers = [int(current[cid]["risk_tier"]) for cid in candidates]
+    _, workflow = tenant_workflow_tx(conn, tenant_id)
+    verdicts = workflow.validate_many(c_from, c_to, c_tiers)
+
+    apply_ids: List[str] = []
+    apply_from: List[str] = []
+    apply_to: List[str] = []
+    apply_tiers: List[int] = []
+
+    for cid, f, t, r, ok in zip(candidates, c_from, c_to, c_tiers, verdicts):
+        if not ok:
+            res = results[wanted[cid]]
+            res["status"] = "not_allowed"
+            try:
+                validate_transition(f, t, r, workflow)
+            except WorkflowError as e:
+                res["error"] = str(e)
+            continue
+        apply_ids.append(cid)
+        apply_from.append(f)
+        apply_to.append(t)
+        apply_tiers.append(r)
+
+    if apply_ids:
+        applied = {
+            r["id"]
+            for r in conn.execute(
+                sql_apply,
+                {
+                    "tenant_id": tid,
+                    "ids": apply_ids,
+                    "from_states": apply_from,
+                    "to_states": apply_to,
+                    "risk_tiers": apply_tiers,
+                },
+            ).mappings().all()
+        }
+        for cid in apply_ids:
+            res = results[wanted[cid]]
+            if cid in applied:
+                res["ok"] = True
+                res["status"] = "ok"
+            else:
+                # Rows are locked above, so this only happens if state changed under us.
+                res["status"] = "conflict"
+                res["error"] = "Transition conflict: state changed concurrently"
+
+        published = [c for c, t in zip(apply_ids, apply_to) if c in applied and t == "PUBLISHED"]
+        retired = [
+            c for c, f, t in zip(apply_ids, apply_from, apply_to) if c in applied and t == "RETIRED" and f == "PUBLISHED"
+        ]
+        refresh_published_feed_tx(conn, tenant_id, published, "PUBLISHED")
+        refresh_published_feed_tx(conn, tenant_id, retired, "RETIRED")
+
+    return results
+
+
+def transition_state_batch_tx(
+    conn: Connection, tenant_id: UUID, from_state: str, to_state: str, limit: int = 1000
+) -> List[Dict[str, Any]]:
+    """
+    Move up to `limit` items currently in `from_state` to `to_state`
+    (e.g. defer everything in SELECTED). Rows locked by another transaction
+    are skipped and picked up by the next call; the selected rows stay locked
+    for the rest of this transaction.
+    """
+    from_state = (from_state or "").strip().upper()
+    if from_state not in STATES:
+        raise ValueError(f"Unknown from_state: {from_state}")
+
+    sql = text("""
+        SELECT id::text AS id
+        FROM public.content_items
+        WHERE tenant_id = CAST(:tenant_id AS uuid)
+          AND state = CAST(:from_state AS content_state)
+        ORDER BY id
+        LIMIT :limit
+        FOR UPDATE SKIP LOCKED;
+    """)
+
+    ids = [
+        r["id"]
+        for r in conn.execute(
+            sql, {"tenant_id": str(tenant_id), "from_state": from_state, "limit": int(limit)}
+        ).mappings().all()
+    ]
+
+    return transition_content_batch_tx(
+        conn,
+        tenant_id,
+        [{"content_id": cid, "to_state": to_state, "expected_from_state": from_state} for cid in ids],
+    )
+
+
+def insert_event_tx(
+    conn: Connection,
+    tenant_id: UUID,
+    entity_type: str,
+    entity_id: UUID,
+    event_type: str,
+    payload: Dict[str, Any],
+    actor_type: str = "system",
+    actor_id: Optional[UUID] = None,
+) -> str:
+    """
+    Append one row to public.events in its own transaction. Returns the event id.
+    """
+    sql = text("""
+        INSERT INTO public.events
+            (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+        VALUES
+            (CAST(:tenant_id AS uuid), :entity_type, CAST(:entity_id AS uuid), :event_type,
+             :actor_type, CAST(:actor_id AS uuid), CAST(:payload AS jsonb), NOW())
+        RETURNING id::text AS id;
+    """)
+
+    row = conn.execute(
+        sql,
+        {
+            "tenant_id": str(tenant_id),
+            "entity_type": entity_type,
+            "entity_id": str(entity_id),
+            "event_type": event_type,
+            "actor_type": actor_type,
+            "actor_id": str(actor_id) if actor_id else None,
+            "payload": json.dumps(payload),
+        },
+    ).mappings().one()
+
+    return row["id"]
+
+
+def insert_events_tx(conn: Connection, events: List[Dict[str, Any]]) -> int:
+    """
+    Append many events with ONE multi-row INSERT (parallel arrays + unnest).
+    Used by the event sink's flusher. Returns the number of rows written.
+
+    events: [{"tenant_id", "entity_type", "entity_id", "event_type", "payload",
+              "actor_type"?, "actor_id"?}, ...]
+    created_at is NOW() of this transaction (the DB clock), never the caller's.
+    """
+    if not events:
+        return 0
+
+    sql = text("""
+        INSERT INTO public.events
+            (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+        SELECT
+            t.tenant_id, t.entity_type, t.entity_id, t.event_type, t.actor_type, t.actor_id,
+            t.payload, NOW()
+        FROM unnest(
+            CAST(:tenant_ids AS uuid[]),
+            CAST(:entity_types AS text[]),
+            CAST(:entity_ids AS uuid[]),
+            CAST(:event_types AS text[]),
+            CAST(:actor_types AS text[]),
+            CAST(:actor_ids AS uuid[]),
+            CAST(:payloads AS jsonb[])
+        ) AS t(tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload);
+    """)
+
+    conn.execute(
+        sql,
+        {
+            "tenant_ids": [str(e["tenant_id"]) for e in events],
+            "entity_types": [e["entity_type"] for e in events],
+            "entity_ids": [str(e["entity_id"]) for e in events],
+            "event_types": [e["event_type"] for e in events],
+            "actor_types": [e.get("actor_type") or "system" for e in events],
+            "actor_ids": [str(e["actor_id"]) if e.get("actor_id") else None for e in events],
+            "payloads": [json.dumps(e.get("payload") or {}) for e in events],
+        },
+    )
+    return len(events)
+
+
+# ----------------------------
+# Engine-level API (one transaction per call)
+# ----------------------------
+
+def create_content_item(
+    engine: Engine, tenant_id: UUID, title: str, risk_tier: int, with_event: bool = False
+) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return create_content_item_tx(conn, tenant_id, title, risk_tier, with_event=with_event)
+
+
+def create_content_items_batch(engine: Engine, tenant_id: UUID, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return create_content_items_batch_tx(conn, tenant_id, items)
+
+
+def get_content_by_id(engine: Engine, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return get_content_by_id_tx(conn, tenant_id, content_id)
+
+
+def get_content_validators(engine: Engine, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return get_content_validators_tx(conn, tenant_id, content_id)
+
+
+def list_content(engine: Engine, tenant_id: UUID, **kwargs: Any) -> Tuple[List[Dict[str, Any]], Optional[int], bool, Optional[str]]:
+    with engine.begin() as conn:
+        return list_content_tx(conn, tenant_id, **kwargs)
+
+
+def typeahead_content(engine: Engine, tenant_id: UUID, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return typeahead_content_tx(conn, tenant_id, prefix, limit=limit)
+
+
+def get_state_histogram(engine: Engine, tenant_id: UUID) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return get_state_histogram_tx(conn, tenant_id)
+
+
+def recount_state_counts(engine: Engine, tenant_id: UUID) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return recount_state_counts_tx(conn, tenant_id)
+
+
+def similar_content(engine: Engine, tenant_id: UUID, content_id: UUID, **kwargs: Any) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return similar_content_tx(conn, tenant_id, content_id, **kwargs)
+
+
+def list_content_events(
+    engine: Engine, tenant_id: UUID, content_id: UUID, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    with engine.begin() as conn:
+        return list_content_events_tx(conn, tenant_id, content_id, limit=limit, cursor=cursor)
+
+
+def list_tenant_events_since(engine: Engine, tenant_id: UUID, cursor: str, **kwargs: Any) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    with engine.begin() as conn:
+        return list_tenant_events_since_tx(conn, tenant_id, cursor, **kwargs)
+
+
+def ensure_event_partitions(engine: Engine, months_ahead: int = 3) -> List[str]:
+    with engine.begin() as conn:
+        return ensure_event_partitions_tx(conn, months_ahead=months_ahead)
+
+
+def detach_event_partitions(engine: Engine, keep_months: int, drop: bool = False) -> List[str]:
+    with engine.begin() as conn:
+        return detach_event_partitions_tx(conn, keep_months, drop=drop)
+
+
+def create_draft_version(engine: Engine, tenant_id: UUID, content_id: UUID, body_md: str, **kwargs: Any) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return create_draft_version_tx(conn, tenant_id, content_id, body_md, **kwargs)
+
+
+def get_latest_draft(engine: Engine, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return get_latest_draft_tx(conn, tenant_id, content_id)
+
+
+def get_draft_version(engine: Engine, tenant_id: UUID, content_id: UUID, version: int) -> Optional[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return get_draft_version_tx(conn, tenant_id, content_id, version)
+
+
+def list_draft_versions(engine: Engine, tenant_id: UUID, content_id: UUID) -> List[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return list_draft_versions_tx(conn, tenant_id, content_id)
+
+
+def list_drafted_content(engine: Engine) -> List[Tuple[str, str]]:
+    with engine.begin() as conn:
+        return list_drafted_content_tx(conn)
+
+
+def rewrite_draft_chain(engine: Engine, tenant_id: UUID, content_id: UUID, snapshot_every: int) -> Dict[str, int]:
+    with engine.begin() as conn:
+        return rewrite_draft_chain_tx(conn, tenant_id, content_id, snapshot_every)
+
+
+def rebuild_published_feed(engine: Engine, tenant_id: UUID) -> int:
+    with engine.begin() as conn:
+        return rebuild_published_feed_tx(conn, tenant_id)
+
+
+def list_tenant_ids(engine: Engine) -> List[str]:
+    with engine.begin() as conn:
+        return list_tenant_ids_tx(conn)
+
+
+def list_published_posts(
+    engine: Engine, tenant_id: UUID, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    with engine.begin() as conn:
+        return list_published_posts_tx(conn, tenant_id, limit=limit, cursor=cursor)
+
+
+def get_published_post(engine: Engine, tenant_id: UUID, slug: str) -> Optional[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return get_published_post_tx(conn, tenant_id, slug)
+
+
+def get_allowed_transitions(engine: Engine, tenant_id: UUID, content_id: UUID) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return get_allowed_transitions_tx(conn, tenant_id, content_id)
+
+
+def list_policy_versions(engine: Engine, tenant_id: UUID) -> List[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return list_policy_versions_tx(conn, tenant_id)
+
+
+def create_policy_version(
+    engine: Engine, tenant_id: UUID, version: str, policy: Dict[str, Any], activate: bool = False
+) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        out = create_policy_version_tx(conn, tenant_id, version, policy, activate=activate)
+    if activate:
+        invalidate_policy(str(tenant_id))
+    return out
+
+
+def activate_policy_version(engine: Engine, tenant_id: UUID, version: str) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        out = activate_policy_version_tx(conn, tenant_id, version)
+    invalidate_policy(str(tenant_id))
+    return out
+
+
+def transition_content(
+    engine: Engine,
+    tenant_id: UUID,
+    content_id: UUID,
+    to_state: str,
+    expected_from_state: Optional[str] = None,
+) -> Dict[str, Any]:
+    with engine.begin() as conn:
+        return transition_content_tx(conn, tenant_id, content_id, to_state, expected_from_state)
+
+
+def transition_content_batch(engine: Engine, tenant_id: UUID, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return transition_content_batch_tx(conn, tenant_id, items)
+
+
+def transition_state_batch(
+    engine: Engine, tenant_id: UUID, from_state: str, to_state: str, limit: int = 1000
+) -> List[Dict[str, Any]]:
+    with engine.begin() as conn:
+        return transition_state_batch_tx(conn, tenant_id, from_state, to_state, limit=limit)
+
+
+def insert_event(engine: Engine, tenant_id: UUID, entity_type: str, entity_id: UUID, event_type: str, **kwargs: Any) -> str:
+    with engine.begin() as conn:
+        return insert_event_tx(conn, tenant_id, entity_type, entity_id, event_type, **kwargs)
+
+
+def insert_events(engine: Engine, events: List[Dict[str, Any]]) -> int:
+    with engine.begin() as conn:
+        return insert_events_tx(conn, events)
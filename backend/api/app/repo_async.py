@@ -0,0 +1,169 @@
+"""
+Async twins of the engine-level functions in app.repo.
+
+Each call opens one transaction on the AsyncEngine and runs the shared
+`repo.*_tx` query function through AsyncConnection.run_sync: the SQL lives
+in one place, and the I/O is awaited on the event loop (no threadpool hop).
+
+Read-only functions go through replicas.run_read (a replica when
+DATABASE_REPLICA_URLS is set, honoring the request's read-your-writes
+token), writes through replicas.run_write. The SSE tail stays on the
+primary: it follows NOTIFYs the primary sends.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import repo
+from app.replicas import run_read, run_write
+
+T = TypeVar("T")
+
+
+async def _run(engine: AsyncEngine, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    async with engine.begin() as conn:
+        return await conn.run_sync(fn, *args, **kwargs)
+
+
+async def create_content_item(
+    engine: AsyncEngine, tenant_id: UUID, title: str, risk_tier: int, with_event: bool = False
+) -> Dict[str, Any]:
+    return await run_write(engine, repo.create_content_item_tx, tenant_id, title, risk_tier, with_event=with_event)
+
+
+async def create_content_items_batch(
+    engine: AsyncEngine, tenant_id: UUID, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    return await run_write(engine, repo.create_content_items_batch_tx, tenant_id, items)
+
+
+async def get_content_by_id(engine: AsyncEngine, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    return await run_read(engine, repo.get_content_by_id_tx, tenant_id, content_id)
+
+
+async def get_content_validators(engine: AsyncEngine, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    return await run_read(engine, repo.get_content_validators_tx, tenant_id, content_id)
+
+
+async def list_content(
+    engine: AsyncEngine, tenant_id: UUID, **kwargs: Any
+) -> Tuple[List[Dict[str, Any]], Optional[int], bool, Optional[str]]:
+    return await run_read(engine, repo.list_content_tx, tenant_id, **kwargs)
+
+
+async def typeahead_content(engine: AsyncEngine, tenant_id: UUID, prefix: str, limit: int = 10) -> List[Dict[str, Any]]:
+    return await run_read(engine, repo.typeahead_content_tx, tenant_id, prefix, limit=limit)
+
+
+async def get_state_histogram(engine: AsyncEngine, tenant_id: UUID) -> Dict[str, Any]:
+    return await run_read(engine, repo.get_state_histogram_tx, tenant_id)
+
+
+async def create_draft_version(
+    engine: AsyncEngine, tenant_id: UUID, content_id: UUID, body_md: str, **kwargs: Any
+) -> Dict[str, Any]:
+    return await run_write(engine, repo.create_draft_version_tx, tenant_id, content_id, body_md, **kwargs)
+
+
+async def get_latest_draft(engine: AsyncEngine, tenant_id: UUID, content_id: UUID) -> Optional[Dict[str, Any]]:
+    return await run_read(engine, repo.get_latest_draft_tx, tenant_id, content_id)
+
+
+async def get_draft_version(
+    engine: AsyncEngine, tenant_id: UUID, content_id: UUID, version: int
+) -> Optional[Dict[str, Any]]:
+    return await run_read(engine, repo.get_draft_version_tx, tenant_id, content_id, version)
+
+
+async def list_draft_versions(engine: AsyncEngine, tenant_id: UUID, content_id: UUID) -> List[Dict[str, Any]]:
+    return await run_read(engine, repo.list_draft_versions_tx, tenant_id, content_id)
+
+
+async def get_published_feed_version(engine: AsyncEngine, tenant_id: UUID) -> int:
+    return await run_read(engine, repo.get_published_feed_version_tx, tenant_id)
+
+
+async def list_published_posts(
+    engine: AsyncEngine, tenant_id: UUID, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return await run_read(engine, repo.list_published_posts_tx, tenant_id, limit=limit, cursor=cursor)
+
+
+async def list_published_posts_versioned(
+    engine: AsyncEngine, tenant_id: UUID, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[int, List[Dict[str, Any]], Optional[str]]:
+    return await run_read(engine, repo.list_published_posts_versioned_tx, tenant_id, limit=limit, cursor=cursor)
+
+
+async def get_published_post(engine: AsyncEngine, tenant_id: UUID, slug: str) -> Optional[Dict[str, Any]]:
+    return await run_read(engine, repo.get_published_post_tx, tenant_id, slug)
+
+
+async def similar_content(engine: AsyncEngine, tenant_id: UUID, content_id: UUID, **kwargs: Any) -> Dict[str, Any]:
+    return await run_read(engine, repo.similar_content_tx, tenant_id, content_id, **kwargs)
+
+
+async def list_content_events(
+    engine: AsyncEngine, tenant_id: UUID, content_id: UUID, limit: int = 100, cursor: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return await run_read(engine, repo.list_content_events_tx, tenant_id, content_id, limit=limit, cursor=cursor)
+
+
+async def list_tenant_events_since(
+    engine: AsyncEngine, tenant_id: UUID, cursor: str, **kwargs: Any
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    return await _run(engine, repo.list_tenant_events_since_tx, tenant_id, cursor, **kwargs)
+
+
+async def get_allowed_transitions(engine: AsyncEngine, tenant_id: UUID, content_id: UUID) -> Dict[str, Any]:
+    return await run_read(engine, repo.get_allowed_transitions_tx, tenant_id, content_id)
+
+
+async def list_policy_versions(engine: AsyncEngine, tenant_id: UUID) -> List[Dict[str, Any]]:
+    return await run_read(engine, repo.list_policy_versions_tx, tenant_id)
+
+
+async def create_policy_version(
+    engine: AsyncEngine, tenant_id: UUID, version: str, policy: Dict[str, Any], activate: bool = False
+) -> Dict[str, Any]:
+    return await run_write(engine, repo.create_policy_version_tx, tenant_id, version, policy, activate=activate)
+
+
+async def activate_policy_version(engine: AsyncEngine, tenant_id: UUID, version: str) -> Dict[str, Any]:
+    return await run_write(engine, repo.activate_policy_version_tx, tenant_id, version)
+
+
+async def transition_content(
+    engine: AsyncEngine,
+    tenant_id: UUID,
+    content_id: UUID,
+    to_state: str,
+    expected_from_state: Optional[str] = None,
+) -> Dict[str, Any]:
+    return await run_write(engine, repo.transition_content_tx, tenant_id, content_id, to_state, expected_from_state)
+
+
+async def transition_content_batch(
+    engine: AsyncEngine, tenant_id: UUID, items: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    return await run_write(engine, repo.transition_content_batch_tx, tenant_id, items)
+
+
+async def transition_state_batch(
+    engine: AsyncEngine, tenant_id: UUID, from_state: str, to_state: str, limit: int = 1000
+) -> List[Dict[str, Any]]:
+    return await run_write(engine, repo.transition_state_batch_tx, tenant_id, from_state, to_state, limit=limit)
+
+
+async def insert_event(
+    engine: AsyncEngine, tenant_id: UUID, entity_type: str, entity_id: UUID, event_type: str, **kwargs: Any
+) -> str:
+    return await run_write(engine, repo.insert_event_tx, tenant_id, entity_type, entity_id, event_type, **kwargs)
+
+
+async def insert_events(engine: AsyncEngine, events: List[Dict[str, Any]]) -> int:
+    return await run_write(engine, repo.insert_events_tx, events)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from typing import List, Literal, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 
 # --------- Core DTOs ---------
@@ -17,15 +18,42 @@ class ContentOut(BaseModel):
     title: str
     state: str
     risk_tier: int
-    created_at: str
-    updated_at: str
+    created_at: datetime
+    updated_at: datetime
+
+
+class ContentBatchItemOut(BaseModel):
+    index: int
+    ok: bool
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+
+class ContentBatchOut(BaseModel):
+    created: int
+    failed: int
+    results: List[ContentBatchItemOut]
 
 
 class ContentListOut(BaseModel):
     items: List[ContentOut]
     limit: int
     offset: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
+
+
+class TypeaheadItemOut(BaseModel):
+    id: str
+    title: str
+    state: str
+
+
+class StateHistogramOut(BaseModel):
+    tenant_id: str
     total: int
+    states: Dict[str, int]
 
 
 class AllowedTransitionsOut(BaseModel):
@@ -33,10 +61,29 @@ class AllowedTransitionsOut(BaseModel):
     from_state: str
     risk_tier: int
     allowed: List[str]
+    # Active tenant policy the answer was computed with (None = default workflow).
+    policy_version: Optional[str] = None
+
+
+class PolicyVersionIn(BaseModel):
+    version: str = Field(..., min_length=1, max_length=100)
+    # See app.policy: {"transitions"?: {state: [states]}, "deny"?: {tier: [[from, to], ...]}}
+    policy: Dict[str, Any]
+    activate: bool = False
+
+
+class PolicyVersionOut(BaseModel):
+    id: str
+    version: str
+    is_active: bool
+    policy: Dict[str, Any]
+    created_at: datetime
 
 
 class TransitionIn(BaseModel):
     to_state: str = Field(..., min_length=1, max_length=50)
+    # Optional optimistic check: only apply if the item is still in this state.
+    expected_from_state: Optional[str] = Field(None, min_length=1, max_length=50)
 
 
 class TransitionOut(BaseModel):
@@ -46,6 +93,111 @@ class TransitionOut(BaseModel):
     risk_tier: int
 
 
+class BatchTransitionItemIn(BaseModel):
+    content_id: str = Field(..., min_length=1, max_length=64)
+    to_state: str = Field(..., min_length=1, max_length=50)
+    expected_from_state: Optional[str] = Field(None, min_length=1, max_length=50)
+
+
+class BatchTransitionIn(BaseModel):
+    """
+    Either explicit `items`, or a selector: every item in `where_state`
+    (up to `limit`) moves to `to_state`.
+    """
+    items: Optional[List[BatchTransitionItemIn]] = Field(None, max_length=10000)
+    where_state: Optional[str] = Field(None, min_length=1, max_length=50)
+    to_state: Optional[str] = Field(None, min_length=1, max_length=50)
+    limit: int = Field(1000, ge=1, le=10000)
+
+    @model_validator(mode="after")
+    def _one_mode(self) -> "BatchTransitionIn":
+        if self.items is not None and (self.where_state or self.to_state):
+            raise ValueError("Provide either items or where_state + to_state, not both")
+        if self.items is None and not (self.where_state and self.to_state):
+            raise ValueError("Provide items, or where_state + to_state")
+        return self
+
+
+class BatchTransitionResultOut(BaseModel):
+    content_id: str
+    ok: bool
+    status: Literal["ok", "invalid", "not_found", "not_allowed", "conflict"]
+    from_state: Optional[str] = None
+    to_state: str
+    error: Optional[str] = None
+
+
+class BatchTransitionOut(BaseModel):
+    applied: int
+    failed: int
+    results: List[BatchTransitionResultOut]
+
+
+class DraftIn(BaseModel):
+    title: Optional[str] = Field(None, max_length=500)
+    body_md: str = Field(..., max_length=2_000_000)
+    citations: List[Any] = Field(default_factory=list)
+    # Optional optimistic check: the version this draft was edited from (0 = first draft).
+    expected_version: Optional[int] = Field(None, ge=0)
+
+
+class DraftOut(BaseModel):
+    id: str
+    content_id: str
+    version: int
+    title: Optional[str] = None
+    body_md: str
+    citations: List[Any]
+    storage: str  # "full" snapshot or "delta"
+    created_at: datetime
+
+
+class DraftVersionOut(BaseModel):
+    id: str
+    version: int
+    title: Optional[str] = None
+    storage: str
+    body_len: Optional[int] = None
+    stored_bytes: Optional[int] = None
+    created_at: datetime
+
+
+class SimilarItemOut(BaseModel):
+    ref_id: str  # the matching intake_items / draft_versions row
+    content_id: Optional[str] = None  # None: intake item never promoted (e.g. held near-duplicate)
+    title: Optional[str] = None
+    state: Optional[str] = None
+    similarity: float  # cosine, 1 = identical
+
+
+class SimilarContentOut(BaseModel):
+    source: str
+    # False when the item has no embedding yet (backfill pending) or, for drafts, no draft.
+    embedded: bool
+    items: List[SimilarItemOut]
+
+
+class PublicPostSummaryOut(BaseModel):
+    id: str  # publication id
+    slug: str
+    title: str
+    summary: str
+    metadata: dict
+    published_at: datetime
+    updated_at: datetime
+
+
+class PublicPostOut(PublicPostSummaryOut):
+    html: str  # rendered at publish time (app.published)
+
+
+class PublicPostListOut(BaseModel):
+    items: List[PublicPostSummaryOut]
+    limit: int
+    # Pass back as ?cursor= for the next (older) page; None on the last page.
+    next_cursor: Optional[str] = None
+
+
 class EventOut(BaseModel):
     id: str
     entity_type: str
@@ -54,9 +206,30 @@ class EventOut(BaseModel):
     actor_type: str
     actor_id: Optional[str] = None
     payload: dict
-    created_at: str
+    created_at: datetime
+
+
+class EventListOut(BaseModel):
+    items: List[EventOut]
+    limit: int
+    # Pass back as ?cursor= for the next (newer) page; None on the last page.
+    next_cursor: Optional[str] = None
 
 
 # --------- Query types ---------
 
-SortKey = Literal["created_at_desc", "created_at_asc"]
+SortKey = Literal[
+    "created_at_desc",
+    "created_at_asc",
+    "updated_at_desc",
+    "updated_at_asc",
+    "title_asc",
+    "title_desc",
+    "relevance",  # only meaningful with q; offset paging only
+]
+
+SearchMode = Literal["contains", "prefix"]
+
+CountMode = Literal["exact", "planned", "none"]
+
+SimilarSource = Literal["intake", "drafts"]
@@ -0,0 +1,42 @@
+"""
+Repair for public.content_state_counts (migration 20261016_0003).
+
+The counters are maintained by the API write paths, so they are exact only
+for writes made by code that knows about them. API processes still running
+the previous release between the migration and the deploy create and
+transition content without touching them; run this once after every
+instance runs the new code (and after any direct change to content_items):
+
+    python -m app.state_counts [--tenant <slug>]
+
+Each tenant is recounted in its own transaction under a SHARE lock on
+content_items (content writes wait for the duration of one tenant's
+COUNT).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Rebuild content_state_counts from content_items")
+    ap.add_argument("--tenant", default=None, help="tenant slug (default: every tenant)")
+    args = ap.parse_args()
+
+    from app.db import get_engine
+    from app.repo import list_tenant_ids, recount_state_counts
+    from app.tenant import resolve_tenant_id
+
+    engine = get_engine()
+    tenant_ids = [resolve_tenant_id(engine, args.tenant)] if args.tenant else list_tenant_ids(engine)
+    totals = {"tenants": 0, "items": 0}
+    for tenant_id in tenant_ids:
+        totals["tenants"] += 1
+        totals["items"] += recount_state_counts(engine, tenant_id)["total"]
+    print(json.dumps(totals))
+
+
+if __name__ == "__main__":
+    main()
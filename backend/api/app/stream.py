@@ -0,0 +1,214 @@
+"""
+Live content.* event stream (Server-Sent Events).
+
+Inserts into public.events fire a NOTIFY on CHANNEL (trigger from migration
+20261016_0006_events_notify). The process-wide PgListener receives them on
+its single connection and EventBroadcaster fans them out to per-subscriber
+bounded queues, keyed by tenant. No per-client DB connection or polling.
+
+SSE ids are event cursors (created_at, id): a client reconnecting with
+Last-Event-ID is replayed everything after it from public.events, then
+switched to live. A subscriber that falls behind (queue full), or any
+subscriber after a listener reconnect, is caught up from the table the
+same way instead of buffering without bound.
+
+Ordering caveat: cursors follow created_at, which is stamped before
+commit; an event that commits late with an earlier created_at than one
+already streamed is delivered live but not by a later replay.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from collections import deque
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Optional, Set
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app import repo_async
+from app.listener import PgListener, get_listener
+from app.repo import event_cursor
+
+CHANNEL = "content_events"
+
+_ZERO_UUID = "00000000-0000-0000-0000-000000000000"
+
+# Queued to wake a waiting subscriber so it notices needs_catchup.
+_WAKE: Dict[str, Any] = {}
+
+
+class Subscription:
+    def __init__(self, tenant_id: str, entity_id: Optional[str], queue_size: int) -> None:
+        self.tenant_id = tenant_id
+        self.entity_id = entity_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        # Set when live notifications were lost for this subscriber: replay from the table.
+        self.needs_catchup = False
+
+
+class EventBroadcaster:
+    def __init__(self, listener: PgListener, queue_size: int = 256) -> None:
+        self.listener = listener
+        self.queue_size = queue_size
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._registered = False
+
+        # metrics
+        self.received = 0
+        self.delivered = 0
+        self.overflows = 0
+
+    def _ensure_registered(self) -> None:
+        if self._registered:
+            return
+        self.listener.listen(CHANNEL, self._on_notify)
+        self.listener.on_reconnect(self._on_reconnect)
+        self._registered = True
+
+    def subscribe(self, tenant_id: str, entity_id: Optional[str] = None) -> Subscription:
+        self._ensure_registered()
+        sub = Subscription(str(tenant_id), str(entity_id) if entity_id else None, self.queue_size)
+        self._subs.setdefault(sub.tenant_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.tenant_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.tenant_id]
+
+    def _on_notify(self, payload: str) -> None:
+        self.received += 1
+        try:
+            ev = json.loads(payload)
+        except ValueError:
+            return
+        for sub in self._subs.get(str(ev.get("tenant_id")), ()):
+            if sub.entity_id and sub.entity_id != ev.get("entity_id"):
+                continue
+            if sub.needs_catchup:
+                continue  # it will read this from the table anyway
+            try:
+                sub.queue.put_nowait(ev)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                sub.needs_catchup = True
+                self.overflows += 1
+
+    def _on_reconnect(self) -> None:
+        for subs in self._subs.values():
+            for sub in subs:
+                sub.needs_catchup = True
+                try:
+                    sub.queue.put_nowait(_WAKE)
+                except asyncio.QueueFull:
+                    pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tenants": len(self._subs),
+            "subscribers": sum(len(s) for s in self._subs.values()),
+            "received": self.received,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "listener": self.listener.stats(),
+        }
+
+
+@lru_cache(maxsize=1)
+def get_broadcaster() -> EventBroadcaster:
+    """
+    Env knobs:
+      EVENT_STREAM_QUEUE_SIZE  (default 256)  buffered events per subscriber before it falls back to replay
+    """
+    from app.db import _load_env_once
+
+    _load_env_once()
+    return EventBroadcaster(get_listener(), queue_size=int(os.getenv("EVENT_STREAM_QUEUE_SIZE", "256")))
+
+
+# ----------------------------
+# SSE framing
+# ----------------------------
+
+def _sse(data: Dict[str, Any], event_id: str) -> str:
+    return f"id: {event_id}\ndata: {json.dumps(data, default=str, separators=(',', ':'))}\n\n"
+
+
+def _event_data(ev: Dict[str, Any]) -> Dict[str, Any]:
+    created_at = ev.get("created_at")
+    return {
+        "id": ev.get("id"),
+        "entity_id": ev.get("entity_id"),
+        "event_type": ev.get("event_type"),
+        "actor_type": ev.get("actor_type"),
+        "payload": ev.get("payload"),
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    }
+
+
+async def sse_events(
+    engine: AsyncEngine,
+    tenant_id: str,
+    entity_id: Optional[str],
+    last_event_id: Optional[str],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    keepalive_seconds: float = 15.0,
+    replay_page: int = 500,
+) -> AsyncIterator[str]:
+    """
+    SSE body for one client. Subscribes before replaying, so nothing
+    committed between replay and live is missed; ids seen during replay
+    are skipped when they also arrive live.
+    """
+    broadcaster = get_broadcaster()
+    sub = broadcaster.subscribe(tenant_id, entity_id)
+
+    # Without Last-Event-ID, "now" is the resume point if a catch-up is ever needed.
+    cursor = last_event_id or event_cursor(datetime.now(timezone.utc), _ZERO_UUID)
+    recent: Deque[str] = deque(maxlen=4096)
+    recent_set: Set[str] = set()
+
+    def remember(eid: str) -> None:
+        if len(recent) == recent.maxlen:
+            recent_set.discard(recent[0])
+        recent.append(eid)
+        recent_set.add(eid)
+
+    try:
+        yield "retry: 3000\n\n"
+        sub.needs_catchup = bool(last_event_id)
+
+        while True:
+            if sub.needs_catchup:
+                sub.needs_catchup = False
+                while True:
+                    rows, cursor = await repo_async.list_tenant_events_since(
+                        engine, tenant_id, cursor, limit=replay_page, entity_id=entity_id
+                    )
+                    for row in rows:
+                        remember(row["id"])
+                        yield _sse(_event_data(row), event_cursor(row["created_at"], row["id"]))
+                    if len(rows) < replay_page:
+                        break
+
+            try:
+                ev = await asyncio.wait_for(sub.queue.get(), timeout=keepalive_seconds)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": keepalive\n\n"
+                continue
+
+            if ev is _WAKE or ev.get("id") in recent_set:
+                continue
+            remember(ev["id"])
+            cursor = event_cursor(ev["created_at"], ev["id"])
+            yield _sse(_event_data(ev), cursor)
+    finally:
+        broadcaster.unsubscribe(sub)
@@ -1,17 +1,69 @@
 from __future__ import annotations
 
+import os
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
 from sqlalchemy import text
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 
+from app.cache import TTLCache
 
-def resolve_tenant_id(engine: Engine, tenant_slug: str) -> str:
+
+# ----------------------------
+# Slug -> tenant_id cache
+# ----------------------------
+
+@lru_cache(maxsize=1)
+def get_tenant_cache() -> TTLCache:
     """
-    Returns tenant_id as text UUID for a given slug, raises ValueError if not found.
+    Process-wide slug -> tenant_id cache.
+
+    Env knobs (read once):
+      TENANT_CACHE_MAX_SIZE              (default 1024)
+      TENANT_CACHE_TTL_SECONDS           (default 300)
+      TENANT_CACHE_NEGATIVE_TTL_SECONDS  (default 30; 0 disables negative caching)
+    """
+    # Reuse db's .env loading so the knobs can live in backend/api/.env
+    from app.db import _load_env_once
+
+    _load_env_once()
+    return TTLCache(
+        max_size=int(os.getenv("TENANT_CACHE_MAX_SIZE", "1024")),
+        ttl_seconds=float(os.getenv("TENANT_CACHE_TTL_SECONDS", "300")),
+        negative_ttl_seconds=float(os.getenv("TENANT_CACHE_NEGATIVE_TTL_SECONDS", "30")),
+    )
+
+
+def invalidate_tenant(tenant_slug: Optional[str] = None) -> None:
+    """
+    Drop one slug (or the whole cache when slug is None).
+    Call this after creating/renaming/deleting tenants.
     """
+    cache = get_tenant_cache()
+    if tenant_slug is None:
+        cache.clear()
+    else:
+        cache.invalidate((tenant_slug or "").strip())
+
+
+def tenant_cache_stats() -> Dict[str, Any]:
+    return get_tenant_cache().stats()
+
+
+# ----------------------------
+# Resolution
+# ----------------------------
+
+def _normalize_slug(tenant_slug: str) -> str:
     slug = (tenant_slug or "").strip()
     if not slug:
         raise ValueError("X-Tenant-Slug header is required")
+    return slug
+
 
+def _fetch_tenant_id_tx(conn: Connection, slug: str) -> Optional[str]:
     sql = text(
         """
         SELECT id::text AS id
@@ -19,12 +71,61 @@ def resolve_tenant_id(engine: Engine, tenant_slug: str) -> str:
         WHERE slug = :slug
         LIMIT 1
         """
-    )
+    ).execution_options(prepare=True)
+
+    row = conn.execute(sql, {"slug": slug}).mappings().one_or_none()
+    return row["id"] if row else None
 
+
+def _fetch_tenant_id(engine: Engine, slug: str) -> Optional[str]:
     with engine.begin() as conn:
-        row = conn.execute(sql, {"slug": slug}).mappings().one_or_none()
+        return _fetch_tenant_id_tx(conn, slug)
+
+
+async def _fetch_tenant_id_async(engine: AsyncEngine, slug: str) -> Optional[str]:
+    async with engine.begin() as conn:
+        return await conn.run_sync(_fetch_tenant_id_tx, slug)
+
+
+def _from_cache(slug: str) -> Tuple[bool, Optional[str]]:
+    """
+    Returns (found, tenant_id); raises ValueError for negatively cached slugs.
+    """
+    found, is_negative, tenant_id = get_tenant_cache().lookup(slug)
+    if found and is_negative:
+        raise ValueError(f"Unknown tenant slug: {slug}")
+    return found, tenant_id
 
-    if not row:
+
+def _remember(slug: str, tenant_id: Optional[str]) -> str:
+    cache = get_tenant_cache()
+    if tenant_id is None:
+        cache.set_negative(slug)
         raise ValueError(f"Unknown tenant slug: {slug}")
+    cache.set(slug, tenant_id)
+    return tenant_id
+
 
-    return row["id"]
+def resolve_tenant_id(engine: Engine, tenant_slug: str) -> str:
+    """
+    Returns tenant_id as text UUID for a given slug, raises ValueError if not found.
+
+    Served from the in-process cache when warm (zero DB round trips);
+    unknown slugs are negatively cached for a short TTL.
+    """
+    slug = _normalize_slug(tenant_slug)
+    found, tenant_id = _from_cache(slug)
+    if found:
+        return tenant_id
+    return _remember(slug, _fetch_tenant_id(engine, slug))
+
+
+async def resolve_tenant_id_async(engine: AsyncEngine, tenant_slug: str) -> str:
+    """
+    Async twin of resolve_tenant_id (same cache).
+    """
+    slug = _normalize_slug(tenant_slug)
+    found, tenant_id = _from_cache(slug)
+    if found:
+        return tenant_id
+    return _remember(slug, await _fetch_tenant_id_async(engine, slug))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
 
 # DB enum values (confirmed from your Postgres enum_range output)
 STATES: list[str] = [
@@ -17,6 +18,12 @@ STATES: list[str] = [
     "RETIRED",
 ]
 
+# state -> bit position in the transition masks
+STATE_INDEX: dict[str, int] = {s: i for i, s in enumerate(STATES)}
+
+# Risk tiers the workflow knows about (API contract 1..3).
+RISK_TIERS: tuple[int, ...] = (1, 2, 3)
+
 
 class WorkflowError(Exception):
     """Raised when a workflow transition is invalid."""
@@ -61,36 +68,174 @@ def _normalize_risk_tier(risk_tier: int) -> int:
     return r
 
 
-def allowed_transitions(from_state: str, risk_tier: int) -> list[str]:
+# ----------------------------
+# Compiled transition table
+# ----------------------------
+
+@dataclass(frozen=True)
+class CompiledWorkflow:
+    """
+    The transition graph compiled into per-tier bitmask tables.
+
+    For tier t and state index i:
+      out_masks[t][i]  bit j set <=> STATES[i] -> STATES[j] is allowed
+      in_masks[t][j]   bit i set <=> same edge, indexed by target
+      allowed[t][i]    tuple of target names (shared, never copied)
+
+    Lookups are index arithmetic + a bit test: O(1), no allocation.
+    Tables are indexed by tier directly (slot 0 unused).
+    """
+
+    out_masks: Tuple[Tuple[int, ...], ...]
+    in_masks: Tuple[Tuple[int, ...], ...]
+    allowed: Tuple[Tuple[Tuple[str, ...], ...], ...]
+    # to_state -> (from_states, tiers): every (from, tier) source of an edge into to_state,
+    # pre-flattened for the guarded UPDATE in repo.transition_content_tx.
+    sources: Mapping[str, Tuple[Tuple[str, ...], Tuple[int, ...]]]
+
+    def is_allowed(self, from_state: str, to_state: str, risk_tier: int) -> bool:
+        i = STATE_INDEX.get(from_state)
+        j = STATE_INDEX.get(to_state)
+        if i is None or j is None or risk_tier not in RISK_TIERS:
+            return False
+        return bool(self.out_masks[risk_tier][i] >> j & 1)
+
+    def allowed_from(self, from_state: str, risk_tier: int) -> Tuple[str, ...]:
+        i = STATE_INDEX.get(from_state)
+        if i is None or risk_tier not in RISK_TIERS:
+            return ()
+        return self.allowed[risk_tier][i]
+
+    def validate_many(
+        self,
+        from_states: Sequence[str],
+        to_states: Sequence[str],
+        risk_tiers: Sequence[int],
+    ) -> list[bool]:
+        """
+        Vectorized is_allowed over parallel sequences (e.g. a bulk transition).
+        """
+        idx = STATE_INDEX.get
+        out = self.out_masks
+        result = []
+        for f, t, r in zip(from_states, to_states, risk_tiers):
+            i, j = idx(f), idx(t)
+            result.append(
+                i is not None and j is not None and r in RISK_TIERS and bool(out[r][i] >> j & 1)
+            )
+        return result
+
+
+def compile_workflow(
+    transitions: Mapping[str, Iterable[str]],
+    denied: Optional[Mapping[int, Iterable[Tuple[str, str]]]] = None,
+) -> CompiledWorkflow:
+    """
+    Compile a {from_state: [to_state, ...]} graph into a CompiledWorkflow.
+
+    denied: optional {risk_tier: [(from_state, to_state), ...]} edges removed
+    for that tier only (tier-aware gating on top of the shared graph).
+    Unknown states raise WorkflowError.
+    """
+    n = len(STATES)
+    base = [0] * n
+    for s_from, targets in transitions.items():
+        if s_from not in STATE_INDEX:
+            raise WorkflowError(f"Unknown state in workflow: {s_from}")
+        for s_to in targets:
+            if s_to not in STATE_INDEX:
+                raise WorkflowError(f"Unknown state in workflow: {s_to}")
+            base[STATE_INDEX[s_from]] |= 1 << STATE_INDEX[s_to]
+
+    out_masks: list[Tuple[int, ...]] = [()]
+    in_masks: list[Tuple[int, ...]] = [()]
+    allowed: list[Tuple[Tuple[str, ...], ...]] = [()]
+    sources: Dict[str, Tuple[list, list]] = {s: ([], []) for s in STATES}
+
+    for tier in RISK_TIERS:
+        masks = list(base)
+        for s_from, s_to in (denied or {}).get(tier, ()):
+            if s_from not in STATE_INDEX or s_to not in STATE_INDEX:
+                raise WorkflowError(f"Unknown state in workflow: {s_from} -> {s_to}")
+            masks[STATE_INDEX[s_from]] &= ~(1 << STATE_INDEX[s_to])
+
+        inv = [0] * n
+        for i, m in enumerate(masks):
+            for j in range(n):
+                if m >> j & 1:
+                    inv[j] |= 1 << i
+                    sources[STATES[j]][0].append(STATES[i])
+                    sources[STATES[j]][1].append(tier)
+
+        out_masks.append(tuple(masks))
+        in_masks.append(tuple(inv))
+        allowed.append(tuple(tuple(STATES[j] for j in range(n) if m >> j & 1) for m in masks))
+
+    return CompiledWorkflow(
+        out_masks=tuple(out_masks),
+        in_masks=tuple(in_masks),
+        allowed=tuple(allowed),
+        sources={s: (tuple(f), tuple(t)) for s, (f, t) in sources.items()},
+    )
+
+
+# The default compiled table; tenants with an active policy get their own
+# (app.policy, repo.tenant_workflow_tx).
+WORKFLOW: CompiledWorkflow = compile_workflow(_TRANSITIONS)
+
+
+# ----------------------------
+# Public helpers (string API)
+# ----------------------------
+
+def allowed_transitions(
+    from_state: str, risk_tier: int, workflow: Optional[CompiledWorkflow] = None
+) -> list[str]:
     """
     Returns allowed next states from `from_state`.
 
-    risk_tier is currently used as a hook for future policy gating.
-    For now, it only validates 1..3 to keep the system consistent.
+    risk_tier selects the tier's table in `workflow` (a tenant's compiled
+    policy, default WORKFLOW); policies deny edges per tier.
     """
-    _ = _normalize_risk_tier(risk_tier)
+    r = _normalize_risk_tier(risk_tier)
     s = _normalize_state(from_state)
 
-    if s not in _TRANSITIONS:
-        # If DB ever returns a new state, don't crash hard; just return no transitions.
+    # Unknown states (if DB ever returns a new one) yield no transitions rather than crashing.
+    return list((workflow or WORKFLOW).allowed_from(s, r))
+
+
+def allowed_from_states(
+    to_state: str, risk_tier: int, workflow: Optional[CompiledWorkflow] = None
+) -> list[str]:
+    """
+    Inverse lookup: states from which `to_state` may be entered at `risk_tier`.
+    """
+    r = _normalize_risk_tier(risk_tier)
+    j = STATE_INDEX.get(_normalize_state(to_state))
+    if j is None:
         return []
-    return list(_TRANSITIONS[s])
+    mask = (workflow or WORKFLOW).in_masks[r][j]
+    return [s for i, s in enumerate(STATES) if mask >> i & 1]
 
 
-def validate_transition(from_state: str, to_state: str, risk_tier: int) -> None:
+def validate_transition(
+    from_state: str, to_state: str, risk_tier: int, workflow: Optional[CompiledWorkflow] = None
+) -> None:
     """
-    Raises WorkflowError if the transition is not permitted.
+    Raises WorkflowError if the transition is not permitted by `workflow`
+    (default WORKFLOW).
     """
+    workflow = workflow or WORKFLOW
     s_from = _normalize_state(from_state)
     s_to = _normalize_state(to_state)
     r = _normalize_risk_tier(risk_tier)
 
-    if s_from not in STATES:
+    if s_from not in STATE_INDEX:
         raise WorkflowError(f"Unknown from_state: {from_state}")
 
-    if s_to not in STATES:
+    if s_to not in STATE_INDEX:
         raise WorkflowError(f"Unknown to_state: {to_state}")
 
-    allowed = allowed_transitions(s_from, r)
-    if s_to not in allowed:
+    if not workflow.is_allowed(s_from, s_to, r):
+        allowed = list(workflow.allowed_from(s_from, r))
         raise WorkflowError(f"Transition not allowed: {s_from} -> {s_to}. Allowed: {allowed}")
@@ -0,0 +1,102 @@
+"""
+Throughput: threaded sync repo path vs native asyncio repo path.
+
+Both sides run the same read workload (tenant resolve + first page of
+list_content + get_content_by_id) against DATABASE_URL:
+
+  - threaded: sync engine, ThreadPoolExecutor sized like Starlette's default
+    threadpool (40), which is what the old `def` routes were capped by
+  - async:    async engine, N concurrent tasks on one event loop
+
+Run from backend/api:
+    python -m bench.async_vs_threaded --tenant default --requests 5000 --concurrency 200
+
+Pool size for both engines comes from DB_POOL_SIZE / DB_MAX_OVERFLOW.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from app import repo, repo_async
+from app.db import get_async_engine, get_engine
+from app.tenant import invalidate_tenant, resolve_tenant_id, resolve_tenant_id_async
+
+
+def _report(label: str, latencies: List[float], wall: float) -> None:
+    lat = sorted(latencies)
+    n = len(lat)
+
+    def pct(p: float) -> float:
+        return lat[min(n - 1, int(p * n))] * 1000
+
+    print(
+        f"{label:<10} n={n:<7} {n / wall:>9.1f} req/s   "
+        f"p50={pct(0.50):7.2f}ms  p95={pct(0.95):7.2f}ms  p99={pct(0.99):7.2f}ms  "
+        f"mean={statistics.fmean(lat) * 1000:7.2f}ms"
+    )
+
+
+def run_threaded(slug: str, requests: int, threads: int) -> None:
+    engine = get_engine()
+
+    def one() -> float:
+        t0 = time.perf_counter()
+        tenant_id = resolve_tenant_id(engine, slug)
+        items, *_ = repo.list_content(engine, tenant_id, limit=20)
+        if items:
+            repo.get_content_by_id(engine, tenant_id, items[0]["id"])
+        return time.perf_counter() - t0
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(lambda _: one(), range(min(requests, threads))))  # warm pool
+        t0 = time.perf_counter()
+        latencies = list(pool.map(lambda _: one(), range(requests)))
+        wall = time.perf_counter() - t0
+
+    _report(f"threaded({threads})", latencies, wall)
+
+
+async def run_async(slug: str, requests: int, concurrency: int) -> None:
+    engine = get_async_engine()
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one() -> float:
+        async with sem:
+            t0 = time.perf_counter()
+            tenant_id = await resolve_tenant_id_async(engine, slug)
+            items, *_ = await repo_async.list_content(engine, tenant_id, limit=20)
+            if items:
+                await repo_async.get_content_by_id(engine, tenant_id, items[0]["id"])
+            return time.perf_counter() - t0
+
+    await asyncio.gather(*(one() for _ in range(min(requests, concurrency))))  # warm pool
+    t0 = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - t0
+
+    _report(f"async({concurrency})", list(latencies), wall)
+    await engine.dispose()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tenant", default="default")
+    ap.add_argument("--requests", type=int, default=5000)
+    ap.add_argument("--threads", type=int, default=40)
+    ap.add_argument("--concurrency", type=int, default=200)
+    args = ap.parse_args()
+
+    invalidate_tenant()
+    run_threaded(args.tenant, args.requests, args.threads)
+    invalidate_tenant()
+    asyncio.run(run_async(args.tenant, args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
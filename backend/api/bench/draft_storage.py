@@ -0,0 +1,157 @@
+"""
+draft_versions storage: full copy per version vs snapshots + deltas.
+
+Simulates one long-form post going through --versions drafting loops
+(each loop rewrites a few paragraphs, sometimes adds or drops one) and
+reports, per layout: bytes stored for body_md/delta and read latency for
+the latest version and for a random older version.
+
+  offline (default): codec only, no DB. "full" is reported raw and
+                     zlib-compressed (an upper bound for what TOAST's
+                     compression would save on the full copies)
+  --db:              writes both layouts through repo.create_draft_version_tx
+                     into DATABASE_URL (scratch content items, deleted
+                     afterwards) and measures pg_column_size + query latency
+
+Run from backend/api:
+    python -m bench.draft_storage --versions 60 --paragraphs 120 --every 10
+    python -m bench.draft_storage --db --tenant default --versions 60
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import time
+import zlib
+from typing import Callable, List
+
+from app.drafts import apply_delta, is_snapshot_version, make_delta
+
+_WORDS = (
+    "the of and to in is that for on with as by this from at are be it an or was which its more data "
+    "model system users content platform policy review draft source publish editor quality signal "
+    "latency storage version delta snapshot reader growth market research results evidence claim"
+).split()
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(rng.randint(40, 90))).capitalize() + ".\n\n"
+
+
+def make_versions(n_versions: int, n_paragraphs: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    paras = [f"## Section {i}\n\n" if i % 10 == 0 else _paragraph(rng) for i in range(n_paragraphs)]
+    out = ["".join(paras)]
+    for _ in range(n_versions - 1):
+        for _ in range(rng.randint(1, 4)):
+            paras[rng.randrange(len(paras))] = _paragraph(rng)
+        if rng.random() < 0.2:
+            paras.insert(rng.randrange(len(paras)), _paragraph(rng))
+        if rng.random() < 0.1 and len(paras) > 10:
+            paras.pop(rng.randrange(len(paras)))
+        out.append("".join(paras))
+    return out
+
+
+def _timeit(fn: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return statistics.median(samples) * 1000
+
+
+def run_offline(versions: List[str], every: int, repeat: int) -> None:
+    raw_full = sum(len(v.encode("utf-8")) for v in versions)
+    zlib_full = sum(len(zlib.compress(v.encode("utf-8"), 6)) for v in versions)
+
+    stored: List[object] = []  # str snapshot or bytes delta
+    for i, body in enumerate(versions, start=1):
+        stored.append(body if i == 1 or is_snapshot_version(i, every) else make_delta(versions[i - 2], body))
+    delta_bytes = sum(len(s.encode("utf-8")) if isinstance(s, str) else len(s) for s in stored)
+    delta_zlib = sum(len(zlib.compress(s.encode("utf-8"), 6)) if isinstance(s, str) else len(s) for s in stored)
+
+    def read(v: int) -> str:
+        base = max(i for i in range(1, v + 1) if isinstance(stored[i - 1], str))
+        body = stored[base - 1]
+        for i in range(base + 1, v + 1):
+            body = apply_delta(body, stored[i - 1])
+        return body
+
+    rng = random.Random(1)
+    probe = [rng.randrange(1, len(versions) + 1) for _ in range(repeat)]
+    for v in probe[:20]:
+        assert read(v) == versions[v - 1]
+    worst = max(range(1, len(versions) + 1), key=lambda v: (v - 1) % every if every > 1 else 0)
+
+    print(f"{len(versions)} versions, avg body {raw_full // len(versions)} bytes, snapshot every {every}")
+    print(f"  full copies       {raw_full:>12,} bytes")
+    print(f"  full, compressed  {zlib_full:>12,} bytes")
+    print(f"  snapshots+deltas  {delta_bytes:>12,} bytes  ({raw_full / max(1, delta_bytes):.1f}x smaller than full)")
+    print(f"  ..., compressed   {delta_zlib:>12,} bytes  ({zlib_full / max(1, delta_zlib):.1f}x smaller than full, compressed)")
+    print("  read latest                  one draft_latest row in both layouts (no replay)")
+    print(f"  read worst-case version {worst:<3}  {_timeit(lambda: read(worst), repeat):.3f} ms "
+          f"({(worst - 1) % every if every > 1 else 0} deltas)")
+    print(f"  write delta (per version)    {_timeit(lambda: make_delta(versions[-2], versions[-1]), repeat):.3f} ms")
+
+
+def run_db(versions: List[str], every: int, tenant: str, repeat: int) -> None:
+    from sqlalchemy import text
+
+    from app import repo
+    from app.db import get_engine
+    from app.tenant import resolve_tenant_id
+
+    engine = get_engine()
+    tenant_id = resolve_tenant_id(engine, tenant)
+    # The version with the longest delta chain under --every, read from both layouts.
+    probe = max(range(1, len(versions) + 1), key=lambda v: (v - 1) % every)
+    items = {}
+    try:
+        for label, n in (("full", 1), ("delta", every)):
+            cid = repo.create_content_item(engine, tenant_id, f"bench draft storage ({label})", 1)["id"]
+            items[label] = cid
+            for body in versions:
+                repo.create_draft_version(engine, tenant_id, cid, body, snapshot_every=n)
+
+        with engine.connect() as conn:
+            for label, cid in items.items():
+                size = conn.execute(
+                    text("""
+                        SELECT COALESCE(SUM(COALESCE(pg_column_size(body_md), 0) + COALESCE(pg_column_size(delta), 0)), 0)
+                        FROM public.draft_versions WHERE content_id = CAST(:cid AS uuid);
+                    """),
+                    {"cid": cid},
+                ).scalar_one()
+                latest = _timeit(lambda: repo.get_latest_draft(engine, tenant_id, cid), repeat)
+                older = _timeit(lambda: repo.get_draft_version(engine, tenant_id, cid, probe), repeat)
+                print(f"{label:<6} stored {size:>12,} bytes   latest {latest:.2f} ms   version {probe}: {older:.2f} ms")
+    finally:
+        with engine.begin() as conn:
+            for cid in items.values():
+                conn.execute(text("DELETE FROM public.content_items WHERE id = CAST(:cid AS uuid);"), {"cid": cid})
+        repo.recount_state_counts(engine, tenant_id)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="draft_versions storage size + read latency: full vs delta")
+    ap.add_argument("--versions", type=int, default=60)
+    ap.add_argument("--paragraphs", type=int, default=120)
+    ap.add_argument("--every", type=int, default=10, help="snapshot every N versions")
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--db", action="store_true", help="measure against DATABASE_URL")
+    ap.add_argument("--tenant", default="default")
+    args = ap.parse_args()
+
+    versions = make_versions(args.versions, args.paragraphs)
+    if args.db:
+        run_db(versions, args.every, args.tenant, args.repeat)
+    else:
+        run_offline(versions, args.every, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
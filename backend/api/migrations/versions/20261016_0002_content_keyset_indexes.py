@@ -0,0 +1,39 @@
+"""Composite indexes for keyset pagination of content_items
+
+One (tenant_id, <sort column>, id) index per sort key exposed by GET /content.
+B-tree indexes scan both directions, so each index serves *_asc and *_desc.
+
+Built CONCURRENTLY (outside the migration transaction) so large tenants are
+not locked during deploy. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0002_content_keyset_indexes"
+down_revision = "20260106_0001_baseline_normalize"
+branch_labels = None
+depends_on = None
+
+
+_INDEXES = {
+    "idx_content_tenant_created_id": "(tenant_id, created_at, id)",
+    "idx_content_tenant_updated_id": "(tenant_id, updated_at, id)",
+    "idx_content_tenant_title_id": "(tenant_id, title, id)",
+}
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, cols in _INDEXES.items():
+            op.execute(f"""
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS {name}
+            ON public.content_items {cols};
+            """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in _INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS public.{name};")
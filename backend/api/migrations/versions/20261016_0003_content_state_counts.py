@@ -0,0 +1,42 @@
+"""Per-tenant, per-state content counters
+
+content_state_counts(tenant_id, state, n) is maintained by the API write
+paths (create_content_item / transition_content) in the same transaction as
+the content write, so unfiltered totals and the state histogram are O(1).
+
+Backfilled from content_items under a SHARE lock so no write slips between
+the count and the first maintained update. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0003_content_state_counts"
+down_revision = "20261016_0002_content_keyset_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.content_state_counts (
+      tenant_id uuid NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+      state content_state NOT NULL,
+      n bigint NOT NULL DEFAULT 0,
+      PRIMARY KEY (tenant_id, state)
+    );
+    """)
+
+    op.execute("LOCK TABLE public.content_items IN SHARE MODE;")
+    op.execute("""
+    INSERT INTO public.content_state_counts (tenant_id, state, n)
+    SELECT tenant_id, state, COUNT(*)
+    FROM public.content_items
+    GROUP BY tenant_id, state
+    ON CONFLICT (tenant_id, state) DO UPDATE SET n = EXCLUDED.n;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS public.content_state_counts;")
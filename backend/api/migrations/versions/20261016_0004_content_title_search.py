@@ -0,0 +1,39 @@
+"""Indexed title search for content_items
+
+- pg_trgm + btree_gin: GIN (tenant_id, title gin_trgm_ops) serves tenant-scoped
+  `title ILIKE '%q%'` and similarity() ranking without a sequential scan
+- btree (tenant_id, lower(title) text_pattern_ops) serves prefix/typeahead
+  lookups (`lower(title) LIKE 'abc%'`)
+
+Indexes are built CONCURRENTLY. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0004_content_title_search"
+down_revision = "20261016_0003_content_state_counts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm;")
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gin;")
+
+    with op.get_context().autocommit_block():
+        op.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_tenant_title_trgm
+        ON public.content_items USING gin (tenant_id, title gin_trgm_ops);
+        """)
+        op.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_tenant_title_prefix
+        ON public.content_items (tenant_id, lower(title) text_pattern_ops);
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.idx_content_tenant_title_prefix;")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.idx_content_tenant_title_trgm;")
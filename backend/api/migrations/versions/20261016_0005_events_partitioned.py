@@ -0,0 +1,167 @@
+"""Partition public.events by month
+
+public.events becomes a RANGE(created_at) partitioned table with one
+partition per calendar month (events_yYYYYmMM) plus a DEFAULT partition as
+a safety net, and a (tenant_id, entity_type, entity_id, created_at, id)
+index (declared on the parent, so every partition gets it) serving the
+keyset-paged GET /content/{id}/events.
+
+Helper functions, called by `python -m app.partitions` (or cron):
+  public.ensure_events_partitions(months_ahead int)   create missing monthly partitions
+  public.detach_events_partitions(before timestamptz)  detach partitions entirely older than `before`
+
+Existing rows are copied into the new table inside the migration
+transaction (the old table is locked for the duration). Keep partitions
+created ahead of time: a new month's partition cannot be created while the
+DEFAULT partition holds rows for that month.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0005_events_partitioned"
+down_revision = "20261016_0004_content_title_search"
+branch_labels = None
+depends_on = None
+
+
+_COLUMNS = "id, tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at"
+
+
+def upgrade() -> None:
+    # Move the old heap table aside (if this DB has one and it is not partitioned yet).
+    op.execute("""
+    DO $$
+    BEGIN
+      IF EXISTS (
+        SELECT 1 FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relname = 'events' AND c.relkind = 'r'
+      ) THEN
+        LOCK TABLE public.events IN ACCESS EXCLUSIVE MODE;
+        ALTER TABLE public.events RENAME TO events_unpartitioned;
+      END IF;
+    END $$;
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.events (
+      id uuid NOT NULL DEFAULT gen_random_uuid(),
+      tenant_id uuid NOT NULL,
+      entity_type text NOT NULL,
+      entity_id uuid NOT NULL,
+      event_type text NOT NULL,
+      actor_type text NOT NULL DEFAULT 'system',
+      actor_id uuid NULL,
+      payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+      created_at timestamptz NOT NULL DEFAULT now(),
+      PRIMARY KEY (id, created_at)
+    ) PARTITION BY RANGE (created_at);
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_entity_time
+    ON public.events (tenant_id, entity_type, entity_id, created_at, id);
+    """)
+
+    op.execute("CREATE TABLE IF NOT EXISTS public.events_default PARTITION OF public.events DEFAULT;")
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.ensure_events_partition(month date)
+    RETURNS text LANGUAGE plpgsql AS $$
+    DECLARE
+      lo date := date_trunc('month', month)::date;
+      hi date := (date_trunc('month', month) + interval '1 month')::date;
+      part text := format('events_y%sm%s', to_char(lo, 'YYYY'), to_char(lo, 'MM'));
+    BEGIN
+      IF to_regclass('public.' || part) IS NULL THEN
+        EXECUTE format(
+          'CREATE TABLE public.%I PARTITION OF public.events FOR VALUES FROM (%L) TO (%L)',
+          part, lo, hi
+        );
+      END IF;
+      RETURN part;
+    END $$;
+    """)
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.ensure_events_partitions(months_ahead int DEFAULT 3)
+    RETURNS SETOF text LANGUAGE sql AS $$
+      SELECT public.ensure_events_partition(m::date)
+      FROM generate_series(
+        date_trunc('month', now()),
+        date_trunc('month', now()) + make_interval(months => months_ahead),
+        interval '1 month'
+      ) AS m;
+    $$;
+    """)
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.detach_events_partitions(before timestamptz)
+    RETURNS SETOF text LANGUAGE plpgsql AS $$
+    DECLARE
+      r record;
+    BEGIN
+      -- Monthly partitions whose upper bound is <= `before` (never the DEFAULT partition).
+      FOR r IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public.events'::regclass
+          AND c.relname ~ '^events_y[0-9]{4}m[0-9]{2}$'
+          AND (to_date(substr(c.relname, 9, 4) || substr(c.relname, 14, 2), 'YYYYMM')
+               + interval '1 month') <= before
+        ORDER BY c.relname
+      LOOP
+        EXECUTE format('ALTER TABLE public.events DETACH PARTITION public.%I', r.relname);
+        RETURN NEXT r.relname;
+      END LOOP;
+    END $$;
+    """)
+
+    # Partitions for every month that has history, plus the next few.
+    op.execute(f"""
+    DO $$
+    DECLARE
+      first_month date := date_trunc('month', now())::date;
+    BEGIN
+      IF to_regclass('public.events_unpartitioned') IS NOT NULL THEN
+        SELECT COALESCE(date_trunc('month', MIN(created_at))::date, first_month)
+        INTO first_month
+        FROM public.events_unpartitioned;
+      END IF;
+
+      PERFORM public.ensure_events_partition(m::date)
+      FROM generate_series(first_month, date_trunc('month', now()), interval '1 month') AS m;
+      PERFORM public.ensure_events_partitions(3);
+
+      IF to_regclass('public.events_unpartitioned') IS NOT NULL THEN
+        INSERT INTO public.events ({_COLUMNS})
+        SELECT {_COLUMNS} FROM public.events_unpartitioned;
+        DROP TABLE public.events_unpartitioned;
+      END IF;
+    END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"""
+    CREATE TABLE public.events_unpartitioned (
+      id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+      tenant_id uuid NOT NULL,
+      entity_type text NOT NULL,
+      entity_id uuid NOT NULL,
+      event_type text NOT NULL,
+      actor_type text NOT NULL DEFAULT 'system',
+      actor_id uuid NULL,
+      payload jsonb NOT NULL DEFAULT '{{}}'::jsonb,
+      created_at timestamptz NOT NULL DEFAULT now()
+    );
+    INSERT INTO public.events_unpartitioned ({_COLUMNS})
+    SELECT {_COLUMNS} FROM public.events;
+    """)
+    op.execute("DROP FUNCTION IF EXISTS public.detach_events_partitions(timestamptz);")
+    op.execute("DROP FUNCTION IF EXISTS public.ensure_events_partitions(int);")
+    op.execute("DROP FUNCTION IF EXISTS public.ensure_events_partition(date);")
+    op.execute("DROP TABLE public.events CASCADE;")
+    op.execute("ALTER TABLE public.events_unpartitioned RENAME TO events;")
@@ -0,0 +1,66 @@
+"""NOTIFY on content.* event insert + tenant-wide event index
+
+Every row inserted into public.events with entity_type = 'content' sends
+pg_notify('content_events', <json>) with tenant_id, id, entity_id,
+event_type, actor_type, created_at and, when small enough to stay under
+the 8000-byte NOTIFY limit, payload. Notifications are delivered on commit
+(rolled-back events never notify). Consumed by the API's single LISTEN
+connection (app.listener / app.stream).
+
+idx_events_tenant_time (tenant_id, created_at, id) serves the stream's
+Last-Event-ID replay across all of a tenant's content. Created on the
+partitioned parent (propagates to every partition); CONCURRENTLY is not
+available for partitioned tables.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0006_events_notify"
+down_revision = "20261016_0005_events_partitioned"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.notify_content_event()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+      msg jsonb := jsonb_build_object(
+        'tenant_id', NEW.tenant_id,
+        'id', NEW.id,
+        'entity_id', NEW.entity_id,
+        'event_type', NEW.event_type,
+        'actor_type', NEW.actor_type,
+        'created_at', NEW.created_at
+      );
+    BEGIN
+      IF octet_length(NEW.payload::text) < 6000 THEN
+        msg := msg || jsonb_build_object('payload', NEW.payload);
+      END IF;
+      PERFORM pg_notify('content_events', msg::text);
+      RETURN NULL;
+    END $$;
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS trg_events_notify ON public.events;")
+    op.execute("""
+    CREATE TRIGGER trg_events_notify
+    AFTER INSERT ON public.events
+    FOR EACH ROW
+    WHEN (NEW.entity_type = 'content')
+    EXECUTE FUNCTION public.notify_content_event();
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_tenant_time
+    ON public.events (tenant_id, created_at, id);
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.idx_events_tenant_time;")
+    op.execute("DROP TRIGGER IF EXISTS trg_events_notify ON public.events;")
+    op.execute("DROP FUNCTION IF EXISTS public.notify_content_event();")
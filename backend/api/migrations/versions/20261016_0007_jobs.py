@@ -0,0 +1,78 @@
+"""Postgres-backed job queue (public.jobs)
+
+Consumed by backend/worker (worker.queue): workers claim ready jobs in
+batches with FOR UPDATE SKIP LOCKED and lease them until `locked_until`
+(visibility timeout); expired leases are re-queued by the reaper.
+
+  status    queued -> running -> done | (queued again with backoff) | failed
+  priority  higher runs first
+  run_at    not claimable before this (delayed jobs / retry backoff)
+  dedupe_key  at most one queued/running job per (queue, dedupe_key)
+
+Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0007_jobs"
+down_revision = "20261016_0006_events_notify"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.jobs (
+      id bigserial PRIMARY KEY,
+      tenant_id uuid NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+      queue text NOT NULL DEFAULT 'default',
+      kind text NOT NULL,
+      payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+      priority smallint NOT NULL DEFAULT 0,
+      status text NOT NULL DEFAULT 'queued'
+        CHECK (status IN ('queued', 'running', 'done', 'failed')),
+      attempts int NOT NULL DEFAULT 0,
+      max_attempts int NOT NULL DEFAULT 5,
+      run_at timestamptz NOT NULL DEFAULT now(),
+      locked_until timestamptz NULL,
+      locked_by text NULL,
+      last_error text NULL,
+      dedupe_key text NULL,
+      created_at timestamptz NOT NULL DEFAULT now(),
+      updated_at timestamptz NOT NULL DEFAULT now(),
+      finished_at timestamptz NULL
+    );
+    """)
+
+    # Claim path: only queued rows are indexed, so the index stays small no matter how much history piles up.
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_jobs_ready
+    ON public.jobs (queue, priority DESC, run_at, id)
+    WHERE status = 'queued';
+    """)
+
+    # Reaper: expired leases.
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_jobs_running_lease
+    ON public.jobs (locked_until)
+    WHERE status = 'running';
+    """)
+
+    op.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS ux_jobs_dedupe_active
+    ON public.jobs (queue, dedupe_key)
+    WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running');
+    """)
+
+    # Retention of finished jobs.
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_jobs_finished
+    ON public.jobs (finished_at)
+    WHERE status IN ('done', 'failed');
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TABLE IF EXISTS public.jobs;")
@@ -0,0 +1,51 @@
+"""Fetch state on sources (conditional GET + scheduling)
+
+Columns used by the worker's source fetcher (worker.fetcher):
+  etag / last_modified   validators sent back as If-None-Match / If-Modified-Since
+  next_fetch_at          when the source is due again (interval weighted by reputation_score)
+  last_fetched_at / last_status / last_error / consecutive_failures
+
+idx_sources_due serves the "due enabled sources" scan. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0008_source_fetch_state"
+down_revision = "20261016_0007_jobs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    ALTER TABLE public.sources
+      ADD COLUMN IF NOT EXISTS etag text NULL,
+      ADD COLUMN IF NOT EXISTS last_modified text NULL,
+      ADD COLUMN IF NOT EXISTS next_fetch_at timestamptz NOT NULL DEFAULT now(),
+      ADD COLUMN IF NOT EXISTS last_fetched_at timestamptz NULL,
+      ADD COLUMN IF NOT EXISTS last_status int NULL,
+      ADD COLUMN IF NOT EXISTS last_error text NULL,
+      ADD COLUMN IF NOT EXISTS consecutive_failures int NOT NULL DEFAULT 0;
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_sources_due
+    ON public.sources (next_fetch_at)
+    WHERE is_enabled;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.idx_sources_due;")
+    op.execute("""
+    ALTER TABLE public.sources
+      DROP COLUMN IF EXISTS consecutive_failures,
+      DROP COLUMN IF EXISTS last_error,
+      DROP COLUMN IF EXISTS last_status,
+      DROP COLUMN IF EXISTS last_fetched_at,
+      DROP COLUMN IF EXISTS next_fetch_at,
+      DROP COLUMN IF EXISTS last_modified,
+      DROP COLUMN IF EXISTS etag;
+    """)
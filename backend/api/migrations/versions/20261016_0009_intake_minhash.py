@@ -0,0 +1,26 @@
+"""MinHash signatures on intake_items (near-duplicate detection)
+
+intake_items.minhash holds the item's MinHash signature (num_perm x uint32,
+little-endian) written by the worker's intake pipeline (worker.neardup).
+Workers rebuild their per-tenant LSH index from it at start and catch up
+on other workers' rows by ingested_at (idx_intake_tenant_ingested).
+Near-duplicates are stored with integrity_flags.near_duplicate_of and no
+signature. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0009_intake_minhash"
+down_revision = "20261016_0008_source_fetch_state"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE public.intake_items ADD COLUMN IF NOT EXISTS minhash bytea NULL;")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE public.intake_items DROP COLUMN IF EXISTS minhash;")
@@ -0,0 +1,65 @@
+"""Embeddings (pgvector) on intake_items and draft_versions
+
+  embedding        vector(256), filled by the worker (worker.embed backfill job);
+                   stays NULL for rows with no text
+  embedding_model  which embedder produced it (NULL = not embedded yet);
+                   only same-model vectors are compared
+
+HNSW indexes (cosine) serve GET /content/{id}/similar; partial indexes on
+the not-yet-embedded rows keep the backfill scan cheap. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0010_embeddings"
+down_revision = "20261016_0009_intake_minhash"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+
+    for table in ("intake_items", "draft_versions"):
+        op.execute(f"""
+        ALTER TABLE public.{table}
+          ADD COLUMN IF NOT EXISTS embedding vector(256) NULL,
+          ADD COLUMN IF NOT EXISTS embedding_model text NULL;
+        """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_intake_embedding_hnsw
+    ON public.intake_items USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+    """)
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_drafts_embedding_hnsw
+    ON public.draft_versions USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_intake_unembedded
+    ON public.intake_items (ingested_at)
+    WHERE embedding_model IS NULL;
+    """)
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_drafts_unembedded
+    ON public.draft_versions (created_at)
+    WHERE embedding_model IS NULL;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.idx_drafts_unembedded;")
+    op.execute("DROP INDEX IF EXISTS public.idx_intake_unembedded;")
+    op.execute("DROP INDEX IF EXISTS public.idx_drafts_embedding_hnsw;")
+    op.execute("DROP INDEX IF EXISTS public.idx_intake_embedding_hnsw;")
+    for table in ("draft_versions", "intake_items"):
+        op.execute(f"""
+        ALTER TABLE public.{table}
+          DROP COLUMN IF EXISTS embedding_model,
+          DROP COLUMN IF EXISTS embedding;
+        """)
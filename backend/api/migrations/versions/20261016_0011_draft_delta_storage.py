@@ -0,0 +1,92 @@
+"""Delta storage for draft_versions + materialized latest draft
+
+draft_versions rows are either
+  storage = 'full'   body_md holds the whole body (every DRAFT_SNAPSHOT_EVERY-th version)
+  storage = 'delta'  body_md NULL, delta = zlib'd line edit script against version - 1
+(app.drafts has the format). body_len is the body length in characters.
+
+draft_latest keeps the newest body per content item, so reading the latest
+draft never replays deltas. It is seeded here from existing rows, which
+are all 'full'. idx_drafts_snapshots finds the nearest snapshot <= v.
+
+Downgrade refuses while delta rows exist: run
+`python -m app.drafts --rewrite full` first. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0011_draft_delta_storage"
+down_revision = "20261016_0010_embeddings"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    ALTER TABLE public.draft_versions
+      ALTER COLUMN body_md DROP NOT NULL,
+      ADD COLUMN IF NOT EXISTS storage text NOT NULL DEFAULT 'full',
+      ADD COLUMN IF NOT EXISTS delta bytea NULL,
+      ADD COLUMN IF NOT EXISTS body_len int NULL;
+    """)
+
+    op.execute("""
+    DO $$ BEGIN
+      ALTER TABLE public.draft_versions
+        ADD CONSTRAINT chk_draft_versions_storage CHECK (
+          (storage = 'full' AND body_md IS NOT NULL AND delta IS NULL)
+          OR (storage = 'delta' AND body_md IS NULL AND delta IS NOT NULL)
+        );
+    EXCEPTION WHEN duplicate_object THEN null; END $$;
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_drafts_snapshots
+    ON public.draft_versions (tenant_id, content_id, version)
+    WHERE storage = 'full';
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.draft_latest (
+      content_id uuid PRIMARY KEY REFERENCES public.content_items(id) ON DELETE CASCADE,
+      tenant_id uuid NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+      version int NOT NULL,
+      title text NULL,
+      body_md text NOT NULL,
+      citations jsonb NOT NULL DEFAULT '[]'::jsonb,
+      updated_at timestamptz NOT NULL DEFAULT now()
+    );
+    """)
+
+    op.execute("""
+    INSERT INTO public.draft_latest (content_id, tenant_id, version, title, body_md, citations, updated_at)
+    SELECT DISTINCT ON (content_id) content_id, tenant_id, version, title, body_md, citations, created_at
+    FROM public.draft_versions
+    WHERE storage = 'full'
+    ORDER BY content_id, version DESC
+    ON CONFLICT (content_id) DO NOTHING;
+    """)
+
+    op.execute("UPDATE public.draft_versions SET body_len = char_length(body_md) WHERE body_len IS NULL AND body_md IS NOT NULL;")
+
+
+def downgrade() -> None:
+    op.execute("""
+    DO $$ BEGIN
+      IF EXISTS (SELECT 1 FROM public.draft_versions WHERE storage = 'delta') THEN
+        RAISE EXCEPTION 'draft_versions has delta rows; run python -m app.drafts --rewrite full first';
+      END IF;
+    END $$;
+    """)
+    op.execute("DROP TABLE IF EXISTS public.draft_latest;")
+    op.execute("DROP INDEX IF EXISTS public.idx_drafts_snapshots;")
+    op.execute("ALTER TABLE public.draft_versions DROP CONSTRAINT IF EXISTS chk_draft_versions_storage;")
+    op.execute("""
+    ALTER TABLE public.draft_versions
+      DROP COLUMN IF EXISTS body_len,
+      DROP COLUMN IF EXISTS delta,
+      DROP COLUMN IF EXISTS storage,
+      ALTER COLUMN body_md SET NOT NULL;
+    """)
@@ -0,0 +1,69 @@
+"""Read-optimized published feed
+
+published_posts holds one pre-rendered row per live publication (slug,
+title, summary, html, metadata, etag), written in the transaction of the
+transition that reaches PUBLISHED (upsert) or RETIRED (delete), so public
+reads never join content_items / draft_versions / draft_latest.
+  idx_published_posts_feed    keyset (published_at DESC, publication_id DESC) per tenant
+  UNIQUE (tenant_id, slug)    /posts/{slug}
+
+published_feed_state.version is bumped on every feed change; it is the
+list ETag. uq_publications_live_content: at most one live publication
+per content item.
+
+Items already PUBLISHED are not backfilled here (rendering is done in
+Python): run `python -m app.published --rebuild`. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0012_published_posts"
+down_revision = "20261016_0011_draft_delta_storage"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.published_posts (
+      publication_id uuid PRIMARY KEY REFERENCES public.publications(id) ON DELETE CASCADE,
+      tenant_id uuid NOT NULL REFERENCES public.tenants(id) ON DELETE CASCADE,
+      content_id uuid NOT NULL,
+      slug text NOT NULL,
+      title text NOT NULL,
+      summary text NOT NULL DEFAULT '',
+      html text NOT NULL,
+      metadata jsonb NOT NULL DEFAULT '{}'::jsonb,
+      etag text NOT NULL,
+      published_at timestamptz NOT NULL,
+      updated_at timestamptz NOT NULL DEFAULT now(),
+      UNIQUE (tenant_id, slug)
+    );
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_published_posts_feed
+    ON public.published_posts (tenant_id, published_at DESC, publication_id DESC);
+    """)
+
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.published_feed_state (
+      tenant_id uuid PRIMARY KEY REFERENCES public.tenants(id) ON DELETE CASCADE,
+      version bigint NOT NULL DEFAULT 0,
+      updated_at timestamptz NOT NULL DEFAULT now()
+    );
+    """)
+
+    op.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_publications_live_content
+    ON public.publications (tenant_id, content_id)
+    WHERE is_live;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.uq_publications_live_content;")
+    op.execute("DROP TABLE IF EXISTS public.published_feed_state;")
+    op.execute("DROP TABLE IF EXISTS public.published_posts;")
@@ -0,0 +1,72 @@
+"""NOTIFY on policy_versions writes + one active policy per tenant
+
+Every INSERT / UPDATE / DELETE on public.policy_versions sends
+pg_notify('policy_events', <json>) with tenant_id and version, delivered
+on commit. API processes drop their cached compiled workflow for that
+tenant (app.policy).
+
+uq_policy_versions_active: at most one active version per tenant. Tenants
+that already have several keep only the newest one active.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0013_policy_notify"
+down_revision = "20261016_0012_published_posts"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    UPDATE public.policy_versions p
+    SET is_active = false
+    WHERE p.is_active
+      AND EXISTS (
+        SELECT 1 FROM public.policy_versions n
+        WHERE n.tenant_id = p.tenant_id AND n.is_active
+          AND (n.created_at, n.id) > (p.created_at, p.id)
+      );
+    """)
+
+    op.execute("""
+    CREATE UNIQUE INDEX IF NOT EXISTS uq_policy_versions_active
+    ON public.policy_versions (tenant_id)
+    WHERE is_active;
+    """)
+
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.notify_policy_version()
+    RETURNS trigger LANGUAGE plpgsql AS $$
+    DECLARE
+      r public.policy_versions;
+    BEGIN
+      IF TG_OP = 'DELETE' THEN
+        r := OLD;
+      ELSE
+        r := NEW;
+      END IF;
+      PERFORM pg_notify('policy_events', jsonb_build_object(
+        'tenant_id', r.tenant_id,
+        'version', r.version,
+        'op', TG_OP
+      )::text);
+      RETURN NULL;
+    END $$;
+    """)
+
+    op.execute("DROP TRIGGER IF EXISTS trg_policy_versions_notify ON public.policy_versions;")
+    op.execute("""
+    CREATE TRIGGER trg_policy_versions_notify
+    AFTER INSERT OR UPDATE OR DELETE ON public.policy_versions
+    FOR EACH ROW
+    EXECUTE FUNCTION public.notify_policy_version();
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS trg_policy_versions_notify ON public.policy_versions;")
+    op.execute("DROP FUNCTION IF EXISTS public.notify_policy_version();")
+    op.execute("DROP INDEX IF EXISTS public.uq_policy_versions_active;")
@@ -0,0 +1,45 @@
+"""Refresh scheduler checkpoint + publish-change index
+
+scheduler_checkpoints: the only state the worker's refresh scheduler
+(backend/worker worker.scheduler) persists, `last_tick_at` per scheduler,
+written in the same transaction as the jobs of that tick. Deadlines
+themselves are rebuilt from published_posts on start.
+
+idx_events_publish_changes: partial (created_at) index over the
+content.transitioned events that enter or leave PUBLISHED, so the
+scheduler's per-tick poll reads a handful of index entries instead of the
+events table. Created on the partitioned parent (propagates to every
+partition).
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261016_0014_refresh_scheduler"
+down_revision = "20261016_0013_policy_notify"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE TABLE IF NOT EXISTS public.scheduler_checkpoints (
+      name text PRIMARY KEY,
+      last_tick_at timestamptz NOT NULL,
+      updated_at timestamptz NOT NULL DEFAULT now()
+    );
+    """)
+
+    op.execute("""
+    CREATE INDEX IF NOT EXISTS idx_events_publish_changes
+    ON public.events (created_at)
+    WHERE entity_type = 'content'
+      AND event_type = 'content.transitioned'
+      AND (payload->>'to_state' = 'PUBLISHED' OR payload->>'from_state' = 'PUBLISHED');
+    """)
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS public.idx_events_publish_changes;")
+    op.execute("DROP TABLE IF EXISTS public.scheduler_checkpoints;")
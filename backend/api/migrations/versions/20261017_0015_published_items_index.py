@@ -0,0 +1,33 @@
+"""Partial index over PUBLISHED content_items
+
+idx_content_items_published: the refresh scheduler (backend/worker
+worker.scheduler) rebuilds its deadlines on start from every PUBLISHED
+item, anchored at updated_at (set by the transition into PUBLISHED, like
+the content.transitioned event it also polls). The INCLUDE columns let
+that pass read only the index.
+
+Built CONCURRENTLY (outside the migration transaction). Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261017_0015_published_items_index"
+down_revision = "20261016_0014_refresh_scheduler"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_items_published
+        ON public.content_items (updated_at) INCLUDE (id, tenant_id, risk)
+        WHERE state = 'PUBLISHED';
+        """)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.idx_content_items_published;")
@@ -0,0 +1,97 @@
+"""ensure_events_partition: move rows out of events_default
+
+Once rows of a month land in events_default (no partition existed when
+they were written), `CREATE TABLE ... PARTITION OF events FOR VALUES ...`
+for that month fails: the DEFAULT partition would then hold rows outside
+its implicit constraint. ensure_events_partition(month) now handles that
+case in its own transaction:
+  1. lock events (parent first, then partitions: the order inserts take;
+     plain CREATE ... PARTITION OF locked the parent the same way)
+  2. create the month's table standalone (LIKE events) with a CHECK on the
+     range, so the ATTACH below does not rescan it
+  3. move the month's rows from events_default into it
+  4. ATTACH it as the month's partition (indexes are created/attached from
+     the parent's), then drop the CHECK
+Months without stray rows are created directly, as before.
+
+The worker runs ensure_events_partitions on a schedule
+(events.ensure_partitions job, backend/worker worker.partitions).
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261017_0016_events_partition_move"
+down_revision = "20261017_0015_published_items_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.ensure_events_partition(month date)
+    RETURNS text LANGUAGE plpgsql AS $$
+    DECLARE
+      lo date := date_trunc('month', month)::date;
+      hi date := (date_trunc('month', month) + interval '1 month')::date;
+      part text := format('events_y%sm%s', to_char(lo, 'YYYY'), to_char(lo, 'MM'));
+      moved bigint;
+    BEGIN
+      IF to_regclass('public.' || part) IS NOT NULL THEN
+        RETURN part;
+      END IF;
+
+      LOCK TABLE public.events IN ACCESS EXCLUSIVE MODE;
+
+      IF to_regclass('public.events_default') IS NOT NULL THEN
+        IF EXISTS (SELECT 1 FROM public.events_default WHERE created_at >= lo AND created_at < hi) THEN
+          EXECUTE format(
+            'CREATE TABLE public.%I (LIKE public.events INCLUDING DEFAULTS, '
+            'CONSTRAINT %I CHECK (created_at >= %L AND created_at < %L))',
+            part, part || '_range', lo, hi
+          );
+          EXECUTE format(
+            'WITH m AS (DELETE FROM public.events_default WHERE created_at >= %L AND created_at < %L RETURNING *) '
+            'INSERT INTO public.%I SELECT * FROM m',
+            lo, hi, part
+          );
+          GET DIAGNOSTICS moved = ROW_COUNT;
+          EXECUTE format(
+            'ALTER TABLE public.events ATTACH PARTITION public.%I FOR VALUES FROM (%L) TO (%L)',
+            part, lo, hi
+          );
+          EXECUTE format('ALTER TABLE public.%I DROP CONSTRAINT %I', part, part || '_range');
+          RAISE NOTICE 'events: moved % rows from events_default into %', moved, part;
+          RETURN part;
+        END IF;
+      END IF;
+
+      EXECUTE format(
+        'CREATE TABLE public.%I PARTITION OF public.events FOR VALUES FROM (%L) TO (%L)',
+        part, lo, hi
+      );
+      RETURN part;
+    END $$;
+    """)
+
+
+def downgrade() -> None:
+    # Previous definition (20261016_0005): fails when events_default holds rows of the month.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION public.ensure_events_partition(month date)
+    RETURNS text LANGUAGE plpgsql AS $$
+    DECLARE
+      lo date := date_trunc('month', month)::date;
+      hi date := (date_trunc('month', month) + interval '1 month')::date;
+      part text := format('events_y%sm%s', to_char(lo, 'YYYY'), to_char(lo, 'MM'));
+    BEGIN
+      IF to_regclass('public.' || part) IS NULL THEN
+        EXECUTE format(
+          'CREATE TABLE public.%I PARTITION OF public.events FOR VALUES FROM (%L) TO (%L)',
+          part, lo, hi
+        );
+      END IF;
+      RETURN part;
+    END $$;
+    """)
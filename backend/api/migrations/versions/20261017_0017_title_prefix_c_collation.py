@@ -0,0 +1,39 @@
+"""Typeahead index in "C" collation
+
+idx_content_tenant_title_prefix (tenant_id, lower(title) text_pattern_ops)
+served `lower(title) LIKE 'q%'` but not `ORDER BY lower(title)` under a
+non-C database collation, so typeahead fetched and sorted every prefix
+match. Replaced by (tenant_id, (lower(title) COLLATE "C"), id): in "C" the
+default btree opclass serves both the LIKE prefix range and the ORDER BY,
+and the scan stops after LIMIT rows. Queries spell the expression the same
+way (repo._search_predicate, repo.typeahead_content_tx).
+
+Built CONCURRENTLY. Idempotent.
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+revision = "20261017_0017_title_prefix_c_collation"
+down_revision = "20261017_0016_events_partition_move"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_tenant_title_prefix_c
+        ON public.content_items (tenant_id, (lower(title) COLLATE "C"), id);
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.idx_content_tenant_title_prefix;")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("""
+        CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_content_tenant_title_prefix
+        ON public.content_items (tenant_id, lower(title) text_pattern_ops);
+        """)
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS public.idx_content_tenant_title_prefix_c;")
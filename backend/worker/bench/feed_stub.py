@@ -0,0 +1,167 @@
+"""
+Local HTTP stub serving generated RSS feeds, for exercising worker.fetcher.
+
+    GET /feed/<name>.xml?items=N   RSS 2.0 with N items (default --items)
+    GET /feed/<name>.ndjson?items=N
+
+Each response carries a stable ETag and Last-Modified; matching
+If-None-Match / If-Modified-Since gets a 304. Bodies are written in chunks
+(with an optional --delay per request) so large feeds really stream.
+`POST /bump/<name>` changes a feed's content (new ETag, one more item).
+
+Run from backend/worker:
+    python -m bench.feed_stub --port 8099 --items 200
+then point sources at http://127.0.0.1:8099/feed/a.xml and run `python -m worker.fetcher`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+_START = time.time()
+
+
+class FeedState:
+    def __init__(self, items: int) -> None:
+        self.default_items = items
+        self.versions: Dict[str, int] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.lock = threading.Lock()
+
+    def bump(self, name: str) -> int:
+        with self.lock:
+            self.versions[name] = self.versions.get(name, 0) + 1
+            return self.versions[name]
+
+
+def _rss(name: str, version: int, n: int) -> Iterator[bytes]:
+    yield (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        f'<rss version="2.0"><channel><title>{name}</title><link>http://stub/{name}</link>\n'
+    ).encode()
+    for i in range(n + version):
+        ts = formatdate(_START - i * 60, usegmt=True)
+        yield (
+            f"<item><title>{name} post {i}</title>"
+            f"<link>http://stub/{name}/{i}</link>"
+            f"<pubDate>{ts}</pubDate>"
+            f"<description>&lt;p&gt;Body of {name} post {i}, revision {version}.&lt;/p&gt;</description>"
+            "</item>\n"
+        ).encode()
+    yield b"</channel></rss>\n"
+
+
+def _ndjson(name: str, version: int, n: int) -> Iterator[bytes]:
+    for i in range(n + version):
+        yield (json.dumps({
+            "title": f"{name} post {i}",
+            "url": f"http://stub/{name}/{i}",
+            "content": f"Body of {name} post {i}, revision {version}.",
+            "published_at": formatdate(_START - i * 60, usegmt=True),
+        }) + "\n").encode()
+
+
+def make_handler(state: FeedState, delay: float):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):  # quiet
+            pass
+
+        def do_POST(self):
+            parts = urlsplit(self.path).path.strip("/").split("/")
+            if len(parts) == 2 and parts[0] == "bump":
+                v = state.bump(parts[1])
+                body = json.dumps({"name": parts[1], "version": v}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_error(404)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            parts = url.path.strip("/").split("/")
+            if len(parts) != 2 or parts[0] != "feed" or "." not in parts[1]:
+                self.send_error(404)
+                return
+            name, ext = parts[1].rsplit(".", 1)
+            if ext not in ("xml", "ndjson"):
+                self.send_error(404)
+                return
+            n = int(parse_qs(url.query).get("items", [state.default_items])[0])
+            with state.lock:
+                state.requests += 1
+                version = state.versions.get(name, 0)
+
+            etag = '"' + hashlib.sha1(f"{name}:{ext}:{version}:{n}".encode()).hexdigest()[:16] + '"'
+            last_modified = formatdate(_START + version, usegmt=True)
+            if delay:
+                time.sleep(delay)
+
+            inm = self.headers.get("If-None-Match")
+            if inm == etag or (inm is None and self.headers.get("If-Modified-Since") == last_modified):
+                with state.lock:
+                    state.not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/rss+xml" if ext == "xml" else "application/x-ndjson")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            gen = _rss(name, version, n) if ext == "xml" else _ndjson(name, version, n)
+            for chunk in gen:
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def serve(port: int = 8099, items: int = 50, delay: float = 0.0) -> ThreadingHTTPServer:
+    """
+    Start the stub on a background thread (port 0 = any free port) and return the server.
+    """
+    state = FeedState(items)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state, delay))
+    server.state = state  # type: ignore[attr-defined]
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="RSS stub server for the source fetcher")
+    ap.add_argument("--port", type=int, default=8099)
+    ap.add_argument("--items", type=int, default=50)
+    ap.add_argument("--delay", type=float, default=0.0, help="seconds of latency per request")
+    args = ap.parse_args()
+
+    server = serve(args.port, args.items, args.delay)
+    print(f"serving feeds on http://127.0.0.1:{server.server_address[1]}/feed/<name>.xml")
+    try:
+        while True:
+            time.sleep(5)
+            st = server.state  # type: ignore[attr-defined]
+            print(json.dumps({"requests": st.requests, "not_modified": st.not_modified}))
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
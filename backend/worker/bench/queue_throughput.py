@@ -0,0 +1,77 @@
+"""
+Job queue throughput (jobs/s) as the worker count scales.
+
+For each worker count: enqueue --jobs noop jobs on a dedicated queue, run
+one WorkerPool (thread mode) with that concurrency until the queue is
+empty, report jobs/s. Measures the queue itself: claim (SKIP LOCKED) +
+ack round trips, not handler work.
+
+Needs DATABASE_URL with migrations applied (public.jobs). Run from backend/worker:
+    python -m bench.queue_throughput --jobs 20000 --workers 1,2,4,8,16
+    python -m bench.queue_throughput --jobs 20000 --workers 4 --pools 4   # 4 competing pools
+"""
+
+from __future__ import annotations
+
+import argparse
+import threading
+import time
+import uuid
+
+from sqlalchemy import text
+
+from worker import jobs  # noqa: F401  (registers noop)
+from worker import queue
+from worker.db import make_engine
+from worker.pool import PoolConfig, WorkerPool
+
+
+def _enqueue(engine, queue_name: str, n: int, chunk: int = 5000) -> None:
+    for start in range(0, n, chunk):
+        batch = [{"kind": "noop", "queue": queue_name} for _ in range(min(chunk, n - start))]
+        with engine.begin() as conn:
+            queue.enqueue_many_tx(conn, batch)
+
+
+def _cleanup(engine, queue_name: str) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM public.jobs WHERE queue = :q"), {"q": queue_name})
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--jobs", type=int, default=20000)
+    ap.add_argument("--workers", default="1,2,4,8,16", help="comma-separated worker counts")
+    ap.add_argument("--pools", type=int, default=1, help="competing pools (dispatchers) per run")
+    ap.add_argument("--batch", type=int, default=0, help="claim batch size (0 = worker count)")
+    args = ap.parse_args()
+
+    setup = make_engine(pool_size=2)
+
+    print(f"{'workers':>7} {'pools':>5} {'jobs':>7} {'seconds':>8} {'jobs/s':>9} {'claims':>7}")
+    for n in [int(x) for x in args.workers.split(",") if x.strip()]:
+        queue_name = f"bench-{uuid.uuid4().hex[:8]}"
+        _enqueue(setup, queue_name, args.jobs)
+
+        cfg = PoolConfig(concurrency=n, queues=(queue_name,), batch_size=args.batch, poll_interval=0.01)
+        pools = [WorkerPool(make_engine(pool_size=2), cfg) for _ in range(args.pools)]
+        threads = [threading.Thread(target=p.run, kwargs={"stop_when_idle": True}) for p in pools]
+
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - t0
+
+        done = sum(p.stats.succeeded for p in pools)
+        claims = sum(p.stats.claims for p in pools)
+        print(f"{n:>7} {args.pools:>5} {done:>7} {wall:>8.2f} {done / wall:>9.1f} {claims:>7}")
+
+        for p in pools:
+            p.engine.dispose()
+        _cleanup(setup, queue_name)
+
+
+if __name__ == "__main__":
+    main()
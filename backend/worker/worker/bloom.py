@@ -0,0 +1,61 @@
+"""
+Small Bloom filter for hex digests (no third-party dependency).
+
+Keys are already uniformly distributed hashes (sha256 hex), so the k probe
+positions come from double hashing two 64-bit slices of the key instead of
+re-hashing it k times.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Any, Dict, Iterable
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, error_rate: float = 0.01) -> None:
+        capacity = max(1, int(capacity))
+        error_rate = min(max(error_rate, 1e-9), 0.5)
+        # Standard sizing: m = -n ln p / (ln 2)^2, k = m/n ln 2
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.count = 0
+        self._bits = bytearray((self.num_bits + 7) // 8)
+
+    def _positions(self, hex_key: str) -> Iterable[int]:
+        h1 = int(hex_key[:16], 16)
+        h2 = int(hex_key[16:32], 16) | 1
+        m = self.num_bits
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % m
+
+    def add(self, hex_key: str) -> None:
+        bits = self._bits
+        for p in self._positions(hex_key):
+            bits[p >> 3] |= 1 << (p & 7)
+        self.count += 1
+
+    def update(self, hex_keys: Iterable[str]) -> None:
+        for k in hex_keys:
+            self.add(k)
+
+    def __contains__(self, hex_key: str) -> bool:
+        bits = self._bits
+        return all(bits[p >> 3] & (1 << (p & 7)) for p in self._positions(hex_key))
+
+    @property
+    def saturated(self) -> bool:
+        # Past capacity the false-positive rate climbs quickly; callers rebuild bigger.
+        return self.count > self.capacity
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "bits": self.num_bits,
+            "hashes": self.num_hashes,
+            "bytes": len(self._bits),
+            "target_error_rate": self.error_rate,
+        }
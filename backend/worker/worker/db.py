@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+
+def _database_url() -> str:
+    # Same DATABASE_URL as backend/api (.env in the working dir if present)
+    load_dotenv(override=False)
+
+    db_url = os.getenv("DATABASE_URL", "").strip()
+    if not db_url:
+        raise RuntimeError("DATABASE_URL is not set")
+
+    # psycopg (v3) driver, like the API
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if db_url.startswith(prefix):
+            return "postgresql+psycopg://" + db_url[len(prefix):]
+    return db_url
+
+
+def make_engine(pool_size: int = 5) -> Engine:
+    """
+    New engine (one per process: engines must not cross a fork).
+    """
+    return create_engine(
+        _database_url(),
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=pool_size,
+        future=True,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> Engine:
+    return make_engine(pool_size=int(os.getenv("WORKER_DB_POOL_SIZE", "5")))
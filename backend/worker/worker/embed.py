@@ -0,0 +1,221 @@
+"""
+Text embeddings for intake_items / draft_versions (pgvector).
+
+    embedder = get_embedder()             # EMBEDDER env: "hashing" (default) or "package.module:factory"
+    vecs = embedder.embed(["text", ...])  # float32 (n, EMBEDDING_DIM), L2-normalized
+    backfill(engine, "intake")            # embed every row not embedded yet, in batches
+
+The default HashingEmbedder is deterministic and local (feature hashing of
+word unigrams + bigrams, signed, log-scaled, L2-normalized): no model
+download, no network. It captures lexical overlap, which is what related
+content and dedupe need; a semantic model can be plugged in through
+EMBEDDER as long as it returns EMBEDDING_DIM-dimensional vectors (the
+column is vector(256), see API migration 20261016_0010_embeddings).
+
+Each row records `embedding_model`; rows embedded by another model are
+not compared against each other by the API.
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import time
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Protocol, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from worker.intake import normalize_text
+from worker.jobs import JobContext, job
+
+log = logging.getLogger(__name__)
+
+EMBEDDING_DIM = 256
+
+
+class Embedder(Protocol):
+    name: str
+    dim: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    def __init__(self, dim: int = EMBEDDING_DIM, max_tokens: int = 2000) -> None:
+        self.dim = dim
+        self.max_tokens = max_tokens
+        self.name = f"hashing-v1-{dim}"
+
+    def _one(self, raw: str) -> np.ndarray:
+        words = normalize_text(raw).split()[: self.max_tokens]
+        if not words:
+            return np.zeros(self.dim, dtype=np.float32)
+        feats = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        h = np.fromiter((zlib.crc32(f.encode("utf-8")) for f in feats), dtype=np.uint32, count=len(feats))
+        # Low bits pick the dimension, bit 31 the sign (keeps hashed features unbiased).
+        sign = np.where(h >> np.uint32(31), -1.0, 1.0)
+        v = np.bincount(h % np.uint32(self.dim), weights=sign, minlength=self.dim)
+        v = np.sign(v) * np.log1p(np.abs(v))
+        norm = np.linalg.norm(v)
+        return (v / norm if norm else v).astype(np.float32)
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.stack([self._one(t or "") for t in texts])
+
+
+@lru_cache(maxsize=1)
+def get_embedder() -> Embedder:
+    spec = os.getenv("EMBEDDER", "hashing").strip()
+    if spec == "hashing":
+        return HashingEmbedder()
+    module, _, attr = spec.partition(":")
+    if not attr:
+        raise RuntimeError(f"EMBEDDER must be 'hashing' or 'package.module:factory', got {spec!r}")
+    embedder = getattr(importlib.import_module(module), attr)()
+    if embedder.dim != EMBEDDING_DIM:
+        raise RuntimeError(f"Embedder {embedder.name} has dim {embedder.dim}, the columns are vector({EMBEDDING_DIM})")
+    return embedder
+
+
+def vector_literal(vec: np.ndarray) -> str:
+    return "[" + ",".join(f"{x:.6g}" for x in vec.tolist()) + "]"
+
+
+# ----------------------------
+# SQL
+# ----------------------------
+
+# table -> (relation, FROM clause (relation aliased t), text expression, order column).
+# A NULL text means "nothing to embed": the row gets embedding_model and a NULL embedding.
+_TABLES: Dict[str, Tuple[str, str, str, str]] = {
+    "intake": (
+        "public.intake_items",
+        "public.intake_items t",
+        "concat_ws(E'\\n', t.title, t.raw_text)",
+        "t.ingested_at",
+    ),
+    # Delta-stored versions have no body_md; the latest one is materialized in draft_latest.
+    # A delta version that is no longer the latest by the time it is claimed gets no
+    # embedding (a title-only vector would stand in for the draft in similarity search).
+    "drafts": (
+        "public.draft_versions",
+        "public.draft_versions t LEFT JOIN public.draft_latest l"
+        " ON l.content_id = t.content_id AND l.version = t.version",
+        "CASE WHEN COALESCE(t.body_md, l.body_md) IS NOT NULL"
+        " THEN concat_ws(E'\\n', t.title, COALESCE(t.body_md, l.body_md)) END",
+        "t.created_at",
+    ),
+}
+
+
+def _table(table: str) -> Tuple[str, str, str, str]:
+    try:
+        return _TABLES[table]
+    except KeyError:
+        raise ValueError(f"Unknown embeddings table: {table}") from None
+
+
+def claim_unembedded_tx(conn: Connection, table: str, limit: int) -> List[Tuple[str, Optional[str]]]:
+    """
+    Oldest rows not embedded yet, locked (SKIP LOCKED) so parallel backfills take disjoint batches.
+    The text is None for rows with nothing to embed.
+    """
+    _, from_sql, text_expr, order_col = _table(table)
+    rows = conn.execute(
+        text(f"""
+            SELECT t.id::text, {text_expr}
+            FROM {from_sql}
+            WHERE t.embedding_model IS NULL
+            ORDER BY {order_col}
+            LIMIT :limit
+            FOR UPDATE OF t SKIP LOCKED;
+        """),
+        {"limit": int(limit)},
+    ).all()
+    return [(r[0], r[1]) for r in rows]
+
+
+def store_embeddings_tx(conn: Connection, table: str, ids: List[str], vectors: np.ndarray, model: str) -> int:
+    """
+    Rows with nothing to embed (zero vector: empty text) keep embedding NULL
+    but get embedding_model, so they are not claimed again.
+    """
+    rel, _, _, _ = _table(table)
+    if not ids:
+        return 0
+    res = conn.execute(
+        text(f"""
+            UPDATE {rel} t
+            SET embedding = CAST(v.vec AS vector), embedding_model = :model
+            FROM unnest(CAST(:ids AS uuid[]), CAST(:vecs AS text[])) AS v(id, vec)
+            WHERE t.id = v.id;
+        """),
+        {"ids": ids, "vecs": [vector_literal(v) if v.any() else None for v in vectors], "model": model},
+    )
+    return int(res.rowcount or 0)
+
+
+# ----------------------------
+# Backfill
+# ----------------------------
+
+def backfill(engine: Engine, table: str, batch_size: int = 256, max_batches: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Embed rows with embedding_model IS NULL until none are left (or max_batches).
+    Each batch is one transaction: claim, embed, UPDATE.
+    """
+    embedder = get_embedder()
+    t0 = time.perf_counter()
+    done = batches = 0
+    while max_batches is None or batches < max_batches:
+        with engine.begin() as conn:
+            rows = claim_unembedded_tx(conn, table, batch_size)
+            if not rows:
+                break
+            # Rows without a text are not passed to the embedder; their zero vector stores a NULL embedding.
+            vecs = np.zeros((len(rows), EMBEDDING_DIM), dtype=np.float32)
+            todo = [k for k, (_, t) in enumerate(rows) if t is not None]
+            if todo:
+                vecs[todo] = embedder.embed([rows[k][1] for k in todo])
+            done += store_embeddings_tx(conn, table, [i for i, _ in rows], vecs, embedder.name)
+        batches += 1
+    return {"table": table, "embedded": done, "batches": batches, "model": embedder.name,
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+
+@job("embeddings.backfill")
+def backfill_job(payload: Dict[str, Any], ctx: JobContext) -> List[Dict[str, Any]]:
+    """
+    payload: {"table"?: "intake" | "drafts" (default both), "batch_size"?: int}
+    """
+    from worker.db import get_engine
+
+    tables = [payload["table"]] if payload.get("table") else list(_TABLES)
+    batch_size = int(payload.get("batch_size", 256))
+    return [backfill(get_engine(), t, batch_size) for t in tables]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Backfill embeddings for intake_items / draft_versions")
+    ap.add_argument("--table", choices=sorted(_TABLES), default=None, help="default: all")
+    ap.add_argument("--batch", type=int, default=256)
+    args = ap.parse_args()
+
+    from worker.db import get_engine
+
+    logging.basicConfig(level=logging.INFO)
+    for t in [args.table] if args.table else list(_TABLES):
+        print(json.dumps(backfill(get_engine(), t, args.batch)))
+
+
+if __name__ == "__main__":
+    main()
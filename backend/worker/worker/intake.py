@@ -0,0 +1,473 @@
+"""
+Streaming intake: source items -> intake_items -> content_items.
+
+    pipeline = IntakePipeline(engine)
+    stats = pipeline.run(items)          # any iterable of IntakeItem (streamed, batched)
+
+Per item:
+  1. raw_text is normalized (NFKC, casefold, whitespace collapsed) and
+     sha256-hashed chunk by chunk: no normalized copy of the text is built.
+  2. The tenant's Bloom filter (seeded once per process from existing
+     raw_hash values) answers "definitely new" for most new items. Bloom
+     hits ("probably seen") are verified with one read per batch; confirmed
+     duplicates never reach an INSERT.
+  3. Survivors are written with one INSERT ... ON CONFLICT (tenant_id,
+     raw_hash) DO NOTHING per batch, which in the same statement promotes
+     the newly inserted rows into content_items (INGESTED), bumps
+     content_state_counts and appends content.created events. Rows with
+     integrity_flags.hold = true are stored but not promoted.
+
+Between 2 and 3, new items get a MinHash signature checked against the
+tenant's LSH index (worker.neardup): near-duplicates (syndicated copies)
+get integrity_flags.near_duplicate_of / near_duplicate_similarity and,
+by default, hold; the others are stored with their signature and added to
+the index once their batch has committed.
+Batches that insert rows also enqueue one (deduped) embeddings.backfill job.
+
+Re-ingesting an unchanged feed therefore costs hashing + Bloom probes +
+one SELECT per batch, and zero writes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import unicodedata
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from worker import queue
+from worker.bloom import BloomFilter
+from worker.neardup import LshIndex, MinHasher, NearDupConfig, signature_bytes, signature_from_bytes, tenant_index
+
+log = logging.getLogger(__name__)
+
+_HASH_CHUNK = 64 * 1024
+
+
+@dataclass
+class IntakeItem:
+    tenant_id: str
+    raw_text: str
+    title: Optional[str] = None
+    source_id: Optional[str] = None
+    source_url: Optional[str] = None
+    published_at: Optional[datetime] = None
+    integrity_flags: Dict[str, Any] = field(default_factory=dict)
+    raw_hash: Optional[str] = None  # filled by the pipeline
+    minhash: Optional[bytes] = None  # filled by the pipeline (near-duplicate detection)
+
+
+# ----------------------------
+# Normalize + hash
+# ----------------------------
+
+def _splits_cleanly(raw: str, end: int) -> bool:
+    """
+    True if NFKC does not compose across `end`: normalizing both sides
+    separately gives the same text as normalizing them together. A chunk never
+    starts with a mark, or with a character whose NFKC form starts with one
+    (halfwidth kana voiced marks): later marks would compose with the previous
+    chunk. Starters compose over at most two preceding starters (Hangul
+    L + V + T jamo) plus their marks, so that much context is checked.
+    """
+    nfkc = unicodedata.normalize
+    c = raw[end]
+    c_norm = nfkc("NFKC", c)
+    if unicodedata.combining(c) or (c_norm and unicodedata.combining(c_norm[0])):
+        return False
+    s, starters = end, 0
+    while s > 0 and starters < 2:
+        s -= 1
+        if not unicodedata.combining(raw[s]):
+            starters += 1
+    head = raw[s:end]
+    return nfkc("NFKC", head + c) == nfkc("NFKC", head) + c_norm
+
+
+def _normalized_chunks(raw: str, chunk_size: int = _HASH_CHUNK) -> Iterator[str]:
+    """
+    NFKC + casefold + collapse runs of whitespace to one space + strip,
+    emitted chunk by chunk. Concatenated output == normalize_text(raw):
+    chunks only end where NFKC does not compose across (_splits_cleanly).
+    """
+    started = False
+    pending_space = False
+    start = 0
+    while start < len(raw):
+        end = min(len(raw), start + chunk_size)
+        # Never split where NFKC composes across the boundary (marks, conjoining jamo, ...).
+        while end < len(raw) and not _splits_cleanly(raw, end):
+            end += 1
+        chunk = unicodedata.normalize("NFKC", raw[start:end]).casefold()
+        start = end
+        if not chunk:
+            continue
+
+        if chunk[0].isspace():
+            pending_space = True
+        out: List[str] = []
+        for i, word in enumerate(chunk.split()):
+            if started and (i > 0 or pending_space):
+                out.append(" ")
+            out.append(word)
+            started = True
+        pending_space = chunk[-1].isspace()
+        if out:
+            yield "".join(out)
+
+
+def normalize_text(raw: str) -> str:
+    return " ".join(unicodedata.normalize("NFKC", raw or "").casefold().split())
+
+
+def raw_hash(raw: str) -> str:
+    """
+    sha256 hex of the normalized text, fed incrementally.
+    """
+    h = hashlib.sha256()
+    for piece in _normalized_chunks(raw or ""):
+        h.update(piece.encode("utf-8"))
+    return h.hexdigest()
+
+
+# ----------------------------
+# SQL
+# ----------------------------
+
+def iter_existing_hashes_tx(conn: Connection, tenant_id: str, chunk: int = 10000) -> Iterator[str]:
+    """
+    Stream a tenant's raw_hash values (server-side cursor, uq_intake_tenant_hash index-only scan).
+    """
+    result = conn.execution_options(stream_results=True, yield_per=chunk).execute(
+        text("SELECT raw_hash FROM public.intake_items WHERE tenant_id = CAST(:tenant_id AS uuid)"),
+        {"tenant_id": str(tenant_id)},
+    )
+    for row in result:
+        yield row[0]
+
+
+def existing_hashes_tx(conn: Connection, tenant_id: str, hashes: List[str]) -> Set[str]:
+    if not hashes:
+        return set()
+    rows = conn.execute(
+        text("""
+            SELECT raw_hash
+            FROM public.intake_items
+            WHERE tenant_id = CAST(:tenant_id AS uuid)
+              AND raw_hash = ANY(CAST(:hashes AS text[]));
+        """),
+        {"tenant_id": str(tenant_id), "hashes": hashes},
+    ).scalars().all()
+    return set(rows)
+
+
+def insert_and_promote_tx(conn: Connection, items: List[IntakeItem]) -> Dict[str, int]:
+    """
+    One statement: insert intake rows (duplicates by (tenant_id, raw_hash)
+    skipped), promote the rows actually inserted into content_items, bump
+    content_state_counts, append content.created events.
+    """
+    if not items:
+        return {"inserted": 0, "promoted": 0}
+
+    sql = text("""
+        WITH src AS (
+            SELECT *
+            FROM unnest(
+                CAST(:tenant_ids AS uuid[]),
+                CAST(:source_ids AS uuid[]),
+                CAST(:source_urls AS text[]),
+                CAST(:titles AS text[]),
+                CAST(:raw_texts AS text[]),
+                CAST(:raw_hashes AS text[]),
+                CAST(:published_ats AS timestamptz[]),
+                CAST(:flags AS jsonb[]),
+                CAST(:minhashes AS bytea[])
+            ) AS t(tenant_id, source_id, source_url, title, raw_text, raw_hash, published_at, integrity_flags, minhash)
+        ), ins AS (
+            INSERT INTO public.intake_items
+                (tenant_id, source_id, source_url, title, raw_text, raw_hash, published_at, integrity_flags, minhash)
+            SELECT tenant_id, source_id, source_url, title, raw_text, raw_hash, published_at, integrity_flags, minhash
+            FROM src
+            ON CONFLICT (tenant_id, raw_hash) DO NOTHING
+            RETURNING id, tenant_id, title, raw_text, integrity_flags
+        ), c AS (
+            INSERT INTO public.content_items (tenant_id, intake_id, title, risk, state, created_at, updated_at)
+            SELECT
+                tenant_id, id,
+                COALESCE(NULLIF(btrim(title), ''), left(btrim(raw_text), 200), '(untitled)'),
+                'TIER_1', 'INGESTED', now(), now()
+            FROM ins
+            WHERE NOT COALESCE((integrity_flags ->> 'hold')::boolean, false)
+            RETURNING id, tenant_id, intake_id, title, created_at
+        ), cnt AS (
+            INSERT INTO public.content_state_counts AS sc (tenant_id, state, n)
+            SELECT tenant_id, 'INGESTED', COUNT(*) FROM c GROUP BY tenant_id ORDER BY tenant_id
+            ON CONFLICT (tenant_id, state) DO UPDATE SET n = sc.n + EXCLUDED.n
+        ), ev AS (
+            INSERT INTO public.events
+                (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+            SELECT
+                tenant_id, 'content', id, 'content.created', 'system', NULL,
+                jsonb_build_object('state', 'INGESTED', 'title', title, 'risk_tier', 1, 'intake_id', intake_id),
+                created_at
+            FROM c
+        )
+        SELECT
+            (SELECT COUNT(*) FROM ins) AS inserted,
+            (SELECT COUNT(*) FROM c) AS promoted;
+    """)
+
+    row = conn.execute(
+        sql,
+        {
+            "tenant_ids": [it.tenant_id for it in items],
+            "source_ids": [it.source_id for it in items],
+            "source_urls": [it.source_url for it in items],
+            "titles": [it.title for it in items],
+            "raw_texts": [it.raw_text for it in items],
+            "raw_hashes": [it.raw_hash for it in items],
+            "published_ats": [it.published_at for it in items],
+            "flags": [json.dumps(it.integrity_flags or {}) for it in items],
+            "minhashes": [it.minhash for it in items],
+        },
+    ).mappings().one()
+    return {"inserted": int(row["inserted"]), "promoted": int(row["promoted"])}
+
+
+# ----------------------------
+# Pipeline
+# ----------------------------
+
+# tenant_id -> BloomFilter, shared by every pipeline in this process
+_BLOOMS: Dict[str, BloomFilter] = {}
+
+
+def tenant_bloom(engine: Engine, tenant_id: str, error_rate: float = 0.01, min_capacity: int = 100_000) -> BloomFilter:
+    """
+    Bloom filter of the tenant's known raw_hash values, seeded from the DB on
+    first use and (re)built with 2x headroom when it fills up.
+    """
+    bloom = _BLOOMS.get(tenant_id)
+    if bloom is not None and not bloom.saturated:
+        return bloom
+
+    with engine.connect() as conn:
+        hashes = list(iter_existing_hashes_tx(conn, tenant_id))
+    bloom = BloomFilter(max(min_capacity, 2 * len(hashes)), error_rate)
+    bloom.update(hashes)
+    _BLOOMS[tenant_id] = bloom
+    log.info("intake: bloom for tenant %s seeded with %d hashes", tenant_id, len(hashes))
+    return bloom
+
+
+@dataclass
+class IntakeStats:
+    seen: int = 0
+    duplicates_in_batch: int = 0
+    bloom_negative: int = 0
+    bloom_positive: int = 0
+    bloom_false_positive: int = 0
+    confirmed_duplicates: int = 0
+    near_duplicates: int = 0
+    inserted: int = 0
+    promoted: int = 0
+    batches: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return dict(self.__dict__)
+
+
+class IntakePipeline:
+    def __init__(
+        self,
+        engine: Engine,
+        batch_size: int = 500,
+        error_rate: float = 0.01,
+        near_dup: Optional[NearDupConfig] = None,
+        embed: Optional[bool] = None,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = max(1, int(batch_size))
+        self.error_rate = error_rate
+        self.near_dup = near_dup or NearDupConfig.from_env()
+        self.minhasher = (
+            MinHasher(self.near_dup.num_perm, self.near_dup.shingle, self.near_dup.min_tokens)
+            if self.near_dup.enabled else None
+        )
+        self.embed = embed if embed is not None else os.getenv("EMBEDDINGS_ENABLED", "1") not in ("0", "false", "no")
+        self.stats = IntakeStats()
+
+    def run(self, items: Iterable[IntakeItem]) -> Dict[str, int]:
+        batch: List[IntakeItem] = []
+        for it in items:
+            batch.append(it)
+            if len(batch) >= self.batch_size:
+                self._process(batch)
+                batch = []
+        if batch:
+            self._process(batch)
+        return self.stats.as_dict()
+
+    def _process(self, batch: List[IntakeItem]) -> None:
+        st = self.stats
+        st.batches += 1
+
+        by_tenant: Dict[str, List[IntakeItem]] = {}
+        for it in batch:
+            st.seen += 1
+            it.raw_hash = it.raw_hash or raw_hash(it.raw_text)
+            by_tenant.setdefault(str(it.tenant_id), []).append(it)
+
+        survivors: List[IntakeItem] = []
+        blooms: Dict[str, BloomFilter] = {}
+        for tenant_id, items in by_tenant.items():
+            bloom = blooms[tenant_id] = tenant_bloom(self.engine, tenant_id, self.error_rate)
+
+            seen_here: Set[str] = set()
+            fresh: List[IntakeItem] = []
+            maybe: List[IntakeItem] = []
+            for it in items:
+                if it.raw_hash in seen_here:
+                    st.duplicates_in_batch += 1
+                    continue
+                seen_here.add(it.raw_hash)
+                (maybe if it.raw_hash in bloom else fresh).append(it)
+
+            st.bloom_negative += len(fresh)
+            st.bloom_positive += len(maybe)
+            if maybe:
+                # Bloom says "probably seen": confirm with one indexed read (never skip a new item on a false positive).
+                with self.engine.connect() as conn:
+                    known = existing_hashes_tx(conn, tenant_id, [it.raw_hash for it in maybe])
+                st.confirmed_duplicates += len(known)
+                st.bloom_false_positive += len(maybe) - len(known)
+                fresh.extend(it for it in maybe if it.raw_hash not in known)
+
+            survivors.extend(fresh)
+
+        if survivors:
+            survivors = self._before_insert(survivors)
+            with self.engine.begin() as conn:
+                res = insert_and_promote_tx(conn, survivors)
+                if res["inserted"] and self.embed:
+                    # New rows have no embedding yet; one backfill job at a time drains them all.
+                    queue.enqueue_tx(
+                        conn, "embeddings.backfill", {"table": "intake"}, dedupe_key="embeddings.backfill:intake"
+                    )
+            st.inserted += res["inserted"]
+            st.promoted += res["promoted"]
+            if self.minhasher is not None:
+                self._index_committed(survivors)
+            # Lost races (another worker inserted first) are simply no-ops above.
+            for it in survivors:
+                blooms[str(it.tenant_id)].add(it.raw_hash)
+
+    def _before_insert(self, items: List[IntakeItem]) -> List[IntakeItem]:
+        """
+        Hook between dedupe and INSERT (e.g. to set integrity_flags).
+        """
+        if self.minhasher is not None:
+            self._flag_near_duplicates(items)
+        return items
+
+    def _flag_near_duplicates(self, items: List[IntakeItem]) -> None:
+        cfg = self.near_dup
+        by_tenant: Dict[str, List[Any]] = {}
+        for it in items:
+            sig = self.minhasher.signature(normalize_text(it.raw_text))
+            if sig is not None:  # too short to judge
+                by_tenant.setdefault(str(it.tenant_id), []).append((it, sig))
+
+        for tenant_id, signed in by_tenant.items():
+            ti = tenant_index(self.engine, tenant_id, cfg)
+            # Originals of this batch: copies later in the batch must match them, but the
+            # shared index only gets them once their rows are committed (_index_committed).
+            local = LshIndex(ti.index.num_perm, ti.index.bands)
+            with ti.lock:
+                for it, sig in signed:
+                    match = ti.index.query(sig, cfg.threshold)
+                    local_match = local.query(sig, cfg.threshold)
+                    if local_match is not None and (match is None or local_match[1] > match[1]):
+                        match = local_match
+                    if match is None:
+                        local.add(it.raw_hash, sig)
+                        it.minhash = signature_bytes(sig)
+                        continue
+                    self.stats.near_duplicates += 1
+                    it.integrity_flags = dict(it.integrity_flags or {})
+                    it.integrity_flags["near_duplicate_of"] = match[0]
+                    it.integrity_flags["near_duplicate_similarity"] = round(match[1], 3)
+                    if cfg.hold:
+                        it.integrity_flags["hold"] = True
+
+
+    def _index_committed(self, items: List[IntakeItem]) -> None:
+        """
+        Add the committed originals (the items that got a signature) to the
+        shared per-tenant indexes. Never before commit: a rolled-back batch
+        would leave keys that later copies point near_duplicate_of at.
+        """
+        by_tenant: Dict[str, List[IntakeItem]] = {}
+        for it in items:
+            if it.minhash is not None:
+                by_tenant.setdefault(str(it.tenant_id), []).append(it)
+        for tenant_id, signed in by_tenant.items():
+            ti = tenant_index(self.engine, tenant_id, self.near_dup)
+            with ti.lock:
+                for it in signed:
+                    ti.index.add(it.raw_hash, signature_from_bytes(it.minhash))
+
+
+# ----------------------------
+# Sources
+# ----------------------------
+
+def iter_ndjson_items(path: str, tenant_id: str, source_id: Optional[str] = None) -> Iterator[IntakeItem]:
+    """
+    One JSON object per line: {"raw_text", "title"?, "source_url"?, "published_at"?}.
+    Streamed: the file is never loaded whole.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            obj = json.loads(line)
+            yield IntakeItem(
+                tenant_id=tenant_id,
+                source_id=source_id,
+                raw_text=obj.get("raw_text") or "",
+                title=obj.get("title"),
+                source_url=obj.get("source_url"),
+                published_at=obj.get("published_at"),
+            )
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Ingest an NDJSON file into intake_items (+ promote to content_items)")
+    ap.add_argument("--tenant-id", required=True)
+    ap.add_argument("--file", required=True)
+    ap.add_argument("--source-id", default=None)
+    ap.add_argument("--batch", type=int, default=500)
+    args = ap.parse_args()
+
+    from worker.db import get_engine
+
+    logging.basicConfig(level=logging.INFO)
+    stats = IntakePipeline(get_engine(), batch_size=args.batch).run(
+        iter_ndjson_items(args.file, args.tenant_id, args.source_id)
+    )
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Job handler registry.
+
+    @job("kind")
+    def handle(payload: dict, ctx: JobContext) -> None: ...
+
+Handlers run on pool threads or in child processes (WORKER_MODE), so they
+must be module-level functions, must not share state with the dispatcher,
+and should be idempotent: a job can run more than once (retry after a
+failure, or a lease that expired mid-run). Raising marks the attempt
+failed; it is retried with backoff until max_attempts.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+
+@dataclass(frozen=True)
+class JobContext:
+    id: int
+    kind: str
+    queue: str
+    attempts: int
+    max_attempts: int
+    tenant_id: Optional[str] = None
+
+
+JobHandler = Callable[[Dict[str, Any], JobContext], Any]
+
+HANDLERS: Dict[str, JobHandler] = {}
+
+
+def job(kind: str) -> Callable[[JobHandler], JobHandler]:
+    def register(fn: JobHandler) -> JobHandler:
+        if kind in HANDLERS and HANDLERS[kind] is not fn:
+            raise ValueError(f"Duplicate job handler: {kind}")
+        HANDLERS[kind] = fn
+        return fn
+
+    return register
+
+
+def run_job(kind: str, payload: Dict[str, Any], ctx: JobContext) -> Any:
+    """
+    Entry point submitted to the executor (picklable: resolves the handler
+    by name in whichever process runs it).
+    """
+    fn = HANDLERS.get(kind)
+    if fn is None:
+        raise LookupError(f"No handler for job kind: {kind}")
+    return fn(payload, ctx)
+
+
+# ----------------------------
+# Built-in jobs
+# ----------------------------
+
+@job("noop")
+def noop(payload: Dict[str, Any], ctx: JobContext) -> None:
+    """Does nothing (queue benchmarks / smoke tests)."""
+
+
+@job("sleep")
+def sleep(payload: Dict[str, Any], ctx: JobContext) -> None:
+    time.sleep(float(payload.get("seconds", 1)))
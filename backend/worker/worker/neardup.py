@@ -0,0 +1,333 @@
+"""
+Near-duplicate detection for intake: MinHash signatures + LSH band index.
+
+    sig = MinHasher().signature(normalize_text(raw_text))  # np.uint32[num_perm], None for short texts
+    ti = tenant_index(engine, tenant_id)      # per-tenant LSH index, loaded from intake_items.minhash
+    match = ti.index.query(sig, threshold)    # (raw_hash, similarity) or None
+
+Signatures: the normalized text (same normalization as raw_hash) is cut into
+word shingles; shingle hashes and all num_perm hash permutations are
+computed with NumPy over the whole text at once (multiply-shift hashing,
+uint64 wraparound), so there is no per-shingle Python loop after the
+words are hashed.
+
+LSH: the signature is split into `bands` bands of `rows` values; two items
+become candidates when any band matches exactly. With 16 x 8 the
+candidate probability is ~0.5 at Jaccard 0.7 and >0.98 at 0.85.
+Candidates are verified against the stored signatures (estimated Jaccard
+>= threshold). A lookup is `bands` dict probes + one small vector compare.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+log = logging.getLogger(__name__)
+
+_SEED = 0x5EED_D0C5
+# Shingles hashed per step: bounds the (chunk, num_perm) uint64 scratch matrix to 8 MiB at 128 permutations.
+_SHINGLE_CHUNK = 8192
+# Multipliers for folding shingle words / band rows into one 64-bit value (odd constants).
+_MIX = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0xD6E8FEB86659FD93,
+                 0xFF51AFD7ED558CCD, 0xC4CEB9FE1A85EC53, 0x94D049BB133111EB, 0xBF58476D1CE4E5B9],
+                dtype=np.uint64)
+
+
+@dataclass(frozen=True)
+class NearDupConfig:
+    enabled: bool = True
+    num_perm: int = 128
+    bands: int = 16
+    shingle: int = 3
+    min_tokens: int = 12
+    threshold: float = 0.8
+    hold: bool = True
+    window_days: int = 30
+
+    @classmethod
+    def from_env(cls) -> "NearDupConfig":
+        """
+        NEARDUP_ENABLED (1), NEARDUP_THRESHOLD (0.8), NEARDUP_SHINGLE (3 words),
+        NEARDUP_MIN_TOKENS (12), NEARDUP_HOLD (1), NEARDUP_WINDOW_DAYS (30)
+        """
+        return cls(
+            enabled=os.getenv("NEARDUP_ENABLED", "1") not in ("0", "false", "no"),
+            threshold=float(os.getenv("NEARDUP_THRESHOLD", "0.8")),
+            shingle=int(os.getenv("NEARDUP_SHINGLE", "3")),
+            min_tokens=int(os.getenv("NEARDUP_MIN_TOKENS", "12")),
+            hold=os.getenv("NEARDUP_HOLD", "1") not in ("0", "false", "no"),
+            window_days=int(os.getenv("NEARDUP_WINDOW_DAYS", "30")),
+        )
+
+
+# ----------------------------
+# MinHash
+# ----------------------------
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle: int = 3, min_tokens: int = 12, seed: int = _SEED) -> None:
+        if shingle > len(_MIX):
+            raise ValueError(f"shingle must be <= {len(_MIX)}")
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self.min_tokens = min_tokens
+        rng = np.random.default_rng(seed)
+        # h_i(x) = (a_i * x + b_i) mod 2^64 >> 32, a_i odd: a 2-universal multiply-shift family.
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, normalized: str) -> np.ndarray:
+        words = normalized.split()
+        if len(words) < max(self.min_tokens, self.shingle):
+            return np.empty(0, dtype=np.uint64)
+        w = np.fromiter((zlib.crc32(t.encode("utf-8")) for t in words), dtype=np.uint64, count=len(words))
+        n = len(words) - self.shingle + 1
+        h = np.zeros(n, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for j in range(self.shingle):
+                h ^= w[j:j + n] * _MIX[j]
+        return np.unique(h)
+
+    def signature_of_hashes(self, hashes: np.ndarray) -> Optional[np.ndarray]:
+        if hashes.size == 0:
+            return None
+        # (chunk, num_perm) at a time, folding the running min over shingles into the signature,
+        # so a very long text costs O(chunk * num_perm) memory instead of O(shingles * num_perm).
+        sig = np.full(self.num_perm, np.iinfo(np.uint64).max, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for i in range(0, hashes.size, _SHINGLE_CHUNK):
+                h = hashes[i:i + _SHINGLE_CHUNK]
+                perm = (h[:, None] * self._a[None, :] + self._b[None, :]) >> np.uint64(32)
+                np.minimum(sig, perm.min(axis=0), out=sig)
+        return sig.astype(np.uint32)
+
+    def signature(self, normalized: str) -> Optional[np.ndarray]:
+        return self.signature_of_hashes(self.shingle_hashes(normalized))
+
+
+def signature_bytes(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def signature_from_bytes(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype="<u4").astype(np.uint32)
+
+
+# ----------------------------
+# LSH index
+# ----------------------------
+
+class LshIndex:
+    def __init__(self, num_perm: int = 128, bands: int = 16) -> None:
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._row_mix = np.resize(_MIX, self.rows)
+        self._buckets: List[Dict[int, List[int]]] = [{} for _ in range(bands)]
+        self._sigs = np.zeros((1024, num_perm), dtype=np.uint32)
+        self._times = np.zeros(1024, dtype=np.float64)
+        self._keys: List[str] = []
+        self._known: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._known
+
+    def _band_keys(self, sig: np.ndarray) -> List[int]:
+        with np.errstate(over="ignore"):
+            return (sig.reshape(self.bands, self.rows).astype(np.uint64) * self._row_mix).sum(axis=1).tolist()
+
+    def add(self, key: str, sig: np.ndarray, at: Optional[float] = None) -> None:
+        """
+        `at`: when the item was ingested (epoch seconds, default now), for evict_before.
+        """
+        if key in self._known:
+            return
+        n = len(self._keys)
+        if n == self._sigs.shape[0]:
+            self._sigs = np.concatenate([self._sigs, np.zeros_like(self._sigs)])
+            self._times = np.concatenate([self._times, np.zeros_like(self._times)])
+        self._sigs[n] = sig
+        self._times[n] = time.time() if at is None else at
+        self._keys.append(key)
+        self._known.add(key)
+        for band, bk in zip(self._buckets, self._band_keys(sig)):
+            band.setdefault(bk, []).append(n)
+
+    def query(self, sig: np.ndarray, threshold: float) -> Optional[Tuple[str, float]]:
+        """
+        Most similar indexed key with estimated Jaccard >= threshold, or None.
+        """
+        cands: Set[int] = set()
+        for band, bk in zip(self._buckets, self._band_keys(sig)):
+            hit = band.get(bk)
+            if hit:
+                cands.update(hit)
+        if not cands:
+            return None
+        idx = np.fromiter(cands, dtype=np.int64, count=len(cands))
+        sims = (self._sigs[idx] == sig).mean(axis=1)
+        best = int(sims.argmax())
+        if sims[best] < threshold:
+            return None
+        return self._keys[int(idx[best])], float(sims[best])
+
+    def evict_before(self, cutoff: float) -> int:
+        """
+        Drop the entries added with `at` < cutoff (epoch seconds). Rebuilds the
+        arrays and buckets from the kept entries: O(n), so call it periodically.
+        Returns the number of entries dropped.
+        """
+        n = len(self._keys)
+        keep = np.flatnonzero(self._times[:n] >= cutoff)
+        dropped = n - len(keep)
+        if not dropped:
+            return 0
+        cap = max(1024, len(keep))
+        sigs = np.zeros((cap, self.num_perm), dtype=np.uint32)
+        sigs[: len(keep)] = self._sigs[keep]
+        times = np.zeros(cap, dtype=np.float64)
+        times[: len(keep)] = self._times[keep]
+        self._sigs, self._times = sigs, times
+        self._keys = [self._keys[i] for i in keep.tolist()]
+        self._known = set(self._keys)
+        self._buckets = [{} for _ in range(self.bands)]
+        for i in range(len(keep)):
+            for band, bk in zip(self._buckets, self._band_keys(sigs[i])):
+                band.setdefault(bk, []).append(i)
+        return dropped
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "items": len(self._keys),
+            "buckets": sum(len(b) for b in self._buckets),
+            "signature_bytes": len(self._keys) * self.num_perm * 4,
+        }
+
+
+# ----------------------------
+# SQL
+# ----------------------------
+
+def iter_signatures_tx(conn: Connection, tenant_id: Optional[str], since: datetime, chunk: int = 10000):
+    """
+    (tenant_id, raw_hash, minhash, ingested_at) of signed intake rows ingested after `since`;
+    all tenants when tenant_id is None. Streamed.
+    """
+    where = "minhash IS NOT NULL AND ingested_at > :since"
+    params: Dict[str, object] = {"since": since}
+    if tenant_id is not None:
+        where += " AND tenant_id = CAST(:tenant_id AS uuid)"
+        params["tenant_id"] = str(tenant_id)
+    result = conn.execution_options(stream_results=True, yield_per=chunk).execute(
+        text(f"""
+            SELECT tenant_id::text, raw_hash, minhash, ingested_at
+            FROM public.intake_items
+            WHERE {where}
+            ORDER BY ingested_at;
+        """),
+        params,
+    )
+    for row in result:
+        yield row[0], row[1], bytes(row[2]), row[3]
+
+
+# ----------------------------
+# Per-tenant indexes
+# ----------------------------
+
+# Rows commit out of ingested_at order (ingested_at is the tx start), so catch-up re-reads a little overlap.
+_CATCHUP_SLACK = timedelta(minutes=5)
+
+# Entries older than NEARDUP_WINDOW_DAYS are evicted at most this often (seconds) per tenant,
+# so an index holds at most the window plus this much.
+_EVICT_EVERY = 3600.0
+
+
+class TenantIndex:
+    def __init__(self, index: LshIndex, watermark: datetime) -> None:
+        self.index = index
+        self.watermark = watermark
+        self.lock = threading.Lock()
+        self.next_evict = time.time() + _EVICT_EVERY
+
+
+_INDEXES: Dict[str, TenantIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _window_start(config: NearDupConfig) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=config.window_days)
+
+
+def load_indexes(engine: Engine, config: Optional[NearDupConfig] = None, tenant_id: Optional[str] = None) -> int:
+    """
+    Build (or catch up) the LSH indexes from intake_items.minhash: all
+    tenants at worker start, one tenant on first use. Returns rows read.
+    """
+    config = config or NearDupConfig.from_env()
+    start = _window_start(config)
+    n = 0
+    with engine.connect() as conn:
+        for tid, key, blob, ingested_at in iter_signatures_tx(conn, tenant_id, start):
+            ti = _INDEXES.get(tid)
+            if ti is None:
+                with _INDEXES_LOCK:
+                    ti = _INDEXES.setdefault(tid, TenantIndex(LshIndex(config.num_perm, config.bands), start))
+            with ti.lock:
+                ti.index.add(key, signature_from_bytes(blob), ingested_at.timestamp())
+                ti.watermark = max(ti.watermark, ingested_at)
+            n += 1
+    if tenant_id is not None and str(tenant_id) not in _INDEXES:
+        with _INDEXES_LOCK:
+            _INDEXES.setdefault(str(tenant_id), TenantIndex(LshIndex(config.num_perm, config.bands), start))
+    log.info("neardup: loaded %d signatures (%s)", n, tenant_id or "all tenants")
+    return n
+
+
+def tenant_index(engine: Engine, tenant_id: str, config: Optional[NearDupConfig] = None) -> TenantIndex:
+    """
+    The tenant's index, caught up with rows other workers inserted since the
+    last call; entries that left the NEARDUP_WINDOW_DAYS window are evicted
+    every _EVICT_EVERY seconds, so a long-running worker does not grow without bound.
+    """
+    config = config or NearDupConfig.from_env()
+    tenant_id = str(tenant_id)
+    ti = _INDEXES.get(tenant_id)
+    if ti is None:
+        load_indexes(engine, config, tenant_id)
+        return _INDEXES[tenant_id]
+
+    since = ti.watermark - _CATCHUP_SLACK
+    with engine.connect() as conn:
+        rows = list(iter_signatures_tx(conn, tenant_id, since))
+    with ti.lock:
+        for _, key, blob, ingested_at in rows:
+            ti.index.add(key, signature_from_bytes(blob), ingested_at.timestamp())
+            ti.watermark = max(ti.watermark, ingested_at)
+        now = time.time()
+        if now >= ti.next_evict:
+            ti.next_evict = now + _EVICT_EVERY
+            dropped = ti.index.evict_before(_window_start(config).timestamp())
+            if dropped:
+                log.info("neardup: evicted %d signatures older than %d days (%s)", dropped, config.window_days, tenant_id)
+    return ti
+
+
+def index_stats() -> Dict[str, Dict[str, int]]:
+    return {tid: ti.index.stats() for tid, ti in list(_INDEXES.items())}
@@ -0,0 +1,106 @@
+"""
+Recurring maintenance of the monthly public.events partitions.
+
+The `events.ensure_partitions` job calls the API migration's
+public.ensure_events_partitions(months_ahead) (20261016_0005, made safe for
+rows already in events_default by 20261017_0016), then enqueues its next
+run EVENTS_PARTITIONS_EVERY_HOURS later. Each run's dedupe_key carries the
+period (of EVENTS_PARTITIONS_EVERY_HOURS) it is for, so the running job does
+not block its successor and `worker.run` can seed the chain on every start
+without piling up copies.
+Retention (detaching old partitions) stays a manual step:
+`python -m app.partitions --keep-months N` in backend/api.
+
+Run once by hand: `python -m worker.partitions`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from worker import queue
+from worker.jobs import JobContext, job
+
+JOB_KIND = "events.ensure_partitions"
+
+
+@dataclass
+class PartitionConfig:
+    months_ahead: int = 3
+    every_hours: float = 24.0
+    queue: str = "default"
+
+    @classmethod
+    def from_env(cls) -> "PartitionConfig":
+        """
+        EVENTS_PARTITIONS_MONTHS_AHEAD (3), EVENTS_PARTITIONS_EVERY_HOURS (24),
+        EVENTS_PARTITIONS_QUEUE (default)
+        """
+        return cls(
+            months_ahead=int(os.getenv("EVENTS_PARTITIONS_MONTHS_AHEAD", "3")),
+            every_hours=float(os.getenv("EVENTS_PARTITIONS_EVERY_HOURS", "24")),
+            queue=os.getenv("EVENTS_PARTITIONS_QUEUE", "default"),
+        )
+
+
+def ensure_partitions_tx(conn: Connection, months_ahead: int) -> List[str]:
+    rows = conn.execute(
+        text("SELECT public.ensure_events_partitions(CAST(:n AS int));"), {"n": int(months_ahead)}
+    ).scalars().all()
+    return list(rows)
+
+
+def schedule_tx(conn: Connection, config: PartitionConfig, delay_seconds: float = 0.0) -> int:
+    """
+    Enqueue the run due in `delay_seconds` (deduped per period). Returns 1 if enqueued.
+    """
+    period = int((time.time() + delay_seconds) // max(60.0, config.every_hours * 3600.0))
+    return queue.enqueue_tx(
+        conn,
+        JOB_KIND,
+        {"months_ahead": config.months_ahead},
+        queue=config.queue,
+        delay_seconds=delay_seconds,
+        dedupe_key=f"{JOB_KIND}:{period}",
+    )
+
+
+def seed(engine: Engine, config: PartitionConfig) -> int:
+    with engine.begin() as conn:
+        return schedule_tx(conn, config)
+
+
+@job(JOB_KIND)
+def ensure_partitions(payload: Dict[str, Any], ctx: JobContext) -> Dict[str, Any]:
+    from worker.db import get_engine
+
+    config = PartitionConfig.from_env()
+    with get_engine().begin() as conn:
+        names = ensure_partitions_tx(conn, int(payload.get("months_ahead", config.months_ahead)))
+        # Same transaction: the next run exists iff this one succeeded (a failure is retried instead).
+        schedule_tx(conn, config, delay_seconds=config.every_hours * 3600.0)
+    return {"partitions": names}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Create upcoming monthly partitions of public.events")
+    ap.add_argument("--months-ahead", type=int, default=None)
+    args = ap.parse_args()
+
+    from worker.db import get_engine
+
+    config = PartitionConfig.from_env()
+    with get_engine().begin() as conn:
+        names = ensure_partitions_tx(conn, args.months_ahead if args.months_ahead is not None else config.months_ahead)
+    print(f"partitions present: {', '.join(names)}")
+
+
+if __name__ == "__main__":
+    main()
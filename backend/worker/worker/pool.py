@@ -0,0 +1,253 @@
+"""
+Worker pool: one dispatcher loop + N executors (threads or processes).
+
+The dispatcher is the only part that talks to public.jobs:
+  - claims up to <free slots> jobs per round trip (batch claim, SKIP LOCKED)
+  - submits them to the executor
+  - acks finished jobs in one transaction per loop turn (done + retries)
+  - heartbeats leases of in-flight jobs every visibility_timeout / 3
+  - periodically re-queues jobs whose lease expired (crashed workers)
+
+Stop (SIGTERM / SIGINT or request_stop()) drains: no new claims, in-flight
+jobs finish and are acked, then the executor shuts down. A second SIGINT
+aborts immediately; leases of unfinished jobs then expire and they are
+retried elsewhere.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import signal
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy.engine import Engine
+
+from worker import queue
+from worker.jobs import JobContext, run_job
+
+log = logging.getLogger(__name__)
+
+MODES = ("thread", "process")
+
+
+@dataclass
+class PoolConfig:
+    concurrency: int = 4
+    mode: str = "thread"
+    queues: Tuple[str, ...] = ("default",)
+    batch_size: int = 0  # 0 => concurrency
+    visibility_timeout: float = 60.0
+    poll_interval: float = 0.05
+    max_poll_interval: float = 2.0
+    backoff_base: float = 5.0
+    backoff_cap: float = 600.0
+    reap_interval: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "PoolConfig":
+        """
+        WORKER_CONCURRENCY        (default 4)        parallel jobs
+        WORKER_MODE               (default thread)   thread | process (CPU-bound handlers)
+        WORKER_QUEUES             (default default)  comma-separated queue names
+        WORKER_BATCH_SIZE         (default = concurrency) max jobs per claim
+        WORKER_VISIBILITY_TIMEOUT (default 60)       lease seconds (heartbeated while running)
+        WORKER_POLL_INTERVAL      (default 0.05)     first idle sleep; doubles up to WORKER_MAX_POLL_INTERVAL (2)
+        WORKER_BACKOFF_BASE / WORKER_BACKOFF_CAP (default 5 / 600) retry backoff seconds
+        """
+        mode = os.getenv("WORKER_MODE", "thread").strip().lower()
+        if mode not in MODES:
+            raise ValueError(f"WORKER_MODE must be one of {MODES}")
+        queues = tuple(q.strip() for q in os.getenv("WORKER_QUEUES", "default").split(",") if q.strip())
+        return cls(
+            concurrency=int(os.getenv("WORKER_CONCURRENCY", "4")),
+            mode=mode,
+            queues=queues or ("default",),
+            batch_size=int(os.getenv("WORKER_BATCH_SIZE", "0")),
+            visibility_timeout=float(os.getenv("WORKER_VISIBILITY_TIMEOUT", "60")),
+            poll_interval=float(os.getenv("WORKER_POLL_INTERVAL", "0.05")),
+            max_poll_interval=float(os.getenv("WORKER_MAX_POLL_INTERVAL", "2")),
+            backoff_base=float(os.getenv("WORKER_BACKOFF_BASE", "5")),
+            backoff_cap=float(os.getenv("WORKER_BACKOFF_CAP", "600")),
+        )
+
+
+@dataclass
+class PoolStats:
+    claimed: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    claims: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    def as_dict(self) -> Dict[str, Any]:
+        elapsed = max(1e-9, time.monotonic() - self.started_at)
+        return {
+            "claimed": self.claimed,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "claims": self.claims,
+            "elapsed_s": round(elapsed, 3),
+            "jobs_per_s": round((self.succeeded + self.failed) / elapsed, 1),
+        }
+
+
+def _init_child() -> None:
+    # Forked children must not reuse the parent's pooled connections.
+    from worker.db import get_engine
+
+    get_engine.cache_clear()
+
+
+class WorkerPool:
+    def __init__(self, engine: Engine, config: Optional[PoolConfig] = None, worker_id: Optional[str] = None) -> None:
+        self.engine = engine
+        self.config = config or PoolConfig()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.stats = PoolStats()
+        self._stop = threading.Event()
+
+    def request_stop(self) -> None:
+        self._stop.set()
+
+    # ----------------------------
+    # DB round trips
+    # ----------------------------
+
+    def _claim(self, n: int) -> List[Dict[str, Any]]:
+        with self.engine.begin() as conn:
+            jobs = queue.claim_tx(conn, self.worker_id, self.config.queues, n, self.config.visibility_timeout)
+        self.stats.claims += 1
+        self.stats.claimed += len(jobs)
+        return jobs
+
+    def _ack(self, ok_ids: List[int], failures: List[Dict[str, Any]]) -> None:
+        if not ok_ids and not failures:
+            return
+        with self.engine.begin() as conn:
+            queue.complete_tx(conn, self.worker_id, ok_ids)
+            queue.fail_tx(
+                conn, self.worker_id, failures, backoff_base=self.config.backoff_base, backoff_cap=self.config.backoff_cap
+            )
+        self.stats.succeeded += len(ok_ids)
+        self.stats.failed += len(failures)
+
+    def _heartbeat(self, job_ids: List[int]) -> None:
+        with self.engine.begin() as conn:
+            queue.extend_leases_tx(conn, self.worker_id, job_ids, self.config.visibility_timeout)
+
+    def _reap(self) -> None:
+        with self.engine.begin() as conn:
+            n = queue.reap_expired_tx(conn)
+        if n:
+            log.warning("re-queued %d jobs with expired leases", n)
+
+    # ----------------------------
+    # Loop
+    # ----------------------------
+
+    def _make_executor(self) -> Executor:
+        if self.config.mode == "process":
+            return ProcessPoolExecutor(max_workers=self.config.concurrency, initializer=_init_child)
+        return ThreadPoolExecutor(max_workers=self.config.concurrency, thread_name_prefix="job")
+
+    @staticmethod
+    def _collect(done: List[Tuple[Future, Dict[str, Any]]]) -> Tuple[List[int], List[Dict[str, Any]]]:
+        ok_ids: List[int] = []
+        failures: List[Dict[str, Any]] = []
+        for fut, j in done:
+            exc = fut.exception()
+            if exc is None:
+                ok_ids.append(j["id"])
+            else:
+                log.warning("job %s (%s) attempt %s failed: %r", j["id"], j["kind"], j["attempts"], exc)
+                failures.append(
+                    {"id": j["id"], "attempts": j["attempts"], "max_attempts": j["max_attempts"], "error": repr(exc)}
+                )
+        return ok_ids, failures
+
+    def run(self, stop_when_idle: bool = False) -> Dict[str, Any]:
+        """
+        Run until stopped (or, with stop_when_idle, until no job is ready and
+        nothing is in flight). Returns stats.
+        """
+        cfg = self.config
+        batch = cfg.batch_size or cfg.concurrency
+        inflight: Dict[Future, Dict[str, Any]] = {}
+        idle_sleep = cfg.poll_interval
+        last_heartbeat = last_reap = time.monotonic()
+
+        executor = self._make_executor()
+        try:
+            while not self._stop.is_set():
+                free = cfg.concurrency - len(inflight)
+                claimed: List[Dict[str, Any]] = []
+                if free > 0:
+                    claimed = self._claim(min(free, batch))
+                    for j in claimed:
+                        ctx = JobContext(
+                            id=j["id"], kind=j["kind"], queue=j["queue"], attempts=j["attempts"],
+                            max_attempts=j["max_attempts"], tenant_id=j["tenant_id"],
+                        )
+                        inflight[executor.submit(run_job, j["kind"], j["payload"], ctx)] = j
+
+                if claimed or free <= 0:
+                    idle_sleep = cfg.poll_interval
+                else:
+                    # Nothing ready: back off so an idle pool does not hammer the DB.
+                    idle_sleep = min(cfg.max_poll_interval, idle_sleep * 2)
+
+                if not inflight:
+                    if stop_when_idle:
+                        break
+                    self._stop.wait(idle_sleep)
+                    continue
+
+                # Wake on the first completion; with free slots, also to poll for new jobs.
+                saturated = len(inflight) >= cfg.concurrency
+                done, _ = wait(
+                    list(inflight),
+                    timeout=cfg.max_poll_interval if saturated else idle_sleep,
+                    return_when=FIRST_COMPLETED,
+                )
+                self._ack(*self._collect([(f, inflight.pop(f)) for f in done]))
+
+                now = time.monotonic()
+                if inflight and now - last_heartbeat >= cfg.visibility_timeout / 3:
+                    self._heartbeat([j["id"] for j in inflight.values()])
+                    last_heartbeat = now
+                if now - last_reap >= cfg.reap_interval:
+                    self._reap()
+                    last_reap = now
+
+            # Drain: finish and ack what is already running.
+            if inflight:
+                log.info("draining %d in-flight jobs", len(inflight))
+            while inflight:
+                done, _ = wait(list(inflight), timeout=cfg.visibility_timeout / 3, return_when=FIRST_COMPLETED)
+                self._ack(*self._collect([(f, inflight.pop(f)) for f in done]))
+                if inflight:
+                    self._heartbeat([j["id"] for j in inflight.values()])
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return self.stats.as_dict()
+
+    def install_signal_handlers(self) -> None:
+        """
+        First SIGTERM/SIGINT: graceful drain. Second SIGINT: default behaviour (abort).
+        """
+
+        def handle(signum: int, _frame: Any) -> None:
+            log.info("signal %s: draining (send SIGINT again to abort)", signum)
+            self.request_stop()
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+
+        signal.signal(signal.SIGTERM, handle)
+        signal.signal(signal.SIGINT, handle)
@@ -0,0 +1,260 @@
+"""
+Job queue SQL (table public.jobs, migration backend/api 20261016_0007_jobs).
+
+Every function takes a Connection and runs in the caller's transaction;
+the pool wraps each call in `engine.begin()`.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+def enqueue_many_tx(conn: Connection, jobs: Sequence[Dict[str, Any]]) -> int:
+    """
+    Insert jobs with one statement. Each job:
+      {"kind": str, "payload"?: dict, "queue"?: str, "priority"?: int,
+       "tenant_id"?: uuid, "max_attempts"?: int, "delay_seconds"?: float, "dedupe_key"?: str}
+    Jobs whose dedupe_key already has a queued/running job are skipped.
+    Returns the number inserted.
+    """
+    if not jobs:
+        return 0
+
+    sql = text("""
+        INSERT INTO public.jobs (tenant_id, queue, kind, payload, priority, max_attempts, run_at, dedupe_key)
+        SELECT
+            t.tenant_id, t.queue, t.kind, t.payload, t.priority, t.max_attempts,
+            now() + make_interval(secs => t.delay), t.dedupe_key
+        FROM unnest(
+            CAST(:tenant_ids AS uuid[]),
+            CAST(:queues AS text[]),
+            CAST(:kinds AS text[]),
+            CAST(:payloads AS jsonb[]),
+            CAST(:priorities AS smallint[]),
+            CAST(:max_attempts AS int[]),
+            CAST(:delays AS float8[]),
+            CAST(:dedupe_keys AS text[])
+        ) AS t(tenant_id, queue, kind, payload, priority, max_attempts, delay, dedupe_key)
+        ON CONFLICT (queue, dedupe_key) WHERE dedupe_key IS NOT NULL AND status IN ('queued', 'running')
+        DO NOTHING;
+    """)
+
+    res = conn.execute(
+        sql,
+        {
+            "tenant_ids": [str(j["tenant_id"]) if j.get("tenant_id") else None for j in jobs],
+            "queues": [j.get("queue") or "default" for j in jobs],
+            "kinds": [j["kind"] for j in jobs],
+            "payloads": [json.dumps(j.get("payload") or {}) for j in jobs],
+            "priorities": [int(j.get("priority", 0)) for j in jobs],
+            "max_attempts": [int(j.get("max_attempts", 5)) for j in jobs],
+            "delays": [float(j.get("delay_seconds", 0)) for j in jobs],
+            "dedupe_keys": [j.get("dedupe_key") for j in jobs],
+        },
+    )
+    return res.rowcount
+
+
+def enqueue_tx(conn: Connection, kind: str, payload: Optional[Dict[str, Any]] = None, **opts: Any) -> int:
+    return enqueue_many_tx(conn, [{"kind": kind, "payload": payload, **opts}])
+
+
+def claim_tx(
+    conn: Connection,
+    worker_id: str,
+    queues: Sequence[str],
+    limit: int,
+    visibility_timeout: float,
+) -> List[Dict[str, Any]]:
+    """
+    Claim up to `limit` ready jobs (highest priority, then oldest run_at).
+    SKIP LOCKED lets concurrent claimers take disjoint batches without
+    waiting on each other. Claimed jobs are leased for `visibility_timeout`
+    seconds; `attempts` counts claims.
+    """
+    sql = text("""
+        WITH c AS (
+            SELECT id
+            FROM public.jobs
+            WHERE status = 'queued'
+              AND queue = ANY(CAST(:queues AS text[]))
+              AND run_at <= now()
+            ORDER BY priority DESC, run_at, id
+            LIMIT :limit
+            FOR UPDATE SKIP LOCKED
+        )
+        UPDATE public.jobs j
+        SET status = 'running',
+            attempts = j.attempts + 1,
+            locked_by = :worker_id,
+            locked_until = now() + make_interval(secs => CAST(:vt AS float8)),
+            updated_at = now()
+        FROM c
+        WHERE j.id = c.id
+        RETURNING j.id, j.queue, j.kind, j.payload, j.priority, j.attempts, j.max_attempts,
+                  j.tenant_id::text AS tenant_id;
+    """)
+
+    rows = conn.execute(
+        sql,
+        {"queues": list(queues), "limit": int(limit), "worker_id": worker_id, "vt": float(visibility_timeout)},
+    ).mappings().all()
+    # RETURNING order is not guaranteed; run in claim order.
+    return sorted((dict(r) for r in rows), key=lambda r: (-r["priority"], r["id"]))
+
+
+def complete_tx(conn: Connection, worker_id: str, job_ids: Iterable[int]) -> int:
+    """
+    Mark jobs done. Fenced on locked_by: a job whose lease expired and was
+    re-claimed by another worker is not touched.
+    """
+    ids = list(job_ids)
+    if not ids:
+        return 0
+    res = conn.execute(
+        text("""
+            UPDATE public.jobs
+            SET status = 'done', locked_until = NULL, finished_at = now(), updated_at = now(), last_error = NULL
+            WHERE id = ANY(CAST(:ids AS bigint[]))
+              AND status = 'running'
+              AND locked_by = :worker_id;
+        """),
+        {"ids": ids, "worker_id": worker_id},
+    )
+    return res.rowcount
+
+
+def backoff_seconds(attempts: int, base: float, cap: float) -> float:
+    """
+    Exponential backoff with full jitter: uniform(0, min(cap, base * 2^(attempts-1))).
+    """
+    return random.uniform(0, min(cap, base * (2 ** max(0, attempts - 1))))
+
+
+def fail_tx(
+    conn: Connection,
+    worker_id: str,
+    failures: Sequence[Dict[str, Any]],
+    backoff_base: float = 5.0,
+    backoff_cap: float = 600.0,
+) -> int:
+    """
+    failures: [{"id", "attempts", "max_attempts", "error"}, ...]
+    Re-queues with backoff, or marks failed once attempts are used up.
+    """
+    if not failures:
+        return 0
+
+    delays = [
+        None if f["attempts"] >= f["max_attempts"] else backoff_seconds(f["attempts"], backoff_base, backoff_cap)
+        for f in failures
+    ]
+    res = conn.execute(
+        text("""
+            UPDATE public.jobs j
+            SET status = CASE WHEN f.delay IS NULL THEN 'failed' ELSE 'queued' END,
+                run_at = CASE WHEN f.delay IS NULL THEN j.run_at ELSE now() + make_interval(secs => f.delay) END,
+                finished_at = CASE WHEN f.delay IS NULL THEN now() END,
+                locked_until = NULL,
+                locked_by = NULL,
+                last_error = f.error,
+                updated_at = now()
+            FROM unnest(
+                CAST(:ids AS bigint[]), CAST(:delays AS float8[]), CAST(:errors AS text[])
+            ) AS f(id, delay, error)
+            WHERE j.id = f.id
+              AND j.status = 'running'
+              AND j.locked_by = :worker_id;
+        """),
+        {
+            "ids": [int(f["id"]) for f in failures],
+            "delays": delays,
+            "errors": [str(f.get("error") or "")[:4000] for f in failures],
+            "worker_id": worker_id,
+        },
+    )
+    return res.rowcount
+
+
+def extend_leases_tx(conn: Connection, worker_id: str, job_ids: Iterable[int], visibility_timeout: float) -> int:
+    """
+    Heartbeat for long-running jobs: push locked_until out again.
+    """
+    ids = list(job_ids)
+    if not ids:
+        return 0
+    res = conn.execute(
+        text("""
+            UPDATE public.jobs
+            SET locked_until = now() + make_interval(secs => CAST(:vt AS float8))
+            WHERE id = ANY(CAST(:ids AS bigint[]))
+              AND status = 'running'
+              AND locked_by = :worker_id;
+        """),
+        {"ids": ids, "worker_id": worker_id, "vt": float(visibility_timeout)},
+    )
+    return res.rowcount
+
+
+def reap_expired_tx(conn: Connection, limit: int = 1000) -> int:
+    """
+    Jobs whose lease expired (worker crashed / hung): back to queued, or
+    failed when out of attempts. Safe to run from every worker.
+    """
+    res = conn.execute(
+        text("""
+            WITH x AS (
+                SELECT id
+                FROM public.jobs
+                WHERE status = 'running' AND locked_until < now()
+                LIMIT :limit
+                FOR UPDATE SKIP LOCKED
+            )
+            UPDATE public.jobs j
+            SET status = CASE WHEN j.attempts >= j.max_attempts THEN 'failed' ELSE 'queued' END,
+                finished_at = CASE WHEN j.attempts >= j.max_attempts THEN now() END,
+                last_error = COALESCE(j.last_error, 'lease expired'),
+                locked_until = NULL,
+                locked_by = NULL,
+                run_at = now(),
+                updated_at = now()
+            FROM x
+            WHERE j.id = x.id;
+        """),
+        {"limit": int(limit)},
+    )
+    return res.rowcount
+
+
+def purge_finished_tx(conn: Connection, older_than_days: float = 7, limit: int = 10000) -> int:
+    res = conn.execute(
+        text("""
+            DELETE FROM public.jobs
+            WHERE id IN (
+                SELECT id FROM public.jobs
+                WHERE status IN ('done', 'failed')
+                  AND finished_at < now() - make_interval(secs => CAST(:secs AS float8))
+                LIMIT :limit
+            );
+        """),
+        {"secs": float(older_than_days) * 86400.0, "limit": int(limit)},
+    )
+    return res.rowcount
+
+
+def queue_stats_tx(conn: Connection) -> List[Dict[str, Any]]:
+    rows = conn.execute(
+        text("""
+            SELECT queue, status, COUNT(*)::bigint AS n
+            FROM public.jobs
+            GROUP BY queue, status
+            ORDER BY queue, status;
+        """)
+    ).mappings().all()
+    return [dict(r) for r in rows]
@@ -1,18 +1,53 @@
-"""Minimal worker entrypoint.
+"""Worker entrypoint.
 
-In MVP we keep this simple and deterministic. Later we will wire:
-- Redis queue
-- LangGraph workflows
-- structured logging
+Runs the Postgres-backed job pool (worker.pool) against DATABASE_URL.
+Handlers are registered in worker.jobs; configuration comes from WORKER_*
+env vars (see PoolConfig.from_env). With REFRESH_SCHEDULER=1 the refresh
+scheduler (worker.scheduler) runs on a thread next to the pool. On start it
+seeds the recurring events.ensure_partitions job (worker.partitions).
 """
 
-import time
+import logging
+import os
+import threading
+
+from worker import embed, fetcher, jobs, neardup, partitions, scheduler  # noqa: F401  (registers handlers)
+from worker.db import get_engine
+from worker.pool import PoolConfig, WorkerPool
 
 
 def main() -> None:
-    print("Worker started (placeholder loop).")
-    while True:
-        time.sleep(10)
+    logging.basicConfig(
+        level=os.getenv("WORKER_LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+    )
+    config = PoolConfig.from_env()
+    if neardup.NearDupConfig.from_env().enabled:
+        # Before the pool starts, so process-mode workers fork with the indexes loaded.
+        neardup.load_indexes(get_engine())
+    # Deduped: every worker may seed it, one run per period is queued.
+    partitions.seed(get_engine(), partitions.PartitionConfig.from_env())
+    pool = WorkerPool(get_engine(), config)
+    pool.install_signal_handlers()
+
+    logging.getLogger(__name__).info(
+        "worker %s started: %d %s workers on queues %s",
+        pool.worker_id, config.concurrency, config.mode, ",".join(config.queues),
+    )
+    refresh_cfg = scheduler.RefreshConfig.from_env()
+    stop_scheduler = threading.Event()
+    if refresh_cfg.enabled:
+        # Every worker may run one; the advisory lock lets a single one tick.
+        threading.Thread(
+            target=scheduler.RefreshScheduler(get_engine(), refresh_cfg).run,
+            args=(stop_scheduler,),
+            name="refresh-scheduler",
+            daemon=True,
+        ).start()
+
+    stats = pool.run()
+    stop_scheduler.set()
+    logging.getLogger(__name__).info("worker stopped: %s", stats)
 
 
 if __name__ == "__main__":
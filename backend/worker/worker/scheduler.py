@@ -0,0 +1,555 @@
+"""
+Refresh scheduler for PUBLISHED content.
+
+Every published item is due for a refresh REFRESH_INTERVAL_HOURS (per
+risk tier) after it was published, and again every interval after that.
+Deadlines live in memory in a hashed timing wheel (`RefreshWheel`): one
+slot per tick, entries are 4-byte handles into parallel arrays (content id,
+tenant, deadline, interval, slot), about 150 bytes per item including the
+id index, so millions of items fit in a few hundred MB and a tick only
+touches the slots it advances over.
+
+One scheduler runs per database: a session advisory lock elects it, and
+every tick runs on that lock's connection and re-takes the same lock as a
+transaction lock first (a fence: if the session, and with it the lock, was
+lost, the tick aborts instead of racing a new leader). Each tick it
+  1. applies publish / unpublish transitions since the last poll, read from
+     public.events through a small partial index (migration
+     20261016_0014_refresh_scheduler); PUBLISHED schedules an item, leaving
+     PUBLISHED drops it
+  2. advances the wheel to now and enqueues the due items as
+     `content.refresh` jobs of up to REFRESH_BATCH ids per tenant
+  3. stores `last_tick_at` in public.scheduler_checkpoints, in the same
+     transaction as the jobs
+content_items is never scanned per tick.
+
+Recovery needs nothing but that checkpoint: on start, the wheel is rebuilt
+once (streamed) from the PUBLISHED content_items (partial index from
+migration 20261017_0015_published_items_index), the same items the event
+poll tracks, each anchored at updated_at (the transition into PUBLISHED)
+with its next deadline after `last_tick_at`. Deadlines missed while no scheduler ran fire on the first
+tick, each item once. The event poll starts at the snapshot's time, minus
+some overlap for late commits (applying an event twice is harmless).
+
+The `content.refresh` job writes a `content.refresh_due` event for each item
+that is still PUBLISHED. The API's event history and SSE stream show it.
+
+Run: `python -m worker.scheduler` or REFRESH_SCHEDULER=1 in `python -m worker.run`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+from worker import queue
+from worker.jobs import JobContext, job
+
+log = logging.getLogger(__name__)
+
+CHECKPOINT_NAME = "refresh"
+_LOCK_KEY = "worker.scheduler.refresh"
+_MASK64 = (1 << 64) - 1
+
+
+@dataclass
+class RefreshConfig:
+    enabled: bool = False
+    # seconds, indexed by risk tier - 1
+    intervals: Tuple[float, ...] = (720 * 3600.0, 336 * 3600.0, 168 * 3600.0)
+    tick_seconds: float = 60.0
+    slots: int = 4096
+    batch: int = 500
+    overlap_seconds: float = 300.0
+    queue: str = "default"
+
+    @classmethod
+    def from_env(cls) -> "RefreshConfig":
+        """
+        REFRESH_SCHEDULER (0), REFRESH_INTERVAL_HOURS ("720,336,168": tiers 1,2,3),
+        REFRESH_TICK_SECONDS (60), REFRESH_WHEEL_SLOTS (4096), REFRESH_BATCH (500 ids per job),
+        REFRESH_EVENTS_OVERLAP (300s), REFRESH_QUEUE (default)
+        """
+        hours = [float(h) for h in os.getenv("REFRESH_INTERVAL_HOURS", "720,336,168").split(",") if h.strip()]
+        return cls(
+            enabled=os.getenv("REFRESH_SCHEDULER", "0").lower() in ("1", "true", "yes"),
+            intervals=tuple(h * 3600.0 for h in hours) or cls.intervals,
+            tick_seconds=float(os.getenv("REFRESH_TICK_SECONDS", "60")),
+            slots=int(os.getenv("REFRESH_WHEEL_SLOTS", "4096")),
+            batch=int(os.getenv("REFRESH_BATCH", "500")),
+            overlap_seconds=float(os.getenv("REFRESH_EVENTS_OVERLAP", "300")),
+            queue=os.getenv("REFRESH_QUEUE", "default"),
+        )
+
+    def interval_for(self, risk_tier: Optional[int]) -> float:
+        i = min(max(int(risk_tier or 1), 1), len(self.intervals)) - 1
+        return self.intervals[i]
+
+
+def next_due(anchor: float, interval: float, after: float) -> float:
+    """
+    First anchor + k * interval (k >= 1) strictly after `after`.
+    """
+    if after < anchor:
+        return anchor + interval
+    return anchor + interval * (int((after - anchor) // interval) + 1)
+
+
+# ----------------------------
+# Timing wheel
+# ----------------------------
+
+class RefreshWheel:
+    """
+    Hashed timing wheel of periodic deadlines keyed by content id.
+
+    Slot s holds handles whose deadline tick is s modulo `slots` (overdue
+    ones go to the next slot); an entry whose deadline is more than one
+    revolution away stays in its slot until its round comes. Rescheduling or
+    removing an item does not search the slots: the old entry goes stale
+    (its handle now records another slot, or is free) and is dropped when
+    its slot is next advanced over.
+    """
+
+    def __init__(self, tick_seconds: float = 60.0, slots: int = 4096) -> None:
+        self.tick_seconds = float(tick_seconds)
+        self.nslots = int(slots)
+        self._slots: List[array] = [array("I") for _ in range(self.nslots)]
+        # per handle
+        self._hi = array("Q")
+        self._lo = array("Q")
+        self._tenant = array("I")
+        self._due = array("q")  # epoch seconds; 0 = free handle
+        self._interval = array("I")  # seconds
+        self._slot = array("I")  # slot of the live entry
+        self._free: List[int] = []
+        self._index: Dict[int, int] = {}  # content id (UUID.int) -> handle
+        self._tenants: List[str] = []
+        self._tenant_ids: Dict[str, int] = {}
+        self._tick: Optional[int] = None  # last tick advanced over
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _tick_of(self, t: float) -> int:
+        return int(t // self.tick_seconds)
+
+    def start(self, at: float) -> None:
+        """
+        Mark everything up to `at` as already advanced over.
+        """
+        self._tick = self._tick_of(at)
+
+    def _place(self, h: int) -> None:
+        tick = self._tick_of(self._due[h])
+        if self._tick is not None and tick <= self._tick:
+            tick = self._tick + 1  # overdue: fire on the next advance
+        s = tick % self.nslots
+        self._slot[h] = s
+        self._slots[s].append(h)
+
+    def schedule(self, tenant_id: str, content_id: str, due: float, interval: float) -> None:
+        key = UUID(content_id).int
+        h = self._index.get(key)
+        due_s = max(1, int(due))
+        if h is not None:
+            self._interval[h] = max(1, int(interval))
+            if self._due[h] == due_s:
+                return
+            self._due[h] = due_s
+            self._place(h)
+            return
+
+        t = self._tenant_ids.get(tenant_id)
+        if t is None:
+            t = self._tenant_ids[tenant_id] = len(self._tenants)
+            self._tenants.append(tenant_id)
+        if self._free:
+            h = self._free.pop()
+            self._hi[h], self._lo[h], self._tenant[h] = key >> 64, key & _MASK64, t
+            self._due[h], self._interval[h] = due_s, max(1, int(interval))
+        else:
+            h = len(self._due)
+            self._hi.append(key >> 64)
+            self._lo.append(key & _MASK64)
+            self._tenant.append(t)
+            self._due.append(due_s)
+            self._interval.append(max(1, int(interval)))
+            self._slot.append(0)
+        self._index[key] = h
+        self._place(h)
+
+    def remove(self, content_id: str) -> bool:
+        h = self._index.pop(UUID(content_id).int, None)
+        if h is None:
+            return False
+        self._due[h] = 0
+        self._free.append(h)
+        return True
+
+    def due_of(self, content_id: str) -> Optional[int]:
+        h = self._index.get(UUID(content_id).int)
+        return None if h is None else self._due[h]
+
+    def advance(self, now: float) -> Iterator[Tuple[str, str]]:
+        """
+        Yield (tenant_id, content_id) of every item due at `now` and
+        reschedule it one or more intervals later (missed periods are
+        skipped, not replayed).
+        """
+        now_tick = self._tick_of(now)
+        if self._tick is None:
+            self._tick = now_tick - 1
+        if now_tick <= self._tick:
+            return
+        first = self._tick + 1
+        ticks = range(first, now_tick + 1) if now_tick - first < self.nslots else range(first, first + self.nslots)
+        # Placements made while firing must land after the slots being advanced over.
+        self._tick = now_tick
+        now_s = int(now)
+        due, interval, slot_of = self._due, self._interval, self._slot
+
+        for tick in ticks:
+            s = tick % self.nslots
+            entries, self._slots[s] = self._slots[s], array("I")
+            keep = self._slots[s]
+            seen = set()
+            for h in entries:
+                d = due[h]
+                if d == 0 or h in seen or slot_of[h] != s:
+                    continue  # freed, duplicate or stale
+                seen.add(h)
+                if d > now_s:
+                    keep.append(h)  # a later revolution
+                    continue
+                key = (self._hi[h] << 64) | self._lo[h]
+                yield self._tenants[self._tenant[h]], str(UUID(int=key))
+                due[h] = d + interval[h] * ((now_s - d) // interval[h] + 1)
+                self._place(h)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "items": len(self._index),
+            "handles": len(self._due),
+            "slot_entries": sum(len(s) for s in self._slots),
+            "tenants": len(self._tenants),
+            "tick": self._tick,
+        }
+
+
+# ----------------------------
+# SQL
+# ----------------------------
+
+_RISK_INT = """CASE c.risk::text WHEN 'TIER_3' THEN 3 WHEN 'TIER_2' THEN 2 ELSE 1 END"""
+
+
+def load_checkpoint_tx(conn: Connection, name: str = CHECKPOINT_NAME) -> Optional[datetime]:
+    return conn.execute(
+        text("SELECT last_tick_at FROM public.scheduler_checkpoints WHERE name = :name;"),
+        {"name": name},
+    ).scalar_one_or_none()
+
+
+def save_checkpoint_tx(conn: Connection, at: datetime, name: str = CHECKPOINT_NAME) -> None:
+    conn.execute(
+        text("""
+            INSERT INTO public.scheduler_checkpoints (name, last_tick_at, updated_at)
+            VALUES (:name, :at, now())
+            ON CONFLICT (name) DO UPDATE
+            SET last_tick_at = GREATEST(scheduler_checkpoints.last_tick_at, EXCLUDED.last_tick_at),
+                updated_at = now();
+        """),
+        {"name": name, "at": at},
+    )
+
+
+def iter_published_tx(conn: Connection, chunk: int = 10000) -> Iterator[Tuple[str, str, datetime, int]]:
+    """
+    (tenant_id, content_id, published since, risk_tier) of every PUBLISHED
+    item. Streamed from idx_content_items_published; updated_at is only
+    bumped by transitions, so it is when the item entered PUBLISHED.
+    """
+    # Statement-level options: conn may be the long-lived lock connection.
+    result = conn.execute(
+        text(f"""
+            SELECT c.tenant_id::text, c.id::text, c.updated_at, {_RISK_INT}
+            FROM public.content_items c
+            WHERE c.state = 'PUBLISHED';
+        """).execution_options(stream_results=True, yield_per=chunk)
+    )
+    for row in result:
+        yield row[0], row[1], row[2], row[3]
+
+
+def publish_changes_since_tx(
+    conn: Connection, since: datetime, after_id: Optional[str] = None, limit: int = 10000
+) -> List[Dict[str, Any]]:
+    """
+    Transitions into or out of PUBLISHED after (since, after_id), oldest
+    first; without after_id, everything after `since`. Keyset on
+    (created_at, id): a batch transition stamps all its events with one
+    NOW(), so a page can end inside a run of equal timestamps.
+    The WHERE clause matches the partial index idx_events_publish_changes.
+    """
+    rows = conn.execute(
+        text("""
+            SELECT id::text AS id, tenant_id::text AS tenant_id, entity_id::text AS content_id, created_at,
+                   payload->>'from_state' AS from_state, payload->>'to_state' AS to_state,
+                   COALESCE((payload->>'risk_tier')::int, 1) AS risk_tier
+            FROM public.events
+            WHERE entity_type = 'content'
+              AND event_type = 'content.transitioned'
+              AND (payload->>'to_state' = 'PUBLISHED' OR payload->>'from_state' = 'PUBLISHED')
+              AND created_at >= :since
+              AND (created_at > :since OR id > CAST(:after_id AS uuid))
+            ORDER BY created_at, id
+            LIMIT :limit;
+        """),
+        {"since": since, "after_id": after_id, "limit": int(limit)},
+    ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def mark_refresh_due_tx(conn: Connection, tenant_id: str, content_ids: List[str]) -> int:
+    """
+    One content.refresh_due event per item that is still PUBLISHED.
+    """
+    res = conn.execute(
+        text("""
+            INSERT INTO public.events
+                (tenant_id, entity_type, entity_id, event_type, actor_type, actor_id, payload, created_at)
+            SELECT c.tenant_id, 'content', c.id, 'content.refresh_due', 'system', NULL,
+                   jsonb_build_object('state', c.state::text), now()
+            FROM public.content_items c
+            WHERE c.tenant_id = CAST(:tenant_id AS uuid)
+              AND c.id = ANY(CAST(:ids AS uuid[]))
+              AND c.state = 'PUBLISHED';
+        """),
+        {"tenant_id": str(tenant_id), "ids": list(content_ids)},
+    )
+    return res.rowcount
+
+
+# ----------------------------
+# Scheduler
+# ----------------------------
+
+def _epoch(ts: datetime) -> float:
+    return ts.timestamp()
+
+
+def _utc(t: float) -> datetime:
+    return datetime.fromtimestamp(t, tz=timezone.utc)
+
+
+class LostLeadership(RuntimeError):
+    """Another process holds the scheduler lock; this tick did nothing."""
+
+
+def _fence_tx(conn: Connection) -> None:
+    # Re-entrant for the session that holds the session lock; fails for anyone else.
+    if not conn.execute(text("SELECT pg_try_advisory_xact_lock(hashtext(:key));"), {"key": _LOCK_KEY}).scalar_one():
+        raise LostLeadership("refresh scheduler lock is held by another process")
+
+
+class RefreshScheduler:
+    def __init__(self, engine: Engine, config: Optional[RefreshConfig] = None) -> None:
+        self.engine = engine
+        self.config = config or RefreshConfig.from_env()
+        self.wheel = RefreshWheel(self.config.tick_seconds, self.config.slots)
+        self._events_since: Optional[datetime] = None
+        # Time the wheel was last advanced to (every deadline up to it has fired).
+        self._advanced_to = 0.0
+        self.stats: Dict[str, int] = {"ticks": 0, "emitted": 0, "jobs": 0, "published": 0, "unpublished": 0}
+
+    @contextmanager
+    def _transaction(self, conn: Optional[Connection]) -> Iterator[Connection]:
+        if conn is None:
+            with self.engine.begin() as c:
+                yield c
+        else:
+            with conn.begin():
+                yield conn
+
+    def recover(self, conn: Optional[Connection] = None) -> int:
+        """
+        Rebuild the wheel from the checkpoint + PUBLISHED items. Returns the item count.
+        """
+        cfg = self.config
+        self.wheel = RefreshWheel(cfg.tick_seconds, cfg.slots)
+        with self._transaction(conn) as conn:
+            _fence_tx(conn)
+            last = load_checkpoint_tx(conn)
+            snapshot_at = conn.execute(text("SELECT now();")).scalar_one()
+            after = _epoch(last) if last is not None else _epoch(snapshot_at)
+            self.wheel.start(after)
+            self._advanced_to = after
+            for tenant_id, content_id, published_at, tier in iter_published_tx(conn):
+                interval = cfg.interval_for(tier)
+                self.wheel.schedule(tenant_id, content_id, next_due(_epoch(published_at), interval, after), interval)
+            if last is None:
+                save_checkpoint_tx(conn, snapshot_at)
+        self._events_since = snapshot_at - timedelta(seconds=cfg.overlap_seconds)
+        log.info("refresh scheduler: %d published items, resuming after %s", len(self.wheel), _utc(after).isoformat())
+        return len(self.wheel)
+
+    def _apply_changes(self, conn: Connection) -> None:
+        # Deadlines are placed after the last advance, not after now: the
+        # advance that follows fires the ones that came due meanwhile, and an
+        # event re-read in the overlap window lands on the deadline it already has.
+        cfg = self.config
+        after = self._advanced_to
+        since, after_id = self._events_since, None
+        newest = since
+        while True:
+            rows = publish_changes_since_tx(conn, since, after_id)
+            for r in rows:
+                if r["to_state"] == "PUBLISHED":
+                    interval = cfg.interval_for(r["risk_tier"])
+                    self.wheel.schedule(
+                        r["tenant_id"], r["content_id"], next_due(_epoch(r["created_at"]), interval, after), interval
+                    )
+                    self.stats["published"] += 1
+                elif self.wheel.remove(r["content_id"]):
+                    self.stats["unpublished"] += 1
+            if not rows:
+                break
+            since, after_id = rows[-1]["created_at"], rows[-1]["id"]
+            newest = since
+            if len(rows) < 10000:
+                break
+        # Events commit out of created_at order: keep re-reading a window behind the newest one seen.
+        self._events_since = max(self._events_since, newest - timedelta(seconds=cfg.overlap_seconds))
+
+    def tick(self, now: Optional[float] = None, conn: Optional[Connection] = None) -> Dict[str, int]:
+        """
+        One round: apply publish changes, fire due items as jobs, checkpoint.
+        `conn` is the leader's lock connection (None: a standalone tick, which
+        only runs while no leader holds the lock). Raises LostLeadership.
+        """
+        if self._events_since is None:
+            self.recover(conn)
+        cfg = self.config
+        now = time.time() if now is None else now
+
+        try:
+            with self._transaction(conn) as conn:
+                _fence_tx(conn)
+                self._apply_changes(conn)
+
+                by_tenant: Dict[str, List[str]] = {}
+                for tenant_id, content_id in self.wheel.advance(now):
+                    by_tenant.setdefault(tenant_id, []).append(content_id)
+
+                jobs = [
+                    {
+                        "kind": "content.refresh",
+                        "tenant_id": tenant_id,
+                        "queue": cfg.queue,
+                        "payload": {"content_ids": ids[i : i + cfg.batch]},
+                    }
+                    for tenant_id, ids in by_tenant.items()
+                    for i in range(0, len(ids), cfg.batch)
+                ]
+                if jobs:
+                    queue.enqueue_many_tx(conn, jobs)
+                # Same transaction: a crash before commit re-fires this tick's items after recovery.
+                save_checkpoint_tx(conn, _utc(now))
+        except Exception:
+            # The wheel already advanced in memory: rebuild from the checkpoint so
+            # this tick's items fire again instead of being skipped for a period.
+            self._events_since = None
+            raise
+        self._advanced_to = now
+
+        emitted = sum(len(ids) for ids in by_tenant.values())
+        self.stats["ticks"] += 1
+        self.stats["emitted"] += emitted
+        self.stats["jobs"] += len(jobs)
+        return {"emitted": emitted, "jobs": len(jobs), "items": len(self.wheel)}
+
+    def run(self, stop: threading.Event) -> None:
+        """
+        Tick every REFRESH_TICK_SECONDS while this process holds the
+        scheduler lock; otherwise wait and try again (standby).
+        """
+        cfg = self.config
+        while not stop.is_set():
+            with self.engine.connect() as lock_conn:
+                leader = lock_conn.execute(
+                    text("SELECT pg_try_advisory_lock(hashtext(:key));"), {"key": _LOCK_KEY}
+                ).scalar_one()
+                lock_conn.commit()
+                if not leader:
+                    stop.wait(cfg.tick_seconds)
+                    continue
+                try:
+                    # A new leader starts from the checkpoint, not from another process's memory.
+                    self._events_since = None
+                    while not stop.is_set():
+                        t0 = time.monotonic()
+                        try:
+                            out = self.tick(conn=lock_conn)
+                            if out["emitted"]:
+                                log.info("refresh scheduler: %s", out)
+                        except LostLeadership:
+                            # The session (and its lock) was lost; another process leads now.
+                            log.warning("refresh scheduler: lost the lock, standing by")
+                            break
+                        except Exception:
+                            log.exception("refresh scheduler tick failed")
+                        stop.wait(max(0.0, cfg.tick_seconds - (time.monotonic() - t0)))
+                finally:
+                    try:
+                        lock_conn.execute(text("SELECT pg_advisory_unlock(hashtext(:key));"), {"key": _LOCK_KEY})
+                        lock_conn.commit()
+                    except Exception:
+                        log.warning("refresh scheduler: unlock failed (connection lost?)")
+
+
+@job("content.refresh")
+def refresh_content(payload: Dict[str, Any], ctx: JobContext) -> int:
+    from worker.db import get_engine
+
+    with get_engine().begin() as conn:
+        return mark_refresh_due_tx(conn, ctx.tenant_id or payload["tenant_id"], payload["content_ids"])
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Schedule refreshes of PUBLISHED content")
+    ap.add_argument("--once", action="store_true", help="recover + one tick, print stats")
+    args = ap.parse_args()
+
+    from worker.db import get_engine
+
+    logging.basicConfig(level=logging.INFO)
+    scheduler = RefreshScheduler(get_engine(), RefreshConfig.from_env())
+    if args.once:
+        try:
+            print(json.dumps({**scheduler.tick(), "wheel": scheduler.wheel.stats()}))
+        except LostLeadership as e:
+            raise SystemExit(str(e))
+        return
+    stop = threading.Event()
+    try:
+        scheduler.run(stop)
+    except KeyboardInterrupt:
+        stop.set()
+
+
+if __name__ == "__main__":
+    main()
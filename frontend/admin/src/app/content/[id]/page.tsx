@@ -1,24 +1,33 @@
 import Link from "next/link";
 import Badge from "@/components/Badge";
 import ErrorBox from "@/components/ErrorBox";
+import LiveEvents from "@/components/LiveEvents";
 import Loading from "@/components/Loading";
 import TransitionPanel from "@/components/TransitionPanel";
 import { getAllowed, getEvents } from "@/lib/api";
 import { formatIso } from "@/lib/utils";
 
+const EVENTS_PAGE_SIZE = 50;
+
 export default async function ContentDetailPage({
   params,
+  searchParams,
 }: {
   params: { id: string };
+  searchParams: { events_cursor?: string };
 }) {
   const id = params.id;
+  const eventsCursor = searchParams.events_cursor || undefined;
 
   let allowed: Awaited<ReturnType<typeof getAllowed>> | null = null;
   let events: Awaited<ReturnType<typeof getEvents>> | null = null;
   let err: string | null = null;
 
   try {
-    [allowed, events] = await Promise.all([getAllowed(id), getEvents(id)]);
+    [allowed, events] = await Promise.all([
+      getAllowed(id),
+      getEvents(id, { limit: EVENTS_PAGE_SIZE, cursor: eventsCursor }),
+    ]);
   } catch (e: any) {
     err = e?.message || "Failed to load content detail";
   }
@@ -76,18 +85,44 @@ export default async function ContentDetailPage({
         </div>
 
         <div className="lg:col-span-2">
-          <TransitionPanel contentId={id} allowed={allowed.allowed} />
+          <TransitionPanel
+            contentId={id}
+            fromState={allowed.from_state}
+            allowed={allowed.allowed}
+          />
         </div>
       </div>
 
       <div className="mt-6 rounded-xl border border-slate-200 bg-white p-4">
         <div className="flex items-center justify-between">
-          <div className="font-medium">Events</div>
-          <div className="text-sm text-slate-600">{events.length} total</div>
+          <div className="flex items-center gap-2">
+            <div className="font-medium">Events</div>
+            <LiveEvents entityId={id} />
+          </div>
+          <div className="flex items-center gap-3 text-sm text-slate-600">
+            <span>
+              {events.items.length} shown{eventsCursor ? " (continued)" : ""}
+            </span>
+            {eventsCursor ? (
+              <Link href={`/content/${id}`} className="underline">
+                Oldest
+              </Link>
+            ) : null}
+            {events.next_cursor ? (
+              <Link
+                href={`/content/${id}?events_cursor=${encodeURIComponent(
+                  events.next_cursor
+                )}`}
+                className="underline"
+              >
+                Newer
+              </Link>
+            ) : null}
+          </div>
         </div>
 
         <div className="mt-3 space-y-3">
-          {events.map((ev) => (
+          {events.items.map((ev) => (
             <div
               key={ev.id}
               className="rounded-lg border border-slate-200 bg-slate-50 p-3"
@@ -3,6 +3,7 @@ import Badge from "@/components/Badge";
 import ErrorBox from "@/components/ErrorBox";
 import Loading from "@/components/Loading";
 import Pagination from "@/components/Pagination";
+import SearchBox from "@/components/SearchBox";
 import Table from "@/components/Table";
 import { listContent } from "@/lib/api";
 import { formatIso } from "@/lib/utils";
@@ -15,12 +16,14 @@ export default async function ContentListPage({
     offset?: string;
     sort?: string;
     q?: string;
+    cursor?: string;
   };
 }) {
   const limit = Number(searchParams.limit ?? "20");
   const offset = Number(searchParams.offset ?? "0");
   const sort = searchParams.sort ?? "created_at_desc";
   const q = searchParams.q ?? "";
+  const cursor = searchParams.cursor ?? "";
 
   let data: Awaited<ReturnType<typeof listContent>> | null = null;
   let err: string | null = null;
@@ -31,6 +34,10 @@ export default async function ContentListPage({
       offset: Number.isFinite(offset) ? offset : 0,
       sort,
       q: q || undefined,
+      // Deep pages go through the keyset cursor and skip counting; the first
+      // page gets an O(1) counter total (or a planner estimate when searching).
+      cursor: cursor || undefined,
+      count: cursor ? "none" : "planned",
     });
   } catch (e: any) {
     err = e?.message || "Failed to load content list";
@@ -44,6 +51,7 @@ export default async function ContentListPage({
     offset?: number;
     sort?: string;
     q?: string;
+    cursor?: string;
   }) => {
     const sp = new URLSearchParams();
     sp.set("limit", String(next.limit ?? data!.limit));
@@ -52,6 +60,9 @@ export default async function ContentListPage({
     if (typeof next.q === "string" ? next.q.length > 0 : q.length > 0) {
       sp.set("q", typeof next.q === "string" ? next.q : q);
     }
+    // cursor is never carried over implicitly: it is only valid for the
+    // exact sort/filter it was issued for.
+    if (next.cursor) sp.set("cursor", next.cursor);
     return `/content?${sp.toString()}`;
   };
 
@@ -74,12 +85,7 @@ export default async function ContentListPage({
           <input type="hidden" name="limit" value={String(data.limit)} />
           <input type="hidden" name="offset" value={"0"} />
           <input type="hidden" name="sort" value={sort} />
-          <input
-            className="w-64 rounded-lg border border-slate-300 bg-white px-3 py-2 text-sm"
-            placeholder="Search title (q=...)"
-            name="q"
-            defaultValue={q}
-          />
+          <SearchBox defaultValue={q} />
           <button className="rounded-lg bg-slate-900 px-4 py-2 text-sm text-white hover:bg-slate-800">
             Search
           </button>
@@ -107,40 +113,39 @@ export default async function ContentListPage({
           >
             created_at_asc
           </Link>
+          {q && (
+            <Link
+              className="rounded-lg border border-slate-300 bg-white px-3 py-1.5 hover:bg-slate-100"
+              href={baseQuery({ sort: "relevance", offset: 0 })}
+            >
+              relevance
+            </Link>
+          )}
         </div>
 
         <Pagination
           limit={data.limit}
           offset={data.offset}
+          shown={data.items.length}
           total={data.total}
-          onChange={(nextOffset) => {
-            // server component: use link navigation
-          }}
+          totalIsEstimate={data.total_is_estimate}
+          firstHref={data.offset > 0 ? baseQuery({ offset: 0 }) : null}
+          prevHref={
+            !cursor && data.offset > 0
+              ? baseQuery({ offset: Math.max(0, data.offset - data.limit) })
+              : null
+          }
+          nextHref={
+            data.next_cursor
+              ? baseQuery({
+                  offset: data.offset + data.limit,
+                  cursor: data.next_cursor,
+                })
+              : null
+          }
         />
       </div>
 
-      {/* Pagination links (server-friendly) */}
-      <div className="mt-2 flex justify-end gap-2">
-        <Link
-          className={`rounded-lg border border-slate-300 bg-white px-3 py-1.5 text-sm hover:bg-slate-100 ${
-            data.offset <= 0 ? "pointer-events-none opacity-50" : ""
-          }`}
-          href={baseQuery({ offset: Math.max(0, data.offset - data.limit) })}
-        >
-          Prev
-        </Link>
-        <Link
-          className={`rounded-lg border border-slate-300 bg-white px-3 py-1.5 text-sm hover:bg-slate-100 ${
-            data.offset + data.limit >= data.total
-              ? "pointer-events-none opacity-50"
-              : ""
-          }`}
-          href={baseQuery({ offset: data.offset + data.limit })}
-        >
-          Next
-        </Link>
-      </div>
-
       <div className="mt-4">
         <Table>
           <thead className="bg-slate-100 text-left">
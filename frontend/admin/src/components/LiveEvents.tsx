@@ -0,0 +1,49 @@
+"use client";
+
+import { useRouter } from "next/navigation";
+import { useEffect, useState } from "react";
+import { contentEventsStreamUrl } from "@/lib/api";
+import { StreamedContentEvent } from "@/lib/types";
+
+// Bursts (bulk transitions) collapse into one refresh.
+const REFRESH_DEBOUNCE_MS = 300;
+
+// Subscribes to the live event stream and re-renders the server page when
+// something changes, instead of polling or asking for a manual refresh.
+export default function LiveEvents({ entityId }: { entityId?: string }) {
+  const router = useRouter();
+  const [live, setLive] = useState(false);
+
+  useEffect(() => {
+    const es = new EventSource(contentEventsStreamUrl({ entityId }));
+    let t: ReturnType<typeof setTimeout> | null = null;
+
+    es.onopen = () => setLive(true);
+    es.onerror = () => setLive(false); // EventSource reconnects on its own (Last-Event-ID)
+    es.onmessage = (msg) => {
+      let ev: StreamedContentEvent;
+      try {
+        ev = JSON.parse(msg.data);
+      } catch {
+        return;
+      }
+      if (!ev.event_type?.startsWith("content.")) return;
+      if (t) clearTimeout(t);
+      t = setTimeout(() => router.refresh(), REFRESH_DEBOUNCE_MS);
+    };
+
+    return () => {
+      if (t) clearTimeout(t);
+      es.close();
+    };
+  }, [entityId, router]);
+
+  return (
+    <span className="inline-flex items-center gap-1 text-xs text-slate-600">
+      <span
+        className={`h-2 w-2 rounded-full ${live ? "bg-green-500" : "bg-slate-300"}`}
+      />
+      {live ? "live" : "offline"}
+    </span>
+  );
+}
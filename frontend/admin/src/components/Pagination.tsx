@@ -1,46 +1,73 @@
-import { clampInt } from "@/lib/utils";
+import Link from "next/link";
 
+const btnCls =
+  "rounded-lg border border-slate-300 bg-white px-3 py-1.5 text-sm hover:bg-slate-100";
+const disabledCls = "pointer-events-none opacity-50";
+
+/**
+ * Server-friendly pagination (links only).
+ *
+ * Keyset mode: pass `nextHref` built from the API's `next_cursor`; every
+ * page costs the same no matter how deep. Going backwards in keyset mode is
+ * "First" (or browser back), so `prevHref` is only set for offset paging.
+ */
 export default function Pagination({
   limit,
   offset,
+  shown,
   total,
-  onChange,
+  totalIsEstimate = false,
+  firstHref,
+  prevHref,
+  nextHref,
 }: {
   limit: number;
   offset: number;
-  total: number;
-  onChange: (nextOffset: number) => void;
+  shown: number;
+  total: number | null;
+  totalIsEstimate?: boolean;
+  firstHref: string | null;
+  prevHref: string | null;
+  nextHref: string | null;
 }) {
-  const prev = clampInt(offset - limit, 0, Math.max(0, total - 1));
-  const next = clampInt(offset + limit, 0, Math.max(0, total - 1));
-
-  const canPrev = offset > 0;
-  const canNext = offset + limit < total;
+  const from = shown > 0 ? offset + 1 : 0;
+  const to = offset + Math.min(shown, limit);
 
   return (
     <div className="flex items-center justify-between gap-3">
       <div className="text-sm text-slate-700">
-        Showing{" "}
-        <span className="font-medium">{Math.min(total, offset + 1)}</span>–
-        <span className="font-medium">{Math.min(total, offset + limit)}</span>{" "}
-        of <span className="font-medium">{total}</span>
+        Showing <span className="font-medium">{from}</span>–
+        <span className="font-medium">{to}</span>
+        {total !== null && (
+          <>
+            {" "}
+            of{" "}
+            <span className="font-medium">
+              {totalIsEstimate ? "~" : ""}
+              {total}
+            </span>
+          </>
+        )}
       </div>
 
       <div className="flex gap-2">
-        <button
-          className="rounded-lg border border-slate-300 bg-white px-3 py-1.5 text-sm hover:bg-slate-100 disabled:opacity-50"
-          onClick={() => onChange(prev)}
-          disabled={!canPrev}
+        <Link
+          className={`${btnCls} ${firstHref ? "" : disabledCls}`}
+          href={firstHref ?? "#"}
         >
-          Prev
-        </button>
-        <button
-          className="rounded-lg border border-slate-300 bg-white px-3 py-1.5 text-sm hover:bg-slate-100 disabled:opacity-50"
-          onClick={() => onChange(next)}
-          disabled={!canNext}
+          First
+        </Link>
+        {prevHref !== null && (
+          <Link className={btnCls} href={prevHref}>
+            Prev
+          </Link>
+        )}
+        <Link
+          className={`${btnCls} ${nextHref ? "" : disabledCls}`}
+          href={nextHref ?? "#"}
         >
           Next
-        </button>
+        </Link>
       </div>
     </div>
   );
@@ -0,0 +1,72 @@
+"use client";
+
+import Link from "next/link";
+import { useEffect, useState } from "react";
+import { typeaheadContent } from "@/lib/api";
+import { TypeaheadItem } from "@/lib/types";
+
+// Typeahead only fires once the user pauses typing.
+const DEBOUNCE_MS = 200;
+
+export default function SearchBox({ defaultValue }: { defaultValue: string }) {
+  const [value, setValue] = useState(defaultValue);
+  const [suggestions, setSuggestions] = useState<TypeaheadItem[]>([]);
+  const [open, setOpen] = useState(false);
+
+  useEffect(() => {
+    const q = value.trim();
+    if (!q) {
+      setSuggestions([]);
+      return;
+    }
+
+    let cancelled = false;
+    const t = setTimeout(async () => {
+      try {
+        const items = await typeaheadContent(q);
+        if (!cancelled) setSuggestions(items);
+      } catch {
+        if (!cancelled) setSuggestions([]);
+      }
+    }, DEBOUNCE_MS);
+
+    return () => {
+      cancelled = true;
+      clearTimeout(t);
+    };
+  }, [value]);
+
+  return (
+    <div className="relative">
+      <input
+        className="w-64 rounded-lg border border-slate-300 bg-white px-3 py-2 text-sm"
+        placeholder="Search title (q=...)"
+        name="q"
+        autoComplete="off"
+        value={value}
+        onChange={(e) => {
+          setValue(e.target.value);
+          setOpen(true);
+        }}
+        onFocus={() => setOpen(true)}
+        onBlur={() => setTimeout(() => setOpen(false), 150)}
+      />
+
+      {open && suggestions.length > 0 && (
+        <ul className="absolute z-10 mt-1 w-64 overflow-hidden rounded-lg border border-slate-200 bg-white text-sm shadow">
+          {suggestions.map((s) => (
+            <li key={s.id}>
+              <Link
+                className="block truncate px-3 py-2 hover:bg-slate-100"
+                href={`/content/${s.id}`}
+              >
+                {s.title}
+                <span className="ml-2 text-xs text-slate-500">{s.state}</span>
+              </Link>
+            </li>
+          ))}
+        </ul>
+      )}
+    </div>
+  );
+}
@@ -6,9 +6,11 @@ import { transitionContent } from "@/lib/api";
 
 export default function TransitionPanel({
   contentId,
+  fromState,
   allowed,
 }: {
   contentId: string;
+  fromState?: string;
   allowed: string[];
 }) {
   const options = useMemo(() => allowed ?? [], [allowed]);
@@ -25,7 +27,10 @@ export default function TransitionPanel({
 
     setBusy(true);
     try {
-      const res = await transitionContent(contentId, { to_state: toState });
+      const res = await transitionContent(contentId, {
+        to_state: toState,
+        expected_from_state: fromState,
+      });
       setOkMsg(`Transitioned: ${res.from_state} → ${res.to_state}`);
     } catch (e: any) {
       setErr(e?.message || "Transition failed");
@@ -79,7 +84,7 @@ export default function TransitionPanel({
 
       {okMsg && (
         <div className="mt-3 rounded-lg border border-green-200 bg-green-50 p-3 text-sm text-green-800">
-          {okMsg} (refresh to see updated allowed + events)
+          {okMsg}
         </div>
       )}
 
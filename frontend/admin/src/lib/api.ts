@@ -1,9 +1,10 @@
 import {
   AllowedTransitionsResponse,
-  ContentEvent,
+  ContentEventPage,
   ContentListResponse,
   TransitionRequest,
   TransitionResponse,
+  TypeaheadItem,
 } from "@/lib/types";
 
 const API_BASE =
@@ -44,18 +45,37 @@ export async function listContent(params: {
   offset: number;
   sort?: string;
   q?: string;
+  cursor?: string;
+  count?: "exact" | "planned" | "none";
+  search?: "contains" | "prefix";
 }): Promise<ContentListResponse> {
   const sp = new URLSearchParams();
   sp.set("limit", String(params.limit));
   sp.set("offset", String(params.offset));
   if (params.sort) sp.set("sort", params.sort);
   if (params.q) sp.set("q", params.q);
+  // cursor => keyset paging (offset is informational only)
+  if (params.cursor) sp.set("cursor", params.cursor);
+  if (params.count) sp.set("count", params.count);
+  if (params.search) sp.set("search", params.search);
 
   return apiFetch<ContentListResponse>(`/content?${sp.toString()}`, {
     method: "GET",
   });
 }
 
+export async function typeaheadContent(
+  q: string,
+  limit = 8
+): Promise<TypeaheadItem[]> {
+  const sp = new URLSearchParams();
+  sp.set("q", q);
+  sp.set("limit", String(limit));
+  return apiFetch<TypeaheadItem[]>(`/content/typeahead?${sp.toString()}`, {
+    method: "GET",
+  });
+}
+
 export async function getAllowed(
   contentId: string
 ): Promise<AllowedTransitionsResponse> {
@@ -64,10 +84,27 @@ export async function getAllowed(
   });
 }
 
-export async function getEvents(contentId: string): Promise<ContentEvent[]> {
-  return apiFetch<ContentEvent[]>(`/content/${contentId}/events`, {
-    method: "GET",
-  });
+export async function getEvents(
+  contentId: string,
+  params: { limit?: number; cursor?: string } = {}
+): Promise<ContentEventPage> {
+  const sp = new URLSearchParams();
+  if (params.limit) sp.set("limit", String(params.limit));
+  if (params.cursor) sp.set("cursor", params.cursor);
+  const qs = sp.toString();
+  return apiFetch<ContentEventPage>(
+    `/content/${contentId}/events${qs ? `?${qs}` : ""}`,
+    { method: "GET" }
+  );
+}
+
+// SSE stream of content.* events (EventSource cannot send headers, so the
+// tenant goes in the query string). The browser resumes via Last-Event-ID.
+export function contentEventsStreamUrl(params: { entityId?: string } = {}): string {
+  const sp = new URLSearchParams();
+  sp.set("tenant", TENANT_SLUG);
+  if (params.entityId) sp.set("entity_id", params.entityId);
+  return `${API_BASE}/content/events/stream?${sp.toString()}`;
 }
 
 export async function transitionContent(
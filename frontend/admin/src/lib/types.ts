@@ -21,7 +21,15 @@ export type ContentListResponse = {
   items: ContentItem[];
   limit: number;
   offset: number;
-  total: number;
+  total: number | null; // null when count=none
+  total_is_estimate: boolean; // planner estimate (filtered + count=planned)
+  next_cursor: string | null;
+};
+
+export type TypeaheadItem = {
+  id: string;
+  title: string;
+  state: string;
 };
 
 export type AllowedTransitionsResponse = {
@@ -42,8 +50,26 @@ export type ContentEvent = {
   created_at: string; // ISO
 };
 
+// One SSE message from /content/events/stream.
+export type StreamedContentEvent = {
+  id: string;
+  entity_id: string;
+  event_type: string;
+  actor_type: string | null;
+  payload: any | null; // omitted by the server when too large for NOTIFY
+  created_at: string; // ISO
+};
+
+export type ContentEventPage = {
+  items: ContentEvent[]; // oldest first
+  limit: number;
+  next_cursor: string | null; // null on the last page
+};
+
 export type TransitionRequest = {
   to_state: string;
+  // Optimistic check: API answers 409 if the item has moved on meanwhile.
+  expected_from_state?: string;
 };
 
 export type TransitionResponse = {